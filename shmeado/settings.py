@@ -82,6 +82,8 @@ TEMPLATES = [
                 "stats.context_processors.api_status",
                 "stats.context_processors.ga_id",
             ],
+            # Game tabs are also rendered on their own, outside of base.html
+            "builtins": ["stats.templatetags.tags_main"],
         },
     },
 ]
@@ -1,57 +1,123 @@
 import os
+import re
 import json
 import time
+import logging
 import urllib.request
-from ratelimit import limits
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from .breaker import CLOSED, APIUnavailable, CircuitBreaker
+from .cache import ResponseCache, get_backend
+from .client import HTTPClient
+from .limiter import BACKGROUND, INTERACTIVE, RateLimitExceeded, TokenBucket
+from .metrics import RollingHistogram
+from .names import INVALID_NAME, NameIndex
+from .singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
 
 
 # ======================================================================================
 # API STATUS
 # ======================================================================================
 
-api_status = {
-    "status": 4,  # Default to unknown
-    "time": None,
+# One rolling histogram per upstream endpoint, covering the last METRICS_WINDOW seconds
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 300))
+ENDPOINTS = ("player", "status", "guild", "recentgames", "mojang")
+metrics = {endpoint: RollingHistogram(window=METRICS_WINDOW) for endpoint in ENDPOINTS}
+
+
+# Upstreams fail fast once their requests keep failing or exceeding BREAKER_LATENCY
+breakers = {
+    upstream: CircuitBreaker(
+        upstream,
+        failures=int(os.getenv("BREAKER_FAILURES", 5)),
+        latency=float(os.getenv("BREAKER_LATENCY", 4)),
+        reset=float(os.getenv("BREAKER_RESET", 30)),
+    )
+    for upstream in ("hypixel", "mojang")
 }
 
 
-def timed_api_response(url):
-    """Update api_status based on request response time.
+def timed_api_response(url, endpoint="player", data=None):
+    """Return the JSON response given by a URL, recording its latency.
 
-    Calculated by measuring the difference between the start and end
-    times of a request. Updates api_status to a dictionary of the form:
-    {
-        "status": <integer representing numerical status code>,
-        "time": <float representing the response time in seconds>
-    }
+    The response time (and whether the request failed) is recorded in
+    the endpoint's rolling histogram and its upstream's circuit breaker.
+    Failures are connection errors, timeouts, rate limiting and server
+    errors, rather than rejections of an invalid UUID or name.
 
-    Status codes (where t is the response time in seconds):
-        0: 0 < t <= 1
-        1: 1 < t <= 2.5
-        2: t > 2.5
-        3: Unresponsive (request failed even with a valid UUID)
-        4: Unknown (no request conducted since server startup)
+    Raises APIUnavailable without making the request if the breaker is
+    open. The URL may be given as a function returning it, so that a rate
+    limit token is only taken once the breaker has allowed the request.
 
-    Keyword argument:
-        url: string containing the URL to request
+    Keyword arguments:
+        url: string containing the URL to request, or a function returning it
+        endpoint: string naming the histogram to record in (see ENDPOINTS)
+        data: JSON-serialisable request body to POST, if any
     """
+    breaker = breakers["mojang" if endpoint == "mojang" else "hypixel"]
+    breaker.check()
+
+    if callable(url):
+        try:
+            url = url()
+        except Exception:
+            breaker.release()  # e.g. RateLimitExceeded, so never sent
+            raise
+
+    def record(failed=False):
+        response_time = time.perf_counter() - start
+        metrics[endpoint].record(response_time, error=failed)
+        breaker.record(response_time, failed)
 
     # Start the timer
     start = time.perf_counter()
 
     # Make the request
     try:
-        response = url_to_json(url)
-        end = time.perf_counter()  # End the timer
-        response_time = end - start  # Calculate the response time
+        response = url_to_json(url, data)
     except urllib.request.http.client.InvalidURL:
+        breaker.release()
         return None  # Invalid UUID was given
+    except urllib.error.HTTPError as e:
+        record(failed=e.code >= 500 or e.code == 429)
+        raise
     except urllib.error.URLError:
-        response_time = -1
+        record(failed=True)
+        raise
+    except json.JSONDecodeError:
+        record()
+        raise
+
+    record()
+    return response
+
+
+def get_api_status():
+    """Return the Hypixel API status from recent player API requests.
+
+    Returns a dictionary of the form:
+    {
+        "status": <integer representing numerical status code>,
+        "time": <float representing the p95 response time in seconds>
+    }
+
+    Status codes (where t is the p95 response time in seconds):
+        0: 0 < t <= 1
+        1: 1 < t <= 2.5
+        2: t > 2.5
+        3: Unresponsive (the Hypixel circuit breaker is open)
+        4: Unknown (no request conducted within the window)
+    """
+    snapshot = metrics["player"].snapshot()
+    response_time = snapshot["p95"]
 
-    # Determine the status code based on the response time
-    if response_time == -1:
+    if breakers["hypixel"].state != CLOSED:
         status_code = 3
+    elif not snapshot["requests"]:
+        status_code = 4
     elif response_time <= 1:
         status_code = 0
     elif response_time <= 2.5:
@@ -59,15 +125,17 @@ def timed_api_response(url):
     else:
         status_code = 2
 
-    # Update the API status
-    api_status["status"] = status_code
-    api_status["time"] = response_time
-    return response
+    return {"status": status_code, "time": response_time}
 
 
-def get_api_status():
-    """Return the latest API status."""
-    return api_status
+def get_breaker_status():
+    """Return the state of each upstream's circuit breaker."""
+    return {upstream: breaker.status() for upstream, breaker in breakers.items()}
+
+
+def get_metrics():
+    """Return a summary of each endpoint's recent requests (see RollingHistogram)."""
+    return {endpoint: histogram.snapshot() for endpoint, histogram in metrics.items()}
 
 
 # ======================================================================================
@@ -77,17 +145,98 @@ def get_api_status():
 API_KEY = os.getenv("API_KEY")
 RATE_LIMIT = int(os.getenv("RATE_LIMIT"))
 PER_MINUTE = 60
+MOJANG_RATE_LIMIT = int(os.getenv("MOJANG_RATE_LIMIT", 600))
+PER_TEN_MINUTES = 600
+
+# Budgets are shared by all workers, queueing callers rather than failing at once
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR")
+RATE_LIMIT_WAIT = {
+    INTERACTIVE: float(os.getenv("RATE_LIMIT_WAIT", 5)),
+    BACKGROUND: float(os.getenv("RATE_LIMIT_BACKGROUND_WAIT", 30)),
+}
+hypixel_limiter = TokenBucket("hypixel", RATE_LIMIT, PER_MINUTE, RATE_LIMIT_DIR)
+mojang_limiter = TokenBucket(
+    "mojang", MOJANG_RATE_LIMIT, PER_TEN_MINUTES, RATE_LIMIT_DIR
+)
+
+# Shared per-process client keeping connections to each upstream alive
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 5))
+client = HTTPClient(
+    hosts={
+        "api.hypixel.net": {"max_connections": 10, "timeout": HTTP_TIMEOUT},
+        "api.mojang.com": {"max_connections": 4, "timeout": HTTP_TIMEOUT},
+        "api.minecraftservices.com": {"max_connections": 4, "timeout": HTTP_TIMEOUT},
+    },
+    timeout=HTTP_TIMEOUT,
+)
+
+# Shared per-process pool for concurrent and background requests
+executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FETCH_WORKERS", 16)), thread_name_prefix="api"
+)
+
+# Player stats APIs are cached by UUID and refreshed in the background once stale
+CACHE_TTL = int(os.getenv("CACHE_TTL", 60))
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 300))
+player_cache = ResponseCache(
+    get_backend(
+        os.getenv("CACHE_BACKEND", "memory"),
+        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 1000)),
+        max_bytes=int(os.getenv("CACHE_MAX_MB", 64)) * 1024 * 1024,
+        directory=os.getenv("CACHE_DIR", "/tmp/shmeado-cache"),
+        timeout=CACHE_TTL + CACHE_STALE_TTL,
+    ),
+    ttl=CACHE_TTL,
+    stale_ttl=CACHE_STALE_TTL,
+    executor=executor,
+)
 
 
-@limits(calls=RATE_LIMIT, period=PER_MINUTE)
-def get_api_key():
-    """Return the API key under rate limit restrictions."""
+def get_api_key(priority=INTERACTIVE):
+    """Return the API key once allowed under the shared rate limit.
+
+    Raises RateLimitExceeded if the caller could not be given a place
+    within the wait allowed for its priority.
+    """
+    hypixel_limiter.acquire(priority, RATE_LIMIT_WAIT[priority])
     return API_KEY
 
 
-def url_to_json(url):
-    """Return the JSON response given by a URL."""
-    return json.loads(urllib.request.urlopen(url).read())
+def wait_for_mojang(priority=INTERACTIVE):
+    """Block until a Mojang request is allowed under its shared rate limit."""
+    mojang_limiter.acquire(priority, RATE_LIMIT_WAIT[priority])
+
+
+def get_limiter_status():
+    """Return the available tokens and queue depth of each rate limiter."""
+    return {
+        "hypixel": hypixel_limiter.status(),
+        "mojang": mojang_limiter.status(),
+    }
+
+
+def url_to_json(url, data=None):
+    """Return the JSON response given by a URL, POSTing data as JSON if given."""
+    if data is None:
+        return json.loads(client.request(url))
+    return json.loads(
+        client.request(
+            url,
+            method="POST",
+            body=json.dumps(data).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+    )
+
+
+# Names resolve to the same UUID for weeks, while typos are only briefly remembered
+name_index = NameIndex(
+    ttl=int(os.getenv("NAME_TTL", 7 * 24 * 60 * 60)),
+    invalid_ttl=int(os.getenv("INVALID_NAME_TTL", 10 * 60)),
+)
+
+# Concurrent lookups of the same name share a single Mojang request
+uuid_flight = SingleFlight()
 
 
 def get_uuid(name):
@@ -95,39 +244,241 @@ def get_uuid(name):
     # Check if it's already a UUID
     if len(name) in [32, 36]:
         return name
-    # Otherwise try to get the UUID
+    return uuid_flight.do(name.lower(), lambda: lookup_uuid(name))
+
+
+def lookup_uuid(name, priority=INTERACTIVE):
+    """Return the UUID for a player name, only asking Mojang if not indexed."""
+    uuid = name_index.get(name)
+    if uuid is not None:
+        return uuid
+
+    try:
+        uuid = request_uuid(name, priority)
+    except urllib.error.HTTPError as e:
+        # Only remember names Mojang rejected, not its outages or rate limits
+        if e.code >= 500 or e.code == 429:
+            return INVALID_NAME
+        uuid = INVALID_NAME
+    # Unknown names may also be given as an empty response
+    except json.JSONDecodeError:
+        uuid = INVALID_NAME
+    # Let the page explain Mojang is unavailable rather than the name invalid
+    except APIUnavailable:
+        raise
+    # Return as invalid without remembering it if Mojang could not be reached
+    except urllib.error.URLError:
+        return INVALID_NAME
+
+    name_index.set(name, uuid)
+    return uuid
+
+
+def request_uuid(name, priority=INTERACTIVE):
+    """Request the UUID for a player name from Mojang."""
+
+    def url():
+        wait_for_mojang(priority)
+        return f"https://api.mojang.com/users/profiles/minecraft/{name}"
+
+    response = timed_api_response(url, "mojang")
+    if response is None:
+        return INVALID_NAME  # Name could not form a valid URL, e.g. with spaces
+    return response.get("id", INVALID_NAME)
+
+
+# Mojang's bulk profile endpoint accepts at most this many names per request
+MOJANG_BATCH_SIZE = 10
+VALID_NAME = re.compile(r"^\w{1,16}$", re.ASCII)
+
+
+def get_uuids(names):
+    """Return a dictionary mapping each of several player names to its UUID.
+
+    Names already in the name index are answered without a request, and
+    the remainder are resolved in batches of MOJANG_BATCH_SIZE using
+    Mojang's bulk profile endpoint, filling the same index as get_uuid.
+    Names Mojang does not know map to "Invalid Name". Batches stop once
+    Mojang is rate limiting, failing or unreachable (or the rate limit or
+    circuit breaker refuses a request), and the names left unresolved map
+    to None, so a temporary failure can be told apart from an unknown name.
+
+    Keyword argument:
+        names: iterable of strings containing player names or UUIDs
+    """
+    names = list(names)
+    resolved = {}
+    missing = []
+
+    for name in names:
+        key = name.lower()
+        if key in resolved:
+            continue
+        if len(name) in [32, 36]:
+            resolved[key] = name
+        elif not VALID_NAME.match(name):
+            resolved[key] = INVALID_NAME  # Would be rejected by Mojang
+        else:
+            uuid = name_index.get(name)
+            if uuid is not None:
+                resolved[key] = uuid
+            else:
+                resolved[key] = None
+                missing.append(name)
+
+    for i in range(0, len(missing), MOJANG_BATCH_SIZE):
+        batch = missing[i : i + MOJANG_BATCH_SIZE]
+        try:
+            resolve_batch(batch, resolved)
+        except (RateLimitExceeded, urllib.error.URLError, json.JSONDecodeError) as e:
+            # Return the names resolved so far rather than none of them
+            logger.warning(f"bulk name lookup stopped - {e}")
+            break
+
+    return {name: resolved[name.lower()] for name in names}
+
+
+def resolve_batch(batch, resolved):
+    """Resolve a batch of names into resolved, falling back to single lookups.
+
+    Raises the batch request's error if Mojang is rate limiting, failing
+    or unreachable, rather than sending it more requests.
+    """
     try:
-        return url_to_json(
-            f"https://api.mojang.com/users/profiles/minecraft/{name}"
-        ).get("id", "Invalid Name")
-    # Return as invalid if the UUID cannot be found for that name
-    except (urllib.error.URLError, json.JSONDecodeError):
-        return "Invalid Name"
+        profiles = request_uuids(batch)
+    except urllib.error.HTTPError as e:
+        if e.code >= 500 or e.code == 429:
+            raise
+        # Fall back to single lookups if Mojang rejected the batch
+        for name in batch:
+            resolved[name.lower()] = lookup_uuid(name, BACKGROUND)
+        return
+
+    found = {p["name"].lower(): p["id"] for p in profiles}
+    uuids = {name: found.get(name.lower(), INVALID_NAME) for name in batch}
+    name_index.set_many(uuids)
+    for name, uuid in uuids.items():
+        resolved[name.lower()] = uuid
+
+
+def request_uuids(names):
+    """Request the profiles for up to MOJANG_BATCH_SIZE names from Mojang."""
+
+    def url():
+        wait_for_mojang(BACKGROUND)
+        return "https://api.minecraftservices.com/minecraft/profile/lookup/bulk/byname"
+
+    return timed_api_response(url, "mojang", data=names)
 
 
 def get_api(uuid):
-    """Return a player's Hypixel stats API."""
-    return timed_api_response(
-        f"https://api.hypixel.net/v2/player?key={get_api_key()}&uuid={uuid}"
-    )
+    """Return a player's Hypixel stats API, served from cache where possible."""
+    key = uuid.replace("-", "").lower()
+    try:
+        return player_cache.get_or_fetch(
+            key,
+            lambda: request_api(uuid),
+            refresh=lambda: request_api(uuid, BACKGROUND),
+        )
+    except APIUnavailable:
+        # Serve however old a copy is still held rather than nothing
+        player = player_cache.get_stale(key)
+        if player is None:
+            raise
+        return player
+
+
+def hypixel_url(query, priority=INTERACTIVE):
+    """Return a function giving a Hypixel API URL with the API key.
+
+    The key (and so a rate limit token) is only taken once the function
+    is called by timed_api_response, after the breaker allows the request.
+
+    Keyword arguments:
+        query: string containing the endpoint and its parameters, e.g. "player?uuid=..."
+        priority: INTERACTIVE or BACKGROUND (see get_api_key)
+    """
+    return lambda: f"https://api.hypixel.net/v2/{query}&key={get_api_key(priority)}"
+
 
+def request_api(uuid, priority=INTERACTIVE):
+    """Request a player's Hypixel stats API, bypassing the cache."""
+    return timed_api_response(hypixel_url(f"player?uuid={uuid}", priority))
 
-def get_online_status(uuid):
+
+def get_online_status(uuid, priority=INTERACTIVE):
     """Return a player's Hypixel online status API."""
-    return url_to_json(
-        f"https://api.hypixel.net/v2/status?key={get_api_key()}&uuid={uuid}"
-    )
+    return timed_api_response(hypixel_url(f"status?uuid={uuid}", priority), "status")
 
 
-def get_recent_games(uuid):
+def get_recent_games(uuid, priority=INTERACTIVE):
     """Return a player's Hypixel recent games API."""
-    return url_to_json(
-        f"https://api.hypixel.net/v2/recentgames?key={get_api_key()}&uuid={uuid}"
+    return timed_api_response(
+        hypixel_url(f"recentgames?uuid={uuid}", priority), "recentgames"
     )
 
 
-def get_guild_information(uuid):
+def get_guild_information(uuid, priority=INTERACTIVE):
     """Return a player's Hypixel guild information API."""
-    return url_to_json(
-        f"https://api.hypixel.net/v2/guild?key={get_api_key()}&player={uuid}"
-    )
+    return timed_api_response(hypixel_url(f"guild?player={uuid}", priority), "guild")
+
+
+# ======================================================================================
+# CONCURRENT REQUESTS
+# ======================================================================================
+
+# Fetch online status, guild and recent games alongside the stats API, waiting at
+# most PREFETCH_WAIT seconds for them once the stats API has been returned
+PREFETCH = os.getenv("PREFETCH", "false").lower() == "true"
+PREFETCH_WAIT = float(os.getenv("PREFETCH_WAIT", 0.25))
+
+
+def get_player_data(uuid):
+    """Return a player's Hypixel stats API, with its other APIs if prefetching.
+
+    The stats API is requested in the calling thread. If PREFETCH is
+    enabled, the online status, guild and recent games requests are
+    started in the background alongside it. Returns a dictionary of the
+    form:
+    {
+        "player": <the player's Hypixel stats API, or None for an invalid name>,
+        "online": <online status API, or None if unavailable>,
+        "guild": <guild information API, or None if unavailable>,
+        "recent": <recent games API, or None if unavailable>
+    }
+    where "online", "guild" and "recent" are only present if PREFETCH is
+    enabled.
+
+    Errors from the stats API are raised as usual, while the secondary
+    APIs are allowed to fail or be left out if they are not returned
+    within PREFETCH_WAIT, so they can be requested client side instead.
+
+    Keyword argument:
+        uuid: string containing the player's UUID
+    """
+    if uuid == INVALID_NAME:
+        return {"player": None}
+
+    futures = {}
+    if PREFETCH:
+        for name, get in [
+            ("online", get_online_status),
+            ("guild", get_guild_information),
+            ("recent", get_recent_games),
+        ]:
+            futures[name] = executor.submit(get, uuid, BACKGROUND)
+
+    data = {"player": get_api(uuid)}
+    deadline = time.monotonic() + PREFETCH_WAIT
+    for name, future in futures.items():
+        try:
+            data[name] = future.result(max(0, deadline - time.monotonic()))
+        except (
+            RateLimitExceeded,
+            urllib.error.URLError,
+            json.JSONDecodeError,
+            FutureTimeoutError,
+        ) as e:
+            logger.warning(f"uuid: '{uuid}' - {name} prefetch failed - {e!r}")
+            data[name] = None
+    return data
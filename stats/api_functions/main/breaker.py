@@ -0,0 +1,89 @@
+"""Provides a circuit breaker so a degraded upstream fails fast.
+
+After enough consecutive failed or slow requests the breaker opens and
+requests are refused immediately, instead of each tying up a worker
+until it times out. Once open for a while, single probe requests are let
+through; the first to succeed closes the breaker again.
+"""
+
+import time
+import urllib.error
+import threading
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class APIUnavailable(urllib.error.URLError):
+    """Raised when a request is refused because its breaker is open."""
+
+
+class CircuitBreaker:
+    """A consecutive-failure circuit breaker with periodic probing.
+
+    Keyword arguments:
+        name: String naming the upstream the breaker protects
+        failures: Number of consecutive failed or slow requests to open after
+        latency: Number of seconds after which a request counts as slow
+        reset: Number of seconds between probe requests while open
+    """
+
+    def __init__(self, name, failures=5, latency=4, reset=30):
+        self.name = name
+        self.failures = failures
+        self.latency = latency
+        self.reset = reset
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened = None  # When the breaker opened or last sent a probe
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return whether a request may be made, claiming the probe if open."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            # Let one probe through per reset period (even if one was lost)
+            if time.time() - self.opened < self.reset:
+                return False
+            self.state = HALF_OPEN
+            self.opened = time.time()
+            self.probing = True
+            return True
+
+    def check(self):
+        """Raise APIUnavailable if a request may not be made."""
+        if not self.allow():
+            raise APIUnavailable(f"{self.name} circuit breaker is open")
+
+    def record(self, seconds, failed=False):
+        """Record the outcome of an allowed request."""
+        failed = failed or seconds > self.latency
+        with self.lock:
+            if not failed:
+                self.state = CLOSED
+                self.consecutive = 0
+                self.probing = False
+                return
+
+            self.consecutive += 1
+            if self.probing or self.consecutive >= self.failures:
+                self.state = OPEN
+                self.opened = time.time()
+                self.probing = False
+
+    def release(self):
+        """Give up an allowed request that never reached the upstream."""
+        with self.lock:
+            if self.probing:
+                self.state = OPEN
+                self.opened -= self.reset  # Let the next request probe instead
+                self.probing = False
+
+    def status(self):
+        """Return the breaker's state and number of consecutive failures."""
+        with self.lock:
+            return {"state": self.state, "consecutive_failures": self.consecutive}
@@ -0,0 +1,329 @@
+"""Provides TTL caching with stale-while-revalidate for upstream API payloads.
+
+Payloads are stored as encoded JSON so that every read returns a fresh
+copy (extraction code is free to mutate what it is given) and so that
+the memory bound can be applied to the actual stored size.
+"""
+
+import os
+import json
+import time
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================================================
+# BACKENDS
+# ======================================================================================
+
+
+class MemoryBackend:
+    """An in-process LRU store bounded by entry count and total size."""
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the (stored_at, data) entry for a key, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, stored_at, data):
+        """Store data for a key, evicting least recently used entries."""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self.entries[key] = (stored_at, data)
+            self.size += len(data)
+            while self.entries and (
+                len(self.entries) > self.max_entries or self.size > self.max_bytes
+            ):
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+
+    def acquire(self, key, expiry):
+        """Try to take an exclusive marker for a key, returning success."""
+        now = time.time()
+        with self.lock:
+            if self.locks.get(key, 0) > now:
+                return False
+            self.locks[key] = now + expiry
+            return True
+
+    def release(self, key):
+        """Release a marker taken with acquire."""
+        with self.lock:
+            self.locks.pop(key, None)
+
+
+class FileBackend:
+    """A store of one file per key, shared by all workers on a host.
+
+    Each file holds a header of MAGIC and the time the entry was stored,
+    followed by the data as it is, so reading an entry never runs anything
+    from the file. Files without the header (corrupted, or written by an
+    older version) are treated as missing. The directory is private to the
+    user running the workers.
+    """
+
+    MAGIC = b"SHC1"
+    HEADER = struct.Struct(">4sd")
+
+    def __init__(self, directory, max_entries=10000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.writes = 0
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        # Refuse a directory others could plant entries in, e.g. one created first
+        # in a shared temporary directory by another user
+        if hasattr(os, "getuid"):
+            if os.stat(directory).st_uid != os.getuid():
+                raise PermissionError(
+                    f"cache directory {directory!r} is owned by another user"
+                )
+            os.chmod(directory, 0o700)
+
+    def path(self, key, suffix=".cache"):
+        """Return the file path for a key."""
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    def get(self, key):
+        """Return the (stored_at, data) entry for a key, or None."""
+        try:
+            with open(self.path(key), "rb") as f:
+                entry = f.read()
+        except OSError:
+            return None
+        if len(entry) < self.HEADER.size:
+            return None
+        magic, stored_at = self.HEADER.unpack_from(entry)
+        if magic != self.MAGIC:
+            return None
+        return stored_at, entry[self.HEADER.size :]
+
+    def set(self, key, stored_at, data):
+        """Atomically write data for a key."""
+        fd, temp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, stored_at))
+            f.write(data)
+        os.replace(temp, self.path(key))
+
+        # Prune occasionally rather than listing the directory on every write
+        self.writes += 1
+        if self.writes % 100 == 0:
+            self.prune()
+
+    def delete(self, key):
+        """Remove a key if present."""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """Remove the least recently written files beyond max_entries."""
+        try:
+            files = [
+                e for e in os.scandir(self.directory) if e.name.endswith(".cache")
+            ]
+        except OSError:
+            return
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime)
+        for entry in files[: len(files) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def acquire(self, key, expiry):
+        """Try to take an exclusive lock file for a key, returning success."""
+        path = self.path(key, ".lock")
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            return True
+        except FileExistsError:
+            # Break locks left behind by a crashed worker
+            try:
+                if os.path.getmtime(path) + expiry < time.time():
+                    os.remove(path)
+                    return self.acquire(key, expiry)
+            except OSError:
+                pass
+            return False
+
+    def release(self, key):
+        """Release a lock file taken with acquire."""
+        try:
+            os.remove(self.path(key, ".lock"))
+        except FileNotFoundError:
+            pass
+
+
+class DjangoBackend:
+    """A store backed by one of the configured Django caches."""
+
+    def __init__(self, alias="default", timeout=None):
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        """Return the (stored_at, data) entry for a key, or None."""
+        return self.cache.get(f"payload:{key}")
+
+    def set(self, key, stored_at, data):
+        """Store data for a key."""
+        self.cache.set(f"payload:{key}", (stored_at, data), self.timeout)
+
+    def delete(self, key):
+        """Remove a key if present."""
+        self.cache.delete(f"payload:{key}")
+
+    def acquire(self, key, expiry):
+        """Try to take an exclusive marker for a key, returning success."""
+        return self.cache.add(f"lock:{key}", 1, expiry)
+
+    def release(self, key):
+        """Release a marker taken with acquire."""
+        self.cache.delete(f"lock:{key}")
+
+
+def get_backend(name, max_entries, max_bytes, directory, timeout):
+    """Return a cache backend given its name ("memory", "file" or "django")."""
+    if name == "file":
+        return FileBackend(directory, max_entries)
+    if name == "django":
+        return DjangoBackend(timeout=timeout)
+    return MemoryBackend(max_entries, max_bytes)
+
+
+# ======================================================================================
+# RESPONSE CACHE
+# ======================================================================================
+
+
+class ResponseCache:
+    """A TTL cache serving stale entries while a single refresh runs.
+
+    Entries younger than ttl are served directly. Entries older than ttl
+    but younger than ttl + stale_ttl are served immediately while one
+    background refresh (across all workers sharing the backend) fetches
+    a replacement. Anything older is fetched synchronously.
+
+    Synchronous fetches are coalesced: concurrent misses for a key within
+    a process wait on a single call, and workers sharing the backend wait
+    for the one holding the fetch lock to store its result.
+
+    Keyword arguments:
+        backend: Storage backend (see MemoryBackend for the interface)
+        ttl: Number of seconds an entry is fresh for
+        stale_ttl: Number of seconds an expired entry may still be served
+        executor: Executor used to run background refreshes
+        wait: Maximum number of seconds to wait for another worker's fetch
+    """
+
+    def __init__(self, backend, ttl, stale_ttl, executor, wait=10):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.executor = executor
+        self.wait = wait
+        self.flight = SingleFlight()
+
+    def get_or_fetch(self, key, fetch, refresh=None):
+        """Return the cached value for a key, calling fetch() on a miss.
+
+        Keyword arguments:
+            key: String to cache the value under
+            fetch: Callable returning a fresh value
+            refresh: Callable used for background refreshes (default fetch)
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            stored_at, data = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                return json.loads(data)
+            if age < self.ttl + self.stale_ttl:
+                self.refresh(key, refresh or fetch)
+                return json.loads(data)
+
+        # Each caller decodes its own copy of the shared result
+        data = self.flight.do(key, lambda: self.fetch_shared(key, fetch))
+        return json.loads(data) if data is not None else None
+
+    def get_stale(self, key):
+        """Return the cached value for a key however old it is, or None."""
+        entry = self.backend.get(key)
+        return json.loads(entry[1]) if entry is not None else None
+
+    def fetch_shared(self, key, fetch):
+        """Fetch and store a value once across all workers, returning its data."""
+        if not self.backend.acquire(f"fetch:{key}", self.wait):
+            # Another worker is fetching, so wait for its result to be stored
+            deadline = time.time() + self.wait
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = self.backend.get(key)
+                if entry is not None and time.time() - entry[0] < self.ttl:
+                    return entry[1]
+            return self.set(key, fetch())
+
+        try:
+            return self.set(key, fetch())
+        finally:
+            self.backend.release(f"fetch:{key}")
+
+    def set(self, key, value):
+        """Store a value, returning its data and ignoring failed (None) responses."""
+        if value is None:
+            return None
+        data = json.dumps(value).encode()
+        self.backend.set(key, time.time(), data)
+        return data
+
+    def refresh(self, key, fetch):
+        """Start a background refresh of a key unless one is already running."""
+        if not self.backend.acquire(f"refresh:{key}", self.ttl):
+            return
+
+        def run():
+            try:
+                self.set(key, fetch())
+            except Exception as e:  # noqa: E722 - stale value continues to be served
+                logger.warning(f"key: '{key}' - background refresh failed - {e}")
+            finally:
+                self.backend.release(f"refresh:{key}")
+
+        self.executor.submit(run)
@@ -0,0 +1,194 @@
+"""Provides a pooled, keep-alive HTTP client for upstream API requests."""
+
+import io
+import os
+import ssl
+import zlib
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+from collections import deque
+
+
+# Exceptions indicating that a reused keep-alive connection was closed upstream
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class HostPool:
+    """A bounded pool of persistent connections to a single host."""
+
+    def __init__(self, scheme, host, port, max_connections, timeout, context):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.context = context
+        self.idle = deque()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+    def new_connection(self):
+        """Open a new connection to the host."""
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.context
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self):
+        """Return an idle connection (or a new one) once a slot is free.
+
+        Returns a tuple of the form (<connection>, <boolean indicating
+        whether the connection has been used before>).
+        """
+        if not self.slots.acquire(timeout=self.timeout):
+            raise urllib.error.URLError(f"connection pool for {self.host} exhausted")
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return self.new_connection(), False
+
+    def release(self, connection, reusable):
+        """Return a connection to the pool, closing it if not reusable."""
+        if reusable:
+            with self.lock:
+                self.idle.append(connection)
+        else:
+            connection.close()
+        self.slots.release()
+
+    def clear(self):
+        """Close and forget all idle connections."""
+        with self.lock:
+            while self.idle:
+                self.idle.pop().close()
+
+
+class HTTPClient:
+    """A thread-safe HTTP client holding persistent connections per host.
+
+    Raises the same exceptions as urllib.request.urlopen so callers can
+    treat the two interchangeably: urllib.error.HTTPError for error
+    statuses, urllib.error.URLError for connection failures/timeouts,
+    and http.client.InvalidURL for malformed URLs.
+
+    Keyword arguments:
+        hosts: Dictionary of host names to dictionaries containing
+               "max_connections" and/or "timeout" overrides
+        max_connections: Default maximum concurrent connections per host
+        timeout: Default connect/read timeout in seconds
+    """
+
+    def __init__(self, hosts=None, max_connections=10, timeout=5):
+        self.hosts = hosts or {}
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.context = ssl.create_default_context()
+        self.headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": "shmeado",
+        }
+        self.pools = {}
+        self.lock = threading.Lock()
+
+        # Sockets must never be shared between a parent and forked worker
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def get_pool(self, scheme, host, port):
+        """Return the connection pool for a host, creating it if needed."""
+        key = (scheme, host, port)
+        with self.lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                limits = self.hosts.get(host, {})
+                pool = HostPool(
+                    scheme,
+                    host,
+                    port,
+                    limits.get("max_connections", self.max_connections),
+                    limits.get("timeout", self.timeout),
+                    self.context,
+                )
+                self.pools[key] = pool
+        return pool
+
+    def reset(self):
+        """Drop all pooled connections."""
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def close(self):
+        """Close all idle pooled connections."""
+        with self.lock:
+            pools = list(self.pools.values())
+        for pool in pools:
+            pool.clear()
+
+    def request(self, url, method="GET", body=None, headers=None):
+        """Make a request and return the decoded response body as bytes."""
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise http.client.InvalidURL(f"invalid URL: {url!r}")
+
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+
+        pool = self.get_pool(parts.scheme, parts.hostname, parts.port)
+
+        # A reused connection may have been closed upstream, so retry once
+        for attempt in range(2):
+            connection, reused = pool.acquire()
+            reusable = False
+            try:
+                connection.request(method, target, body=body, headers=request_headers)
+                response = connection.getresponse()
+                data = response.read()
+                reusable = not response.will_close
+            except STALE_CONNECTION_ERRORS as e:
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(e)
+            except http.client.InvalidURL:
+                raise
+            except (OSError, http.client.HTTPException) as e:
+                raise urllib.error.URLError(e)
+            finally:
+                pool.release(connection, reusable)
+            break
+
+        try:
+            data = decode_body(data, response.getheader("Content-Encoding"))
+        except zlib.error as e:  # A corrupt or truncated compressed body
+            raise urllib.error.URLError(e)
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                url, response.status, response.reason, response.headers, io.BytesIO(data)
+            )
+        return data
+
+
+def decode_body(data, encoding):
+    """Decompress a response body according to its Content-Encoding."""
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(data)
+        except zlib.error:  # Some servers send raw deflate streams
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+    return data
@@ -0,0 +1,154 @@
+"""Provides a token-bucket rate limiter shared by every worker on a host.
+
+The bucket state lives in a small JSON file guarded by an exclusive
+file lock, so all gunicorn workers draw from the same API key budget.
+Callers that find the bucket empty are queued for a bounded time rather
+than failing immediately, and background callers give way to any
+interactive callers that are waiting.
+"""
+
+import os
+import json
+import time
+import random
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where the bucket is per process
+    fcntl = None
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no token became available within the allowed wait."""
+
+
+class TokenBucket:
+    """A file-backed token bucket with bounded, prioritised queueing.
+
+    Keyword arguments:
+        name: String naming the bucket (used for its state file)
+        calls: Number of calls allowed per period
+        period: Length of the period in seconds
+        directory: Directory holding the shared state file
+    """
+
+    def __init__(self, name, calls, period, directory=None):
+        self.name = name
+        self.capacity = calls
+        self.rate = calls / period  # Tokens added per second
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "shmeado-ratelimit"
+        )
+        self.path = os.path.join(self.directory, f"{name}.json")
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        # Refuse a directory others could plant state in, e.g. one created first
+        # in a shared temporary directory by another user
+        if hasattr(os, "getuid"):
+            if os.stat(self.directory).st_uid != os.getuid():
+                raise PermissionError(
+                    f"rate limit directory {self.directory!r} is owned by another user"
+                )
+            os.chmod(self.directory, 0o700)
+
+    def open(self):
+        """Open the state file for reading and writing, refusing a symlink."""
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+        return os.fdopen(os.open(self.path, flags, 0o600), "r+")
+
+    @contextmanager
+    def state(self):
+        """Yield the shared bucket state, saving any changes made to it."""
+        with self.lock, self.open() as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError:  # New or corrupted file
+                    state = {"tokens": self.capacity, "updated": time.time()}
+                state.setdefault("waiting", {})
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def refill(self, state, now):
+        """Add the tokens accrued since the state was last updated."""
+        elapsed = max(0, now - state["updated"])
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+
+        # Forget waiters whose deadline has passed (e.g. crashed workers)
+        state["waiting"] = {
+            ticket: waiter
+            for ticket, waiter in state["waiting"].items()
+            if waiter[1] > now
+        }
+
+    def acquire(self, priority=INTERACTIVE, timeout=5):
+        """Take a token, waiting up to timeout seconds for one to be added.
+
+        Raises RateLimitExceeded if no token can be taken in time.
+
+        Keyword arguments:
+            priority: INTERACTIVE or BACKGROUND; background callers only
+                      take tokens while no interactive callers are queued
+            timeout: Maximum number of seconds to wait
+        """
+        ticket = f"{os.getpid()}:{threading.get_ident()}"
+        deadline = time.time() + timeout
+
+        while True:
+            with self.state() as state:
+                now = time.time()
+                self.refill(state, now)
+                state["waiting"].pop(ticket, None)
+
+                blocked = priority == BACKGROUND and any(
+                    p == INTERACTIVE for p, _ in state["waiting"].values()
+                )
+                if state["tokens"] >= 1 and not blocked:
+                    state["tokens"] -= 1
+                    return
+
+                # Seconds until the next token, or a short poll if blocked
+                wait = max(0.05, (1 - state["tokens"]) / self.rate)
+                exceeded = now + wait > deadline
+                if not exceeded:
+                    state["waiting"][ticket] = [priority, deadline]
+                queued = len(state["waiting"])
+
+            # Raised once the state is saved without this caller's ticket
+            if exceeded:
+                raise RateLimitExceeded(f"{self.name} rate limit ({queued} queued)")
+
+            # Spread waiters out so they do not all wake at once
+            time.sleep(min(wait, 0.25) * random.uniform(0.5, 1))
+
+    def status(self):
+        """Return the available tokens and the number of queued callers."""
+        with self.state() as state:
+            self.refill(state, time.time())
+            queued = {INTERACTIVE: 0, BACKGROUND: 0}
+            for priority, _ in state["waiting"].values():
+                queued[priority] = queued.get(priority, 0) + 1
+            return {
+                "tokens": int(state["tokens"]),
+                "capacity": self.capacity,
+                "queued": queued,
+            }
@@ -0,0 +1,137 @@
+"""Provides fixed-memory rolling latency histograms for upstream requests.
+
+Each histogram is a ring of time slots, each holding counts for a fixed
+set of latency buckets, so memory use does not grow with traffic and
+old requests drop out of the window as their slot is reused.
+"""
+
+import time
+import bisect
+import threading
+
+# Upper bounds (in seconds) of each latency bucket, with a final overflow bucket
+LATENCY_BOUNDS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 2.5, 3, 4, 5, 7.5, 10)
+
+
+class Slot:
+    """The requests recorded during one slice of a histogram's window."""
+
+    def __init__(self, buckets):
+        self.reset(None, buckets)
+
+    def reset(self, start, buckets):
+        """Empty the slot, marking it as covering the slice beginning at start."""
+        self.start = start
+        self.counts = [0] * buckets
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class RollingHistogram:
+    """A latency histogram and error count over a rolling time window.
+
+    Keyword arguments:
+        window: Number of seconds of requests covered
+        slots: Number of slices the window is divided into
+        bounds: Ascending upper bounds of the latency buckets in seconds
+    """
+
+    def __init__(self, window=300, slots=30, bounds=LATENCY_BOUNDS):
+        self.window = window
+        self.width = window / slots
+        self.bounds = bounds
+        self.slots = [Slot(len(bounds) + 1) for _ in range(slots)]
+        self.lock = threading.Lock()
+
+    def slot(self, now):
+        """Return the slot for a time, emptying it if it held an older slice."""
+        start = int(now // self.width)
+        slot = self.slots[start % len(self.slots)]
+        if slot.start != start:
+            slot.reset(start, len(self.bounds) + 1)
+        return slot
+
+    def record(self, seconds, error=False):
+        """Record a request taking a number of seconds, and whether it failed."""
+        with self.lock:
+            slot = self.slot(time.time())
+            slot.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+            slot.total += seconds
+            slot.max = max(slot.max, seconds)
+            if error:
+                slot.errors += 1
+
+    def merged(self, now):
+        """Return the counts, errors, total and max of all slots in the window."""
+        oldest = int(now // self.width) - len(self.slots) + 1
+        counts = [0] * (len(self.bounds) + 1)
+        errors = 0
+        total = 0.0
+        longest = 0.0
+        with self.lock:
+            for slot in self.slots:
+                if slot.start is None or slot.start < oldest:
+                    continue
+                for i, count in enumerate(slot.counts):
+                    counts[i] += count
+                errors += slot.errors
+                total += slot.total
+                longest = max(longest, slot.max)
+        return counts, errors, total, longest
+
+    def percentile(self, counts, longest, p):
+        """Return the estimated latency at percentile p of the given counts.
+
+        Latencies are assumed to be spread evenly within each bucket, with
+        the overflow bucket ending at the longest recorded latency.
+        """
+        requests = sum(counts)
+        if not requests:
+            return None
+
+        rank = requests * p / 100
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0
+                upper = self.bounds[i] if i < len(self.bounds) else longest
+                upper = min(upper, longest)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return longest
+
+    def snapshot(self):
+        """Return a summary of the requests in the window.
+
+        Returns a dictionary of the form:
+        {
+            "window": <number of seconds covered>,
+            "requests": <number of requests>,
+            "errors": <number of failed requests>,
+            "error_rate": <fraction of requests that failed, or None>,
+            "mean": <mean latency in seconds, or None>,
+            "p50": <median latency in seconds, or None>,
+            "p95": <95th percentile latency in seconds, or None>,
+            "p99": <99th percentile latency in seconds, or None>,
+            "max": <longest latency in seconds, or None>,
+            "buckets": <list of [upper bound or None for overflow, count]>
+        }
+        """
+        counts, errors, total, longest = self.merged(time.time())
+        requests = sum(counts)
+        return {
+            "window": self.window,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else None,
+            "mean": total / requests if requests else None,
+            "p50": self.percentile(counts, longest, 50),
+            "p95": self.percentile(counts, longest, 95),
+            "p99": self.percentile(counts, longest, 99),
+            "max": longest if requests else None,
+            "buckets": [
+                [bound, count]
+                for bound, count in zip(list(self.bounds) + [None], counts)
+            ],
+        }
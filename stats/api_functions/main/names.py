@@ -0,0 +1,102 @@
+"""Provides a persistent, case-insensitive name to UUID index.
+
+Lookups are answered from an in-memory LRU first, then from the
+PlayerName table, so most names never need a Mojang request. Invalid
+names are remembered for a much shorter time so that typos are not
+repeatedly sent upstream, while newly-registered names still resolve.
+"""
+
+import time
+import logging
+import datetime
+from django.db import DatabaseError, connection
+
+from stats.models import PlayerName
+
+from .cache import MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+INVALID_NAME = "Invalid Name"
+
+
+class NameIndex:
+    """A two-tier (memory and database) name to UUID store with expiry.
+
+    Keyword arguments:
+        ttl: Number of seconds a valid name lookup is kept for
+        invalid_ttl: Number of seconds an invalid name lookup is kept for
+        max_entries: Maximum number of lookups held in memory
+    """
+
+    def __init__(self, ttl, invalid_ttl, max_entries=10000):
+        self.ttl = ttl
+        self.invalid_ttl = invalid_ttl
+        self.memory = MemoryBackend(max_entries)
+
+    def expired(self, uuid, stored_at):
+        """Return whether a lookup stored at a given time has expired."""
+        ttl = self.ttl if uuid != INVALID_NAME else self.invalid_ttl
+        return time.time() - stored_at >= ttl
+
+    def get(self, name):
+        """Return the UUID (or INVALID_NAME) for a name, or None if unknown."""
+        key = name.lower()
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            stored_at, uuid = entry
+            if not self.expired(uuid, stored_at):
+                return uuid
+            self.memory.delete(key)
+
+        try:
+            row = PlayerName.objects.filter(name=key).first()
+        except DatabaseError as e:
+            logger.warning(f"name: '{name}' - name index unavailable - {e}")
+            return None
+        if row is None:
+            return None
+
+        uuid = row.uuid or INVALID_NAME
+        stored_at = row.updated.timestamp()
+        if self.expired(uuid, stored_at):
+            return None
+
+        self.memory.set(key, stored_at, uuid)
+        return uuid
+
+    def set(self, name, uuid):
+        """Record the UUID (or INVALID_NAME) for a name."""
+        self.set_many({name: uuid})
+
+    def set_many(self, uuids):
+        """Record the UUIDs (or INVALID_NAME) for a dictionary of names."""
+        now = time.time()
+        updated = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc)
+        max_length = PlayerName._meta.get_field("name").max_length
+
+        rows = {}
+        for name, uuid in uuids.items():
+            key = name.lower()
+            self.memory.set(key, now, uuid)
+            if len(key) <= max_length:  # Longer names are never valid
+                rows[key] = PlayerName(
+                    name=key,
+                    uuid=None if uuid == INVALID_NAME else uuid,
+                    updated=updated,
+                )
+        if not rows:
+            return
+
+        # Upsert in one query (MySQL infers the conflict target itself)
+        target = connection.features.supports_update_conflicts_with_target
+        try:
+            PlayerName.objects.bulk_create(
+                rows.values(),
+                update_conflicts=True,
+                update_fields=["uuid", "updated"],
+                unique_fields=["name"] if target else None,
+            )
+        except DatabaseError as e:
+            logger.warning(f"names: {list(rows)} - name index unavailable - {e}")
@@ -0,0 +1,56 @@
+"""Provides request coalescing so concurrent identical lookups share one call."""
+
+import threading
+
+
+class Call:
+    """An in-flight call whose result is shared by every waiting caller."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls for the same key within a process.
+
+    The first caller for a key (the leader) runs the function while any
+    other callers for that key block until it finishes, then receive the
+    same result or exception. The key is forgotten once the call ends, so
+    later callers trigger a new call.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return fn(), sharing one call between concurrent callers of key."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        """Return the number of keys currently being fetched."""
+        with self.lock:
+            return len(self.calls)
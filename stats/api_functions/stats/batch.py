@@ -0,0 +1,217 @@
+"""Extracts stats for many player payloads at once, as columns.
+
+Offline jobs (guild reports, leaderboards, comparisons) need the same stats
+for hundreds or thousands of players. extract_batch reads payloads in
+chunks, runs each game's extractor for every player in a chunk and gathers
+each scalar stat into a column, one per stat per game. Level columns
+(LEVELS) and any ratio columns asked for are computed a whole column at a
+time (see levelling and utilities.get_ratio_batch), with NumPy when it is
+installed, and numeric columns can be returned as NumPy arrays. Each chunk
+is yielded before the next payload is read, so memory stays flat however
+many payloads are streamed through.
+
+Extraction bypasses the derived stats cache, which is sized for the players
+being viewed on the site rather than for bulk jobs.
+"""
+
+import json
+import logging
+import itertools
+from collections.abc import Mapping
+
+from . import utilities as u, levelling as l
+from .main import SOURCES
+
+logger = logging.getLogger(__name__)
+
+# Each extractor module by its name, e.g. "bedwars"
+GAMES = {module.__name__.rsplit(".", 1)[-1]: module for module in SOURCES}
+
+
+def skywars_levels(xps):
+    """Return the SkyWars level of each XP value, as the skywars extractor does."""
+    return [float(level) for level in l.skywars_xp_to_level_batch(xps)]
+
+
+def skywars_levels_old(xps):
+    """Return the old SkyWars level of each XP value, as the extractor does."""
+    return [float(level) for level in l.skywars_xp_to_level_old_batch(xps)]
+
+
+# Each game's level columns, mapped to the XP column and the function finding
+# the levels of a whole column of it
+LEVELS = {
+    "bedwars": {"level": ("Experience", l.bedwars_xp_to_level_batch)},
+    "skywars": {
+        "level": ("skywars_experience", skywars_levels),
+        "level_old": ("skywars_experience", skywars_levels_old),
+    },
+}
+
+
+def read_jsonl(file):
+    """Yield each player API in a JSONL file, one per non-blank line."""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_jsonl(chunks, file):
+    """Write each chunk of columns to a file as a line of JSON."""
+    for chunk in chunks:
+        file.write(json.dumps(chunk, default=to_list) + "\n")
+
+
+def to_list(value):
+    """Return a NumPy array as a list, for JSON encoding."""
+    if u.np is not None and isinstance(value, u.np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def flatten(stats, prefix=""):
+    """Return a game's scalar stats as a flat dictionary.
+
+    Nested dictionaries are flattened into dotted names, while tables and
+    lists, which have no single value per player, are left out.
+    """
+    flat = {}
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            if "rows" not in value:
+                flat.update(flatten(value, f"{name}."))
+        elif not isinstance(value, (list, tuple)):
+            flat[name] = value
+    return flat
+
+
+def to_array(column):
+    """Return a column as a NumPy array if it is wholly numeric, else as is."""
+    if u.np is None or not column:
+        return column
+
+    types = {type(value) for value in column}
+    try:
+        if types == {int}:
+            return u.np.array(column, dtype=u.np.int64)
+        if types <= {int, float}:
+            return u.np.array(column, dtype=u.np.float64)
+    except OverflowError:  # Integers too large for int64 stay as they are
+        pass
+    return column
+
+
+class Columns:
+    """A game's stats for a chunk of players, as a column per stat.
+
+    Players are added in turn, and a stat missing for a player (or every
+    stat, if the game failed for them) is None in its column.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.columns = {}
+
+    def add(self, values):
+        """Add a player's stats, as a flat dictionary."""
+        for name, value in values.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = [None] * self.count
+            column.append(value)
+
+        self.count += 1
+        for column in self.columns.values():
+            if len(column) < self.count:
+                column.append(None)
+
+    def add_batch(self, name, function, *operands):
+        """Add a column computed by function from whole operand columns.
+
+        Only the players with every operand are passed to function, and the
+        column is None for the rest (including for a stat not extracted).
+        """
+        missing = [None] * self.count
+        columns = [self.columns.get(operand, missing) for operand in operands]
+        players = [
+            i for i in range(self.count) if all(c[i] is not None for c in columns)
+        ]
+
+        values = function(*([c[i] for i in players] for c in columns))
+        column = [None] * self.count
+        for i, value in zip(players, values):
+            column[i] = value
+        self.columns[name] = column
+
+
+def extract_batch(payloads, games=None, ratios=None, chunk_size=500, arrays=False):
+    """Yield the stats of each chunk of player payloads, as columns.
+
+    Each chunk is a dictionary of the players' UUIDs ("uuids") and the
+    number of players ("count"), and of each game's columns ("games"),
+    mapping each stat (nested stats named with dots, e.g. "prestige.remaining")
+    to its value for each player in order. A game that fails for a player
+    is logged, and its stats are None for that player.
+
+    Keyword arguments:
+        payloads: Iterable of player API responses, e.g. from read_jsonl
+        games: List of the games to extract, by name (default all, see GAMES)
+        ratios: Dictionary mapping games to the ratio columns to add, each
+                mapping the column's name to the names of the two stats
+        chunk_size: Number of players extracted before each chunk is yielded
+        arrays: Boolean of whether numeric columns are returned as NumPy
+                arrays when it is installed, for callers working with the
+                columns in Python rather than writing them (default False)
+
+    Raises ValueError if a game is unknown, or ratios are asked for a game
+    not being extracted.
+    """
+    unknown = set(games or ()) - set(GAMES)
+    if unknown:
+        raise ValueError(f"unknown games: {', '.join(sorted(unknown))}")
+    modules = {game: GAMES[game] for game in (games or GAMES)}
+
+    ratios = ratios or {}
+    unknown = ", ".join(sorted(set(ratios) - set(modules)))
+    if unknown:
+        raise ValueError(f"ratios for games not extracted: {unknown}")
+
+    payloads = iter(payloads)
+    while chunk := list(itertools.islice(payloads, chunk_size)):
+        uuids = []
+        columns = {game: Columns() for game in modules}
+
+        for player_api in chunk:
+            uuid = (player_api.get("player") or {}).get("uuid")
+            uuids.append(uuid)
+
+            for game, module in modules.items():
+                try:
+                    values = flatten(module.get_stats(player_api))
+                except Exception as e:  # One game failing must not lose the others
+                    logger.error(f"uuid: '{uuid}' - {game} - {e}")
+                    values = {}
+                columns[game].add(values)
+
+        # Levels replace the extractors' own, found for the whole column at once
+        for game, levels in LEVELS.items():
+            if game in columns:
+                for name, (xp, function) in levels.items():
+                    columns[game].add_batch(name, function, xp)
+
+        for game, game_ratios in ratios.items():
+            for name, (one, two) in game_ratios.items():
+                columns[game].add_batch(name, u.get_ratio_batch, one, two)
+
+        yield {
+            "uuids": uuids,
+            "count": len(chunk),
+            "games": {
+                game: {
+                    name: to_array(column) if arrays else column
+                    for name, column in game_columns.columns.items()
+                }
+                for game, game_columns in columns.items()
+            },
+        }
@@ -0,0 +1,90 @@
+"""Provides a memory-bounded cache of extracted stats.
+
+Each game's extracted stats are keyed by the player's UUID, a fingerprint
+of the raw payload they were extracted from and the version of the
+extraction code, so a result is only reused while all three are the same.
+Results are stored pickled, so every read is a fresh copy and the memory
+bound applies to their actual size.
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+
+from stats.api_functions.main.cache import MemoryBackend
+from stats.constants import on_reload
+
+STATS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONSTANTS_PATH = os.path.join(STATS_DIR, "..", "..", "constants", "stats.json")
+
+
+def get_code_version():
+    """Return a hash of the extraction code and the constants it reads."""
+    digest = hashlib.blake2b(digest_size=8)
+
+    paths = [CONSTANTS_PATH]
+    for root, dirs, files in os.walk(STATS_DIR):
+        dirs.sort()
+        paths += [os.path.join(root, f) for f in sorted(files) if f.endswith(".py")]
+
+    for path in paths:
+        digest.update(os.path.relpath(path, STATS_DIR).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+CODE_VERSION = get_code_version()
+
+
+def update_code_version():
+    """Recompute CODE_VERSION, so stats extracted with old constants are not reused."""
+    global CODE_VERSION
+    CODE_VERSION = get_code_version()
+
+
+on_reload("stats", update_code_version)
+
+
+def fingerprint(value):
+    """Return a hash identifying a decoded JSON value."""
+    data = json.dumps(value, separators=(",", ":")).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class DerivedCache:
+    """An LRU cache of extracted stats, bounded by entry count and total size.
+
+    Keyword arguments:
+        max_entries: Maximum number of extracted games held
+        max_bytes: Maximum total size of the held results
+    """
+
+    def __init__(self, max_entries=5000, max_bytes=32 * 1024 * 1024):
+        self.backend = MemoryBackend(max_entries, max_bytes)
+
+    def get(self, key):
+        """Return the cached stats for a key, or None."""
+        entry = self.backend.get(f"{key}:{CODE_VERSION}")
+        return pickle.loads(entry[1]) if entry is not None else None
+
+    def set(self, key, stats):
+        """Cache the stats extracted for a key."""
+        data = pickle.dumps(stats, pickle.HIGHEST_PROTOCOL)
+        self.backend.set(f"{key}:{CODE_VERSION}", time.time(), data)
+
+    def get_or_extract(self, key, extract):
+        """Return the cached stats for a key, calling extract() on a miss."""
+        stats = self.get(key)
+        if stats is None:
+            stats = extract()
+            self.set(key, stats)
+        return stats
+
+
+derived_cache = DerivedCache(
+    max_entries=int(os.getenv("STATS_CACHE_MAX_ENTRIES", 5000)),
+    max_bytes=int(os.getenv("STATS_CACHE_MAX_MB", 32)) * 1024 * 1024,
+)
@@ -1,11 +1,240 @@
-from .. import utilities as u, levelling as l
+from .. import utilities as u, levelling as l, schema as s
+from ..tables import Table, get_percentage_cell
 from stats.constants import get_constants
 
 
+STATS = s.compile_schema(
+    {
+        **s.fields(
+            # Main
+            "wins_bedwars",
+            "losses_bedwars",
+            "final_kills_bedwars",
+            "final_deaths_bedwars",
+            "kills_bedwars",
+            "deaths_bedwars",
+            "winstreak",
+            "Experience",
+            # More
+            "beds_broken_bedwars",
+            "beds_lost_bedwars",
+            "items_purchased_bedwars",
+            "void_final_kills_bedwars",
+            "entity_attack_final_kills_bedwars",
+            "void_final_deaths_bedwars",
+            "entity_attack_final_deaths_bedwars",
+            "eight_one_winstreak",
+            "eight_two_winstreak",
+            "four_three_winstreak",
+            "four_four_winstreak",
+            "bedwars_boxes",
+            "bedwars_christmas_boxes",
+            "bedwars_halloween_boxes",
+            "bedwars_easter_boxes",
+            "bedwars_lunar_boxes",
+            "coins",
+            "iron_resources_collected_bedwars",
+            "gold_resources_collected_bedwars",
+            "diamond_resources_collected_bedwars",
+            "emerald_resources_collected_bedwars",
+        ),
+        "games_played": s.total("wins_bedwars", "losses_bedwars"),
+        # Levelling and prestige
+        "level": s.call(l.bedwars_xp_to_level, "Experience"),
+        "prestige_formatted": s.call(l.bedwars_format_prestige, "level"),
+        # Ratios
+        "win_loss": s.ratio("wins_bedwars", "losses_bedwars"),
+        "kill_death": s.ratio("kills_bedwars", "deaths_bedwars"),
+        "final_kill_death": s.ratio("final_kills_bedwars", "final_deaths_bedwars"),
+        "beds_broken_lost": s.ratio("beds_broken_bedwars", "beds_lost_bedwars"),
+        "beds_win": s.ratio("beds_broken_bedwars", "wins_bedwars"),
+        "beds_game": s.ratio("beds_broken_bedwars", "games_played"),
+        "final_kills_win": s.ratio("final_kills_bedwars", "wins_bedwars"),
+        "final_kills_game": s.ratio("final_kills_bedwars", "games_played"),
+        "experience_win": s.ratio("Experience", "wins_bedwars"),
+        "experience_game": s.ratio("Experience", "games_played"),
+        "total_boxes": s.total(
+            "bedwars_boxes",
+            "bedwars_christmas_boxes",
+            "bedwars_halloween_boxes",
+            "bedwars_easter_boxes",
+            "bedwars_lunar_boxes",
+        ),
+    },
+    "bedwars_stats",
+)
+
+
+# ======================================================================================
+# TABLES
+# ======================================================================================
+
+MODES = {
+    "": "Overall",
+    "two_four_": "4v4",
+    "eight_one_": "Solo",
+    "eight_two_": "Doubles",
+    "four_three_": "3v3v3v3",
+    "four_four_": "4v4v4v4",
+}
+CARRIES_MODES = {
+    "": "Overall",
+    "two_four_": "4v4",
+    "eight_two_": "Doubles",
+    "four_three_": "3v3v3v3",
+    "four_four_": "4v4v4v4",
+}
+DREAM_MODES = {
+    "": {"castle": "Castle"},
+    "Rush": {
+        "eight_one_rush": "Rush Solo",
+        "eight_two_rush": "Rush Doubles",
+        "four_four_rush": "Rush 4v4v4v4",
+    },
+    "Ultimate": {
+        "eight_one_ultimate": "Ultimate Solo",
+        "eight_two_ultimate": "Ultimate Doubles",
+        "four_four_ultimate": "Ultimate 4v4v4v4",
+    },
+    "Lucky": {
+        "eight_two_lucky": "Lucky Doubles",
+        "four_four_lucky": "Lucky 4v4v4v4",
+    },
+    "Armed": {
+        "eight_two_armed": "Armed Doubles",
+        "four_four_armed": "Armed 4v4v4v4",
+    },
+}
+
+HEAD = [
+    "Mode",
+    "Wins",
+    "Losses",
+    "W/L",
+    "Final Kills",
+    "Final Deaths",
+    "Final K/D",
+    "Kills",
+    "Deaths",
+    "K/D",
+    "Beds Broken",
+]
+FIELDS = [
+    "wins",
+    "losses",
+    "final_kills",
+    "final_deaths",
+    "kills",
+    "deaths",
+    "beds_broken",
+]
+CELLS = [
+    "wins",
+    "losses",
+    s.ratio("wins", "losses"),
+    "final_kills",
+    "final_deaths",
+    s.ratio("final_kills", "final_deaths"),
+    "kills",
+    "deaths",
+    s.ratio("kills", "deaths"),
+    "beds_broken",
+]
+BUTTONS = {
+    "W/L": [0, 1, 2, 3],
+    "FK/D": [0, 4, 5, 6],
+    "K/D": [0, 7, 8, 9],
+    "Beds": [0, 10],
+}
+
+TABLE = Table(
+    "tableBedWars",
+    HEAD,
+    FIELDS,
+    CELLS,
+    key="{mode}{field}_bedwars",
+    green={3: 10, 6: 30},
+    boldRows=[1],
+    percent={3: "Win %"},
+    decimal=[6, 9],
+    buttons=BUTTONS,
+)
+
+BEDS_TABLE = Table(
+    "tableBedsBedWars",
+    [
+        "Mode",
+        "Beds Broken",
+        "Beds Lost",
+        "Beds Broken/Beds Lost",
+        "Beds Broken/Win",
+        "Beds Broken/Game",
+    ],
+    ["wins", "losses", "beds_broken", "beds_lost"],
+    [
+        "beds_broken",
+        "beds_lost",
+        s.ratio("beds_broken", "beds_lost"),
+        s.ratio("beds_broken", "wins"),
+        s.ratio("beds_broken", "games"),
+    ],
+    key="{mode}{field}_bedwars",
+    derived={"games": s.total("wins", "losses")},
+    boldRows=[1],
+    decimal=[3, 4, 5],
+    buttons={
+        "Broken": [0, 1],
+        "Lost": [0, 2],
+        "BB/BL": [0, 3],
+        "BB/W": [0, 4],
+        "BB/G": [0, 5],
+    },
+)
+
+
+CARRIES_TABLE = Table(
+    "tableCarriesBedWars",
+    ["Mode", "Carries", "Wins", "% of Wins"],
+    ["wins", "losses", "final_deaths"],
+    ["carries", "wins", s.call(get_percentage_cell, "carries", "wins")],
+    key="{mode}{field}_bedwars",
+    derived={
+        "carries": s.call(
+            lambda deaths, losses: abs(deaths - losses), "final_deaths", "losses"
+        )
+    },
+    boldRows=[1],
+    width=520,
+)
+
+DREAM_TABLE = Table(
+    "tableDreamBedWars",
+    HEAD,
+    FIELDS,
+    CELLS,
+    key="{mode}_{field}_bedwars",
+    totals=True,
+    green={3: 10, 6: 30},
+    boldRows=[2, 6, 10, 13],
+    percent={3: "Win %"},
+    decimal=[6, 9],
+    buttons=BUTTONS,
+)
+
+
+def get_prestige(player_api):
+    """Return the formatted BedWars prestige without extracting any other stats."""
+    try:
+        bedwars = player_api["player"]["stats"].get("Bedwars", {})
+    except LookupError:
+        bedwars = {}
+
+    level = l.bedwars_xp_to_level(bedwars.get("Experience", 0))
+    return {"prestige_formatted": l.bedwars_format_prestige(level)}
+
+
 def get_stats(player_api):
     """Extract and calculate all BedWars stats from a player API."""
-    stats = {}
-
     # If player has not played BedWars, prepare empty dict
     try:
         bedwars = player_api["player"]["stats"].get("Bedwars", {})
@@ -16,77 +245,7 @@ def get_stats(player_api):
     # GENERAL
     # ==================================================================================
 
-    stats_needed = [
-        # Main
-        "wins_bedwars",
-        "losses_bedwars",
-        "final_kills_bedwars",
-        "final_deaths_bedwars",
-        "kills_bedwars",
-        "deaths_bedwars",
-        "winstreak",
-        "Experience",
-        # More
-        "beds_broken_bedwars",
-        "beds_lost_bedwars",
-        "items_purchased_bedwars",
-        "void_final_kills_bedwars",
-        "entity_attack_final_kills_bedwars",
-        "void_final_deaths_bedwars",
-        "entity_attack_final_deaths_bedwars",
-        "eight_one_winstreak",
-        "eight_two_winstreak",
-        "four_three_winstreak",
-        "four_four_winstreak",
-        "bedwars_boxes",
-        "bedwars_christmas_boxes",
-        "bedwars_halloween_boxes",
-        "bedwars_easter_boxes",
-        "bedwars_lunar_boxes",
-        "coins",
-        "iron_resources_collected_bedwars",
-        "gold_resources_collected_bedwars",
-        "diamond_resources_collected_bedwars",
-        "emerald_resources_collected_bedwars",
-    ]
-
-    # Collect all initial stats
-    for stat in stats_needed:
-        stats[stat] = bedwars.get(stat, 0)
-
-    stats["games_played"] = stats["wins_bedwars"] + stats["losses_bedwars"]
-
-    # Levelling and prestige
-    stats["level"] = l.bedwars_xp_to_level(stats["Experience"])
-    stats["prestige_formatted"] = l.bedwars_format_prestige(stats["level"])
-
-    # Calculate ratios
-    stats = u.get_ratios(
-        stats,
-        {
-            "win_loss": ["wins_bedwars", "losses_bedwars"],
-            "kill_death": ["kills_bedwars", "deaths_bedwars"],
-            "final_kill_death": ["final_kills_bedwars", "final_deaths_bedwars"],
-            "beds_broken_lost": ["beds_broken_bedwars", "beds_lost_bedwars"],
-            "beds_win": ["beds_broken_bedwars", "wins_bedwars"],
-            "beds_game": ["beds_broken_bedwars", "games_played"],
-            "final_kills_win": ["final_kills_bedwars", "wins_bedwars"],
-            "final_kills_game": ["final_kills_bedwars", "games_played"],
-            "experience_win": ["Experience", "wins_bedwars"],
-            "experience_game": ["Experience", "games_played"],
-        },
-    )
-
-    # Total boxes
-    stats["total_boxes"] = 0
-    for box in [
-        "bedwars_boxes",
-        "bedwars_christmas_boxes",
-        "bedwars_halloween_boxes",
-        "bedwars_easter_boxes",
-        "bedwars_lunar_boxes",
-    ]:
-        stats["total_boxes"] += stats[box]
+    stats = STATS(bedwars)
 
     # ==================================================================================
     # PRESTIGE
@@ -158,164 +317,20 @@ def get_stats(player_api):
     # TABLE
     # ==================================================================================
 
-    head = [
-        "Mode",
-        "Wins",
-        "Losses",
-        "W/L",
-        "Final Kills",
-        "Final Deaths",
-        "Final K/D",
-        "Kills",
-        "Deaths",
-        "K/D",
-        "Beds Broken",
-    ]
-    modes = {
-        "": "Overall",
-        "two_four_": "4v4",
-        "eight_one_": "Solo",
-        "eight_two_": "Doubles",
-        "four_three_": "3v3v3v3",
-        "four_four_": "4v4v4v4",
-    }
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in [
-            "wins",
-            "losses",
-            "final_kills",
-            "final_deaths",
-            "kills",
-            "deaths",
-            "beds_broken",
-        ]:
-            row[col] = bedwars.get(f"{mode}{col}_bedwars", 0)
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["final_kills"],
-                row["final_deaths"],
-                u.get_ratio(row["final_kills"], row["final_deaths"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["beds_broken"],
-            ]
-        )
-
-    stats["table"] = {
-        "id": "tableBedWars",
-        "head": head,
-        "rows": rows,
-        "green": {3: 10, 6: 30},
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "decimal": [6, 9],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "FK/D": [0, 4, 5, 6],
-            "K/D": [0, 7, 8, 9],
-            "Beds": [0, 10],
-        },
-    }
+    stats["table"] = TABLE.as_dict(TABLE.rows(bedwars, MODES))
 
     # ==================================================================================
     # BEDS
     # ==================================================================================
 
-    head = [
-        "Mode",
-        "Beds Broken",
-        "Beds Lost",
-        "Beds Broken/Beds Lost",
-        "Beds Broken/Win",
-        "Beds Broken/Game",
-    ]
-    modes = {
-        "": "Overall",
-        "two_four_": "4v4",
-        "eight_one_": "Solo",
-        "eight_two_": "Doubles",
-        "four_three_": "3v3v3v3",
-        "four_four_": "4v4v4v4",
-    }
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "losses", "beds_broken", "beds_lost"]:
-            row[col] = bedwars.get(f"{mode}{col}_bedwars", 0)
-
-        rows.append(
-            [
-                modes[mode],
-                row["beds_broken"],
-                row["beds_lost"],
-                u.get_ratio(row["beds_broken"], row["beds_lost"]),
-                u.get_ratio(row["beds_broken"], row["wins"]),
-                u.get_ratio(row["beds_broken"], row["wins"] + row["losses"]),
-            ]
-        )
-
-    stats["table_beds"] = {
-        "id": "tableBedsBedWars",
-        "head": head,
-        "rows": rows,
-        "boldRows": [1],
-        "decimal": [3, 4, 5],
-        "buttons": {
-            "Broken": [0, 1],
-            "Lost": [0, 2],
-            "BB/BL": [0, 3],
-            "BB/W": [0, 4],
-            "BB/G": [0, 5],
-        },
-    }
+    stats["table_beds"] = BEDS_TABLE.as_dict(BEDS_TABLE.rows(bedwars, MODES))
 
     # ==================================================================================
     # CARRIES
     # ==================================================================================
 
-    head = ["Mode", "Carries", "Wins", "% of Wins"]
-    modes = {
-        "": "Overall",
-        "two_four_": "4v4",
-        "eight_two_": "Doubles",
-        "four_three_": "3v3v3v3",
-        "four_four_": "4v4v4v4",
-    }
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "losses", "final_deaths"]:
-            row[col] = bedwars.get(f"{mode}{col}_bedwars", 0)
-
-        carries = abs(row["final_deaths"] - row["losses"])
-
-        rows.append(
-            [
-                modes[mode],
-                carries,
-                row["wins"],
-                f"{u.get_percentage(carries, row['wins'], 2)}%",
-            ]
-        )
-
-    stats["table_carries"] = {
-        "id": "tableCarriesBedWars",
-        "head": head,
-        "rows": rows,
-        "boldRows": [1],
-        "width": 520,
-    }
+    rows = CARRIES_TABLE.rows(bedwars, CARRIES_MODES)
+    stats["table_carries"] = CARRIES_TABLE.as_dict(rows)
 
     total_carries = 0
     for row in rows[1:]:
@@ -327,121 +342,15 @@ def get_stats(player_api):
     # DREAM
     # ==================================================================================
 
-    head = [
-        "Mode",
-        "Wins",
-        "Losses",
-        "W/L",
-        "Final Kills",
-        "Final Deaths",
-        "Final K/D",
-        "Kills",
-        "Deaths",
-        "K/D",
-        "Beds Broken",
-    ]
-    modes = {
-        "castle": "Castle",
-        "eight_one_rush": "Rush Solo",
-        "eight_two_rush": "Rush Doubles",
-        "four_four_rush": "Rush 4v4v4v4",
-        "eight_one_ultimate": "Ultimate Solo",
-        "eight_two_ultimate": "Ultimate Doubles",
-        "four_four_ultimate": "Ultimate 4v4v4v4",
-        "eight_two_lucky": "Lucky Doubles",
-        "four_four_lucky": "Lucky 4v4v4v4",
-        "eight_two_armed": "Armed Doubles",
-        "four_four_armed": "Armed 4v4v4v4",
-    }
-
+    # Each group of modes is preceded by its overall row, totalled from its modes
     rows = []
-    for mode in modes:
-        row = {}
-        for col in [
-            "wins",
-            "losses",
-            "final_kills",
-            "final_deaths",
-            "kills",
-            "deaths",
-            "beds_broken",
-        ]:
-            row[col] = bedwars.get(f"{mode}_{col}_bedwars", 0)
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["final_kills"],
-                row["final_deaths"],
-                u.get_ratio(row["final_kills"], row["final_deaths"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["beds_broken"],
-            ]
-        )
-
-    # Overalls
-    overalls = {
-        "Rush": {"index": 1, "rows": [1, 2, 3]},
-        "Ultimate": {"index": 5, "rows": [5, 6, 7]},
-        "Lucky": {"index": 9, "rows": [9, 10]},
-        "Armed": {"index": 12, "rows": [12, 13]},
-    }
-
-    for overall in overalls:
-        row = {}
-        cols = {
-            "wins": 1,
-            "losses": 2,
-            "final_kills": 4,
-            "final_deaths": 5,
-            "kills": 7,
-            "deaths": 8,
-            "beds_broken": 10,
-        }
-
-        for col in cols:
-            value = 0
-            for mode in overalls[overall]["rows"]:
-                value += rows[mode][cols[col]]
-            row[col] = value
-
-        rows.insert(
-            overalls[overall]["index"],
-            [
-                f"{overall} Overall",
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["final_kills"],
-                row["final_deaths"],
-                u.get_ratio(row["final_kills"], row["final_deaths"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["beds_broken"],
-            ],
-        )
+    for group, modes in DREAM_MODES.items():
+        group_rows, totals = DREAM_TABLE.rows_and_totals(bedwars, modes)
+        if group:
+            rows.append(DREAM_TABLE.row(f"{group} Overall", totals))
+        rows += group_rows
 
-    stats["table_dream"] = {
-        "id": "tableDreamBedWars",
-        "head": head,
-        "rows": rows,
-        "green": {3: 10, 6: 30},
-        "boldRows": [2, 6, 10, 13],
-        "percent": {3: "Win %"},
-        "decimal": [6, 9],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "FK/D": [0, 4, 5, 6],
-            "K/D": [0, 7, 8, 9],
-            "Beds": [0, 10],
-        },
-    }
+    stats["table_dream"] = DREAM_TABLE.as_dict(rows)
 
     # ==================================================================================
     # PRACTICE MODE
@@ -1,17 +1,9 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table, get_percentage_cell
 
 
-def get_stats(player_api):
-    """Extract and calculate all arcade stats from a player API."""
-    stats = {}
-
-    # If player has not played arcade, prepare empty dict
-    try:
-        arcade = player_api["player"]["stats"]["Arcade"]
-    except LookupError:
-        arcade = {}
-
-    stats_needed = [
+STATS = s.compile_schema(
+    s.fields(
         "coins",
         # Blocking Dead
         "wins_dayone",
@@ -114,10 +106,152 @@ def get_stats(player_api):
         "times_knocked_down_zombies",
         "doors_opened_zombies",
         "windows_repaired_zombies",
+    ),
+    "arcade_stats",
+)
+
+
+PIXEL_PARTY_MODES = {
+    "": "Overall",
+    "_normal": "Normal",
+    "_hyper": "Hyper",
+}
+
+PIXEL_PARTY_TABLE = Table(
+    "tablePixelPartyArcade",
+    ["Mode", "Wins", "Losses", "W/L", "Powerups", "Rounds"],
+    ["games_played", "wins", "power_ups_collected", "rounds_completed"],
+    [
+        "wins",
+        "losses",
+        s.ratio("wins", "losses"),
+        "power_ups_collected",
+        "rounds_completed",
+    ],
+    derived={"losses": s.difference("games_played", "wins")},
+    boldRows=[1],
+    percent={3: "Win %"},
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "Powerups": [0, 4],
+        "Rounds": [0, 5],
+    },
+)
+
+ZOMBIES_MAPS = {
+    "deadend": "<span class='gold'>Deadend</span>",
+    "badblood": "<span class='red'>Badblood</span>",
+    "alienarcadium": "<span class='darkGreen'>Alienarcadium</span>",
+}
+
+ZOMBIES_STATS = [
+    "best_round",
+    "wins",
+    "deaths",
+    "zombie_kills",
+    "players_revived",
+    "times_knocked_down",
+    "doors_opened",
+    "windows_repaired",
+]
+
+ZOMBIES_TABLE = Table(
+    "tableZombiesArcade",
+    [
+        "Map",
+        "Best Round",
+        "Wins",
+        "Deaths",
+        "Zombie Kills",
+        "Revivals",
+        "Downs",
+        "Doors",
+        "Windows",
+    ],
+    ZOMBIES_STATS,
+    ZOMBIES_STATS,
+    key="{field}_zombies_{mode}",
+    boldCols=[0],
+    buttons={
+        "Core": [0, 1, 2, 3],
+        "Kills": [0, 4],
+        "Revivals/Downs": [0, 5, 6],
+        "Doors/Windows": [0, 7, 8],
+    },
+)
+
+ZOMBIES_FORMATTING = {"tnt": "TNT", "tnt_baby": "TNT Baby"}
+ZOMBIES_TYPES = {
+    zombie: ZOMBIES_FORMATTING.get(zombie, zombie.replace("_", " ").title())
+    for zombie in [
+        "basic",
+        "blaze",
+        "blob",
+        "broodmother",
+        "cave_spider",
+        "charged_creeper",
+        "chgluglu",
+        "clown",
+        "empowered",
+        "ender",
+        "endermite",
+        "family_daughter",
+        "fire",
+        "ghast",
+        "giant",
+        "guardian",
+        "herobrine_minion",
+        "inferno",
+        "invisible",
+        "iron_golem",
+        "magma",
+        "magma_cube",
+        "mega_magma",
+        "mega_blob",
+        "pig_zombie",
+        "rainbow",
+        "sentinel",
+        "skelefish",
+        "skeleton",
+        "slime",
+        "slime_zombie",
+        "space_blaster",
+        "space_grunt",
+        "tnt",
+        "tnt_baby",
+        "werewolf",
+        "witch",
+        "wither",
+        "wither_skeleton",
+        "wither_zombie",
+        "wolf",
+        "wolf_pet",
+        "worm",
+        "worm_small",
     ]
+}
+
+
+ZOMBIES_TYPES_TABLE = Table(
+    "tableZombiesTypesArcade",
+    ["Zombie Type", "Kills", "% of Kills"],
+    ["kills"],
+    ["kills", s.call(get_percentage_cell, "kills", "zombie_kills")],
+    key="{mode}_zombie_kills_zombies",
+    params=("zombie_kills",),
+    boldCols=[0],
+)
+
+
+def get_stats(player_api):
+    """Extract and calculate all arcade stats from a player API."""
+    # If player has not played arcade, prepare empty dict
+    try:
+        arcade = player_api["player"]["stats"]["Arcade"]
+    except LookupError:
+        arcade = {}
 
-    for stat in stats_needed:
-        stats[stat] = arcade.get(stat, 0)
+    stats = STATS(arcade)
 
     # Blocking Dead
     stats["melee_weapon"] = arcade.get("melee_weapon", "None").replace("_", " ").title()
@@ -181,44 +315,9 @@ def get_stats(player_api):
     )
 
     # Pixel Party Table
-    pixel_party_head = ["Mode", "Wins", "Losses", "W/L", "Powerups", "Rounds"]
-    pixel_party_modes = {
-        "": "Overall",
-        "_normal": "Normal",
-        "_hyper": "Hyper",
-    }
-
-    pixel_party_rows = []
-    for mode in pixel_party_modes:
-        row = {}
-        for col in pixel_party_stats:
-            row[col] = pixel_party.get(col + mode, 0)
-
-        row["losses"] = row["games_played"] - row["wins"]
-
-        pixel_party_rows.append(
-            [
-                pixel_party_modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["power_ups_collected"],
-                row["rounds_completed"],
-            ]
-        )
-
-    stats["table_pixel_party"] = {
-        "id": "tablePixelPartyArcade",
-        "head": pixel_party_head,
-        "rows": pixel_party_rows,
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "Powerups": [0, 4],
-            "Rounds": [0, 5],
-        },
-    }
+    stats["table_pixel_party"] = PIXEL_PARTY_TABLE.as_dict(
+        PIXEL_PARTY_TABLE.rows(pixel_party, PIXEL_PARTY_MODES)
+    )
 
     # Throw Out
     stats["kill_death_throw_out"] = u.get_ratio(
@@ -243,134 +342,14 @@ def get_stats(player_api):
         stats["headshots_zombies"], stats["bullets_shot_zombies"]
     )
 
-    # Zombies Table
-    zombies_stats = [
-        "best_round",
-        "wins",
-        "deaths",
-        "zombie_kills",
-        "players_revived",
-        "times_knocked_down",
-        "doors_opened",
-        "windows_repaired",
-    ]
-    zombies_head = [
-        "Map",
-        "Best Round",
-        "Wins",
-        "Deaths",
-        "Zombie Kills",
-        "Revivals",
-        "Downs",
-        "Doors",
-        "Windows",
-    ]
-    zombies_maps = {
-        "deadend": "<span class='gold'>Deadend</span>",
-        "badblood": "<span class='red'>Badblood</span>",
-        "alienarcadium": "<span class='darkGreen'>Alienarcadium</span>",
-    }
-
-    zombies_rows = []
-    for map in zombies_maps:
-        row = {}
-        for col in zombies_stats:
-            row[col] = arcade.get(f"{col}_zombies_{map}", 0)
-
-        zombies_rows.append(
-            [
-                zombies_maps[map],
-                row["best_round"],
-                row["wins"],
-                row["deaths"],
-                row["zombie_kills"],
-                row["players_revived"],
-                row["times_knocked_down"],
-                row["doors_opened"],
-                row["windows_repaired"],
-            ]
-        )
-
-    stats["table_zombies"] = {
-        "id": "tableZombiesArcade",
-        "head": zombies_head,
-        "rows": zombies_rows,
-        "boldCols": [0],
-        "buttons": {
-            "Core": [0, 1, 2, 3],
-            "Kills": [0, 4],
-            "Revivals/Downs": [0, 5, 6],
-            "Doors/Windows": [0, 7, 8],
-        },
-    }
-
-    # Zombies Types Table
-    zombies_types_stats = [
-        "basic",
-        "blaze",
-        "blob",
-        "broodmother",
-        "cave_spider",
-        "charged_creeper",
-        "chgluglu",
-        "clown",
-        "empowered",
-        "ender",
-        "endermite",
-        "family_daughter",
-        "fire",
-        "ghast",
-        "giant",
-        "guardian",
-        "herobrine_minion",
-        "inferno",
-        "invisible",
-        "iron_golem",
-        "magma",
-        "magma_cube",
-        "mega_magma",
-        "mega_blob",
-        "pig_zombie",
-        "rainbow",
-        "sentinel",
-        "skelefish",
-        "skeleton",
-        "slime",
-        "slime_zombie",
-        "space_blaster",
-        "space_grunt",
-        "tnt",
-        "tnt_baby",
-        "werewolf",
-        "witch",
-        "wither",
-        "wither_skeleton",
-        "wither_zombie",
-        "wolf",
-        "wolf_pet",
-        "worm",
-        "worm_small",
-    ]
-    zombies_types_head = ["Zombie Type", "Kills", "% of Kills"]
-    zombies_types_rows = []
-
-    zombies_formatting = {"tnt": "TNT", "tnt_baby": "TNT Baby"}
-
-    for zombie in zombies_types_stats:
-        zombies = arcade.get(f"{zombie}_zombie_kills_zombies", 0)
-        zombies_types_rows.append(
-            [
-                zombies_formatting.get(zombie, zombie.replace("_", " ").title()),
-                zombies,
-                f"{u.get_percentage(zombies, stats['zombie_kills_zombies'])}%",
-            ]
+    # Zombies Tables
+    stats["table_zombies"] = ZOMBIES_TABLE.as_dict(
+        ZOMBIES_TABLE.rows(arcade, ZOMBIES_MAPS)
+    )
+    stats["table_zombies_types"] = ZOMBIES_TYPES_TABLE.as_dict(
+        ZOMBIES_TYPES_TABLE.rows(
+            arcade, ZOMBIES_TYPES, zombie_kills=stats["zombie_kills_zombies"]
         )
-
-    stats["table_zombies_types"] = {
-        "id": "tableZombiesTypesArcade",
-        "head": zombies_types_head,
-        "rows": zombies_types_rows,
-        "boldCols": [0],
-    }
+    )
 
     return stats
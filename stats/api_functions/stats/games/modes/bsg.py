@@ -1,4 +1,121 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
+
+# Kits mapped to their (empty) labels, as each row's first cell depends on its level
+KITS = {
+    kit: ()
+    for kit in [
+        "arachnologist",
+        "archer",
+        "armorer",
+        "astronaut",
+        "baker",
+        "blaze",
+        "creepertamer",
+        "diver",
+        "donkeytamer",
+        "farmer",
+        "florist",
+        "golem",
+        "guardian",
+        "horsetamer",
+        "hunter",
+        "hype train",
+        "jockey",
+        "knight",
+        "meatmaster",
+        "necromancer",
+        "paladin",
+        "phoenix",
+        "pigman",
+        "ranger",
+        "reaper",
+        "reddragon",
+        "rogue",
+        "scout",
+        "shadow knight",
+        "slimeyslime",
+        "snowman",
+        "speleologist ",
+        "tim ",
+        "toxicologist",
+        "troll",
+        "viking",
+        "warlock",
+        "warrior",
+        "wolftamer",
+    ]
+}
+
+
+def get_kit_level(level, exp):
+    """Return a kit's level from the API if given, otherwise from its EXP."""
+    if level is None:
+        level = -1
+        for req in [0, 100, 250, 500, 1000, 1500, 2000, 2500, 5000, 10000]:
+            if exp > req:
+                level += 1
+            else:
+                break
+    return level + 1
+
+
+def get_kit_label(kit, level):
+    """Return a kit's name and level as a table cell."""
+    colour = "darkRed" if level >= 10 else ""
+    return f"<span class='{colour}'>{kit.title()} {u.romanize(level)}</span>"
+
+
+def get_kit_prestige(prestige):
+    """Return a kit's prestige as a table cell."""
+    if prestige > 0:
+        return f"<span class='darkRed bold'>{u.romanize(prestige)}</span>"
+    return "<span class='gray'>None</span>"
+
+
+TABLE = Table(
+    "tableBSG",
+    ["Kit", "Wins", "Losses", "W/L", "Kills", "EXP", "Prestige", "Playtime"],
+    [
+        "time_played",
+        "exp",
+        "wins",
+        "wins_teams",
+        "games_played",
+        "kills",
+        "level",
+        "prestige",
+    ],
+    [
+        s.call(get_kit_label, "mode", "level"),
+        "wins",
+        "losses",
+        s.ratio("wins", "losses"),
+        "kills",
+        "exp",
+        s.call(get_kit_prestige, "prestige"),
+        "time_played",
+    ],
+    key="{field}_{mode}",
+    keys={"level": "{mode}", "prestige": "p{mode}"},
+    defaults={"level": None},
+    derived={
+        "level": s.call(get_kit_level, "level", "exp"),
+        "wins": s.total("wins", "wins_teams"),
+        "losses": s.difference("games_played", "wins"),
+    },
+    required="time_played",
+    sort=1,
+    boldCols=[0],
+    percent={3: "Win %"},
+    duration=[7],
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "Kills": [0, 4],
+        "EXP/Prestige": [0, 5, 6],
+        "Playtime": [0, 7],
+    },
+)
 
 
 def get_stats(player_api):
@@ -44,113 +161,10 @@ def get_stats(player_api):
     )
     stats["damage_dealt_taken"] = u.get_ratio(stats["damage"], stats["damage_taken"])
 
-    # Table
-    def get_bsg_kit_level(exp):
-        level = 0
-        for req in [0, 100, 250, 500, 1000, 1500, 2000, 2500, 5000, 10000]:
-            if exp > req:
-                level += 1
-            else:
-                break
-        return level
-
-    bsg_head = ["Kit", "Wins", "Losses", "W/L", "Kills", "EXP", "Prestige", "Playtime"]
-    bsg_cols = ["exp", "wins", "wins_teams", "games_played", "kills", "time_played"]
-    bsg_kits = [
-        "arachnologist",
-        "archer",
-        "armorer",
-        "astronaut",
-        "baker",
-        "blaze",
-        "creepertamer",
-        "diver",
-        "donkeytamer",
-        "farmer",
-        "florist",
-        "golem",
-        "guardian",
-        "horsetamer",
-        "hunter",
-        "hype train",
-        "jockey",
-        "knight",
-        "meatmaster",
-        "necromancer",
-        "paladin",
-        "phoenix",
-        "pigman",
-        "ranger",
-        "reaper",
-        "reddragon",
-        "rogue",
-        "scout",
-        "shadow knight",
-        "slimeyslime",
-        "snowman",
-        "speleologist ",
-        "tim ",
-        "toxicologist",
-        "troll",
-        "viking",
-        "warlock",
-        "warrior",
-        "wolftamer",
-    ]
-
-    bsg_rows = []
-    for kit in bsg_kits:
-        time_played = bsg.get(f"time_played_{kit}", -1)
-
-        if time_played != -1:
-            row = {}
-
-            for col in bsg_cols:
-                row[col] = bsg.get(f"{col}_{kit}", 0)
-
-            # Get level from API if given, otherwise calculate
-            row["level"] = bsg.get(kit, get_bsg_kit_level(row["exp"]) - 1) + 1
-
-            # Additional stats requiring manipulation
-            row["prestige"] = bsg.get(f"p{kit}", 0)
-            row["wins"] = row["wins"] + row["wins_teams"]
-            row["losses"] = row["games_played"] - row["wins"]
-
-            # Insert rows to table
-            bsg_rows.append(
-                [
-                    f"<span class='{'darkRed' if row['level'] >= 10 else ''}'>{kit.title()} {u.romanize(row['level'])}</span>",
-                    row["wins"],
-                    row["losses"],
-                    u.get_ratio(row["wins"], row["losses"]),
-                    row["kills"],
-                    row["exp"],
-                    f"<span class='darkRed bold'>{u.romanize(row['prestige'])}</span>"
-                    if row["prestige"] > 0
-                    else "<span class='gray'>None</span>",
-                    row["time_played"],
-                ]
-            )
-
-    # Sort kits by wins
-    bsg_rows_sorted = []
-    if len(bsg_rows) > 0:
+    # Table, of the kits played sorted by wins
+    rows = TABLE.rows(bsg, KITS)
+    if len(rows) > 0:
         stats["played_kits"] = "Yes"  # Table is shown
-        bsg_rows_sorted = sorted(bsg_rows, key=lambda x: x[1], reverse=True)
-
-    stats["table"] = {
-        "id": "tableBSG",
-        "head": bsg_head,
-        "rows": bsg_rows_sorted,
-        "boldCols": [0],
-        "percent": {3: "Win %"},
-        "duration": [7],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "Kills": [0, 4],
-            "EXP/Prestige": [0, 5, 6],
-            "Playtime": [0, 7],
-        },
-    }
+    stats["table"] = TABLE.as_dict(rows)
 
     return stats
@@ -1,38 +1,38 @@
-from ... import utilities as u
+from ... import schema as s
 from stats.constants import get_constants
 
 
+STATS = s.compile_schema(
+    {
+        **s.fields(
+            "score",
+            "coins",
+            "wins",
+            "games_played",
+            "total_votes",
+            "wins_guess_the_build",
+            "correct_guesses",
+            "super_votes",
+            "wins_solo_normal",
+            "wins_teams_normal",
+            "wins_solo_pro",
+        ),
+        "losses": s.difference("games_played", "wins"),
+        "win_loss": s.ratio("wins", "losses"),
+    },
+    "buildbattle_stats",
+)
+
+
 def get_stats(player_api):
     """Extract and calculate build battle stats from a player API."""
-    stats = {}
-
     # If player has not played build battle, prepare empty dict
     try:
         buildbattle = player_api["player"]["stats"]["BuildBattle"]
     except LookupError:
         buildbattle = {}
 
-    stats = {}
-
-    stats_needed = [
-        "score",
-        "coins",
-        "wins",
-        "games_played",
-        "total_votes",
-        "wins_guess_the_build",
-        "correct_guesses",
-        "super_votes",
-        "wins_solo_normal",
-        "wins_teams_normal",
-        "wins_solo_pro",
-    ]
-
-    for stat in stats_needed:
-        stats[stat] = buildbattle.get(stat, 0)
-
-    stats["losses"] = stats["games_played"] - stats["wins"]
-    stats["win_loss"] = u.get_ratio(stats["wins"], stats["losses"])
+    stats = STATS(buildbattle)
 
     # Titles
     TITLES = get_constants("stats")["modes"]["buildBattle"]["titles"]
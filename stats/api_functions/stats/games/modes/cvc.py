@@ -1,7 +1,42 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
 from stats.constants import get_constants
 
 
+MODE_STATS = [
+    "game_wins",
+    "kills",
+    "deaths",
+    "assists",
+    "cop_kills",
+    "criminal_kills",
+]
+MODES = {
+    "": "Defusal",
+    "_deathmatch": "Team Deathmatch",
+}
+
+TABLE = Table(
+    "tableCVC",
+    ["Mode", "Wins", "Kills", "Deaths", "K/D", "Cop Kills", "Criminal Kills"],
+    MODE_STATS,
+    [
+        "game_wins",
+        "kills",
+        "deaths",
+        s.ratio("kills", "deaths"),
+        "cop_kills",
+        "criminal_kills",
+    ],
+    boldRows=[1],
+    buttons={
+        "Wins": [0, 1],
+        "K/D": [0, 2, 3, 4],
+        "Kill Type": [0, 5, 6],
+    },
+)
+
+
 def get_stats(player_api):
     """Extract and calculate all CVC stats from a player API."""
     stats = {}
@@ -24,15 +59,7 @@ def get_stats(player_api):
     for stat in stats_needed:
         stats[stat] = cvc.get(stat, 0)
 
-    cvc_mode_stats = [
-        "game_wins",
-        "kills",
-        "deaths",
-        "assists",
-        "cop_kills",
-        "criminal_kills",
-    ]
-    for stat in cvc_mode_stats:
+    for stat in MODE_STATS:
         stats[stat] = cvc.get(stat, 0) + cvc.get(f"{stat}_deathmatch", 0)
 
     stats["kill_death"] = u.get_ratio(stats["kills"], stats["deaths"])
@@ -41,54 +68,9 @@ def get_stats(player_api):
     )
 
     # Table
-    cvc_head = ["Mode", "Wins", "Kills", "Deaths", "K/D", "Cop Kills", "Criminal Kills"]
-    cvc_modes = {
-        "": "Defusal",
-        "_deathmatch": "Team Deathmatch",
-    }
-
-    cvc_rows = []
-    for mode in cvc_modes:
-        row = {}
-        for col in cvc_mode_stats:
-            row[col] = cvc.get(f"{col}{mode}", 0)
-
-        cvc_rows.append(
-            [
-                cvc_modes[mode],
-                row["game_wins"],
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["cop_kills"],
-                row["criminal_kills"],
-            ]
-        )
-
-    cvc_rows.insert(
-        0,
-        [
-            "Overall",
-            stats["game_wins"],
-            stats["kills"],
-            stats["deaths"],
-            stats["kill_death"],
-            stats["cop_kills"],
-            stats["criminal_kills"],
-        ],
-    )
-
-    stats["table"] = {
-        "id": "tableCVC",
-        "head": cvc_head,
-        "rows": cvc_rows,
-        "boldRows": [1],
-        "buttons": {
-            "Wins": [0, 1],
-            "K/D": [0, 2, 3, 4],
-            "Kill Type": [0, 5, 6],
-        },
-    }
+    rows = TABLE.rows(cvc, MODES)
+    rows.insert(0, TABLE.row("Overall", stats))
+    stats["table"] = TABLE.as_dict(rows)
 
     # Weapons
     WEAPONS = get_constants("stats")["modes"]["cvc"]["weapons"]
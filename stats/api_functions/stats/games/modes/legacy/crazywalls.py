@@ -1,4 +1,35 @@
-from .... import utilities as u
+from .... import utilities as u, schema as s
+from ....tables import Table
+
+
+MODES = {
+    "solo": "Solo",
+    "solo_chaos": "Solo Lucky",
+    "team": "Team",
+    "team_chaos": "Team Lucky",
+}
+
+TABLE = Table(
+    "tableCrazyWalls",
+    ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"],
+    ["wins", "losses", "kills", "deaths"],
+    [
+        "wins",
+        "losses",
+        s.ratio("wins", "losses"),
+        "kills",
+        "deaths",
+        s.ratio("kills", "deaths"),
+    ],
+    key="crazywalls_{field}_{mode}",
+    boldRows=[1],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "K/D": [0, 4, 5, 6],
+    },
+)
 
 
 def get_stats(player_api):
@@ -34,57 +65,8 @@ def get_stats(player_api):
     )
 
     # Table
-    cw_head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
-    cw_cols = ["wins", "losses", "kills", "deaths"]
-    cw_modes = {
-        "solo": "Solo",
-        "solo_chaos": "Solo Lucky",
-        "team": "Team",
-        "team_chaos": "Team Lucky",
-    }
-
-    cw_rows = []
-    for mode in cw_modes:
-        row = {}
-        for col in cw_cols:
-            row[col] = crazywalls.get(f"crazywalls_{col}_{mode}", 0)
-
-        cw_rows.append(
-            [
-                cw_modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
-
-    cw_rows.insert(
-        0,
-        [
-            "Overall",
-            stats["wins"],
-            stats["losses"],
-            stats["win_loss"],
-            stats["kills"],
-            stats["deaths"],
-            stats["kill_death"],
-        ],
-    )
-
-    stats["table"] = {
-        "id": "tableCrazyWalls",
-        "head": cw_head,
-        "rows": cw_rows,
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    rows = TABLE.rows(crazywalls, MODES)
+    rows.insert(0, TABLE.row("Overall", stats))
+    stats["table"] = TABLE.as_dict(rows)
 
     return stats
@@ -1,4 +1,33 @@
-from .... import utilities as u
+from .... import utilities as u, schema as s
+from ....tables import Table
+
+
+MODES = {
+    mode: mode.replace("_", "").title()
+    for mode in ["solo", "doubles", "team_war", "mega"]
+}
+
+TABLE = Table(
+    "tableSkyClash",
+    ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"],
+    ["wins", "losses", "kills", "deaths"],
+    [
+        "wins",
+        "losses",
+        s.ratio("wins", "losses"),
+        "kills",
+        "deaths",
+        s.ratio("kills", "deaths"),
+    ],
+    key="{field}_{mode}",
+    boldRows=[1],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "K/D": [0, 4, 5, 6],
+    },
+)
 
 
 def get_stats(player_api):
@@ -31,52 +60,8 @@ def get_stats(player_api):
     stats["bow_hit_accuracy"] = u.get_percentage(stats["bow_hits"], stats["bow_shots"])
 
     # Table
-    sc_head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
-    sc_cols = ["wins", "losses", "kills", "deaths"]
-    sc_modes = ["solo", "doubles", "team_war", "mega"]
-
-    sc_rows = []
-    for mode in sc_modes:
-        row = {}
-        for col in sc_cols:
-            row[col] = skyclash.get(f"{col}_{mode}", 0)
-
-        sc_rows.append(
-            [
-                mode.replace("_", "").title(),
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
-
-    sc_rows.insert(
-        0,
-        [
-            "Overall",
-            stats["wins"],
-            stats["losses"],
-            stats["win_loss"],
-            stats["kills"],
-            stats["deaths"],
-            stats["kill_death"],
-        ],
-    )
-
-    stats["table"] = {
-        "id": "tableSkyClash",
-        "head": sc_head,
-        "rows": sc_rows,
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    rows = TABLE.rows(skyclash, MODES)
+    rows.insert(0, TABLE.row("Overall", stats))
+    stats["table"] = TABLE.as_dict(rows)
 
     return stats
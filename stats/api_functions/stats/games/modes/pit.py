@@ -1,32 +1,11 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
 from stats.constants import get_constants
 
 
-def get_stats(player_api):
-    """Extract and calculate all pit stats from a player API."""
-    stats = {}
+PROFILE_STATS = s.compile_schema(s.fields("cash", "xp"), "pit_profile_stats")
 
-    # If player has not played pit, prepare empty dict
-    try:
-        pit = player_api["player"]["stats"]["Pit"]
-    except LookupError:
-        pit = {}
-
-    # Main Stats
-    pit_profile = pit.get("profile", {})
-
-    stats["cash_during_current_prestige"] = pit_profile.get(
-        "cash_during_prestige_" + str(len(pit_profile.get("prestiges", []))), 0
-    )
-
-    stats_profile = ["cash", "xp"]
-    for stat in stats_profile:
-        stats[stat] = pit_profile.get(stat, 0)
-
-    stats["renown_unlocks"] = len(pit_profile.get("renown_unlocks", []))
-
-    pit_stats = pit.get("pit_stats_ptl", {})
-    stats_needed = [
+STATS = s.compile_schema(
+    s.fields(
         "playtime_minutes",
         "cash_earned",
         "contracts_completed",
@@ -64,10 +43,34 @@ def get_stats(player_api):
         "fished_anything",
         "fishes_fished",
         "sewer_treasures_found",
-    ]
+    ),
+    "pit_stats",
+)
+
 
-    for stat in stats_needed:
-        stats[stat] = pit_stats.get(stat, 0)
+def get_stats(player_api):
+    """Extract and calculate all pit stats from a player API."""
+    stats = {}
+
+    # If player has not played pit, prepare empty dict
+    try:
+        pit = player_api["player"]["stats"]["Pit"]
+    except LookupError:
+        pit = {}
+
+    # Main Stats
+    pit_profile = pit.get("profile", {})
+
+    stats["cash_during_current_prestige"] = pit_profile.get(
+        "cash_during_prestige_" + str(len(pit_profile.get("prestiges", []))), 0
+    )
+
+    PROFILE_STATS(pit_profile, stats)
+
+    stats["renown_unlocks"] = len(pit_profile.get("renown_unlocks", []))
+
+    pit_stats = pit.get("pit_stats_ptl", {})
+    STATS(pit_stats, stats)
 
     hours = stats["playtime_minutes"] / 60
     stats["gold_hour"] = u.get_ratio(stats["cash_earned"], hours, 2)
@@ -1,7 +1,69 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
 from stats.constants import get_constants
 
 
+MODES = {
+    "": "Overall",
+    "_solo_normal": "Solo Normal",
+    "_solo_insane": "Solo Insane",
+    "_team_normal": "Team Normal",
+    "_team_insane": "Team Insane",
+}
+MASTERIES = {
+    mastery: mastery.replace("_", " ").title()
+    for mastery in [
+        "berserk",
+        "fortune",
+        "guardian",
+        "huntsman",
+        "invigorate",
+        "master_baker",
+        "sniper",
+        "vampirism",
+        "wild_specialist",
+    ]
+}
+
+HEAD = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
+FIELDS = ["wins", "losses", "kills", "deaths"]
+CELLS = [
+    "wins",
+    "losses",
+    s.ratio("wins", "losses"),
+    "kills",
+    "deaths",
+    s.ratio("kills", "deaths"),
+]
+BUTTONS = {
+    "W/L": [0, 1, 2, 3],
+    "K/D": [0, 4, 5, 6],
+}
+
+MODES_TABLE = Table(
+    "tableSUHCModes",
+    HEAD,
+    FIELDS,
+    CELLS,
+    boldRows=[1],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons=BUTTONS,
+)
+
+MASTERIES_TABLE = Table(
+    "tableSUHCMasteries",
+    HEAD,
+    FIELDS,
+    CELLS,
+    key="{field}_mastery_{mode}",
+    boldCols=[0],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons=BUTTONS,
+)
+
+
 def get_stats(player_api):
     """Extract and calculate all speed UHC stats from a player API."""
     stats = {}
@@ -54,89 +116,11 @@ def get_stats(player_api):
             break
 
     # Modes Table
-    suhc_head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
-    suhc_cols = ["wins", "losses", "kills", "deaths"]
-    suhc_modes = {
-        "": "Overall",
-        "_solo_normal": "Solo Normal",
-        "_solo_insane": "Solo Insane",
-        "_team_normal": "Team Normal",
-        "_team_insane": "Team Insane",
-    }
-
-    suhc_rows = []
-    for mode in suhc_modes:
-        row = {}
-        for col in suhc_cols:
-            row[col] = speeduhc.get(f"{col}{mode}", 0)
-
-        suhc_rows.append(
-            [
-                suhc_modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
-
-    stats["table_modes"] = {
-        "id": "tableSUHCModes",
-        "head": suhc_head,
-        "rows": suhc_rows,
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    stats["table_modes"] = MODES_TABLE.as_dict(MODES_TABLE.rows(speeduhc, MODES))
 
     # Masteries Table
-    suhc_masteries = [
-        "berserk",
-        "fortune",
-        "guardian",
-        "huntsman",
-        "invigorate",
-        "master_baker",
-        "sniper",
-        "vampirism",
-        "wild_specialist",
-    ]
-
-    suhc_rows = []
-    for mastery in suhc_masteries:
-        row = {}
-        for col in suhc_cols:
-            row[col] = speeduhc.get(f"{col}_mastery_{mastery}", 0)
-
-        suhc_rows.append(
-            [
-                mastery.replace("_", " ").title(),
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
-
-    stats["table_masteries"] = {
-        "id": "tableSUHCMasteries",
-        "head": suhc_head,
-        "rows": suhc_rows,
-        "boldCols": [0],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    stats["table_masteries"] = MASTERIES_TABLE.as_dict(
+        MASTERIES_TABLE.rows(speeduhc, MASTERIES)
+    )
 
     return stats
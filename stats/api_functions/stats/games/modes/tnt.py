@@ -1,4 +1,35 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
+
+
+WIZARDS = {
+    wizard: f"<span class='{colour}'>{wizard.title()}</span>"
+    for wizard, colour in {
+        "ancient": "gold",
+        "blood": "darkRed",
+        "fire": "red",
+        "hydro": "darkBlue",
+        "ice": "blue",
+        "kinetic": "lightPurple",
+        "storm": "gold",
+        "toxic": "darkGreen",
+        "wither": "black",
+    }.items()
+}
+
+WIZARDS_TABLE = Table(
+    "tableTNTCapture",
+    ["Wizard", "Kills", "Deaths", "K/D", "Assists"],
+    ["kills", "deaths", "assists"],
+    ["kills", "deaths", s.ratio("kills", "deaths"), "assists"],
+    key="new_{mode}wizard_{field}",
+    boldCols=[0],
+    decimal=[3],
+    buttons={
+        "K/D": [0, 1, 2, 3],
+        "Assists": [0, 4],
+    },
+)
 
 
 def get_stats(player_api):
@@ -66,46 +97,6 @@ def get_stats(player_api):
     )
 
     # Wizards Table
-    capture_head = ["Wizard", "Kills", "Deaths", "K/D", "Assists"]
-    capture_cols = ["kills", "deaths", "assists", "explode", "regen"]
-    capture_classes = {
-        "ancient": "gold",
-        "blood": "darkRed",
-        "fire": "red",
-        "hydro": "darkBlue",
-        "ice": "blue",
-        "kinetic": "lightPurple",
-        "storm": "gold",
-        "toxic": "darkGreen",
-        "wither": "black",
-    }
-
-    capture_rows = []
-    for wizard in capture_classes:
-        row = {}
-        for col in capture_cols:
-            row[col] = tnt.get(f"new_{wizard}wizard_{col}", 0)
-
-        capture_rows.append(
-            [
-                f"<span class='{capture_classes[wizard]}'>{wizard.title()}</span>",
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["assists"],
-            ]
-        )
-
-    stats["table_capture"] = {
-        "id": "tableTNTCapture",
-        "head": capture_head,
-        "rows": capture_rows,
-        "boldCols": [0],
-        "decimal": [3],
-        "buttons": {
-            "K/D": [0, 1, 2, 3],
-            "Assists": [0, 4],
-        },
-    }
+    stats["table_capture"] = WIZARDS_TABLE.as_dict(WIZARDS_TABLE.rows(tnt, WIZARDS))
 
     return stats
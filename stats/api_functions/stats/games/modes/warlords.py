@@ -1,7 +1,62 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
 from stats.constants import get_constants
 
 
+MODES = {
+    "capturetheflag": "Capture the Flag",
+    "domination": "Domination",
+    "teamdeathmatch": "Team Deathmatch",
+}
+CLASSES = {
+    "_mage": "Mage",
+    "_warrior": "Warrior",
+    "_paladin": "Paladin",
+    "_shaman": "Shaman",
+}
+CLASSES_UPGRADES = [
+    "cooldown",
+    "critchance",
+    "critmultiplier",
+    "energy",
+    "health",
+    "skill1",
+    "skill2",
+    "skill3",
+    "skill4",
+    "skill5",
+]
+
+TABLE = Table(
+    "tableWarlords",
+    ["Mode", "Wins", "Kills"],
+    ["wins", "kills"],
+    ["wins", "kills"],
+    key="{field}_{mode}",
+    convert=int,
+    boldCols=[0],
+)
+
+CLASSES_TABLE = Table(
+    "tableWarlordsClasses",
+    ["Class", "Wins", "Losses", "W/L", "Damage", "Damage Prevented", "Healing"],
+    ["wins", "losses", "damage", "damage_prevented", "heal"],
+    [
+        "wins",
+        "losses",
+        s.ratio("wins", "losses"),
+        "damage",
+        "damage_prevented",
+        "heal",
+    ],
+    convert=int,
+    boldRows=[1],
+    boldCols=[0],
+    percent={3: "Win %"},
+    buttons={"W/L": [0, 1, 2, 3], "Damage": [0, 4, 5], "Healing": [0, 6]},
+)
+
+
 def get_stats(player_api):
     """Extract and calculate all warlords stats from a player API."""
     stats = {}
@@ -33,34 +88,7 @@ def get_stats(player_api):
     stats["kill_death"] = u.get_ratio(stats["kills"], stats["deaths"])
 
     # Main Table
-    wl_head = ["Mode", "Wins", "Kills"]
-    wl_cols = ["wins", "kills"]
-    wl_modes = {
-        "capturetheflag": "Capture the Flag",
-        "domination": "Domination",
-        "teamdeathmatch": "Team Deathmatch",
-    }
-
-    wl_rows = []
-    for mode in wl_modes:
-        row = {}
-        for col in wl_cols:
-            row[col] = int(warlords.get(f"{col}_{mode}", 0))
-
-        wl_rows.append(
-            [
-                wl_modes[mode],
-                row["wins"],
-                row["kills"],
-            ]
-        )
-
-    stats["table"] = {
-        "id": "tableWarlords",
-        "head": wl_head,
-        "rows": wl_rows,
-        "boldCols": [0],
-    }
+    stats["table"] = TABLE.as_dict(TABLE.rows(warlords, MODES))
 
     # Weapons
     stats["repaired"] = warlords.get("repaired", 0)
@@ -89,72 +117,16 @@ def get_stats(player_api):
             if score >= prefix["score"]:
                 weapon["prefix"] = prefix["prefix"]
 
-    # Classes Table
-    wl_classes_head = [
-        "Class",
-        "Wins",
-        "Losses",
-        "W/L",
-        "Damage",
-        "Damage Prevented",
-        "Healing",
-    ]
-    wl_classes_cols = ["wins", "losses", "damage", "damage_prevented", "heal"]
-    wl_classes = {
-        "": "Overall",
-        "_mage": "Mage",
-        "_warrior": "Warrior",
-        "_paladin": "Paladin",
-        "_shaman": "Shaman",
-    }
-    wl_classes_upgrades = [
-        "cooldown",
-        "critchance",
-        "critmultiplier",
-        "energy",
-        "health",
-        "skill1",
-        "skill2",
-        "skill3",
-        "skill4",
-        "skill5",
-    ]
-
-    wl_classes_rows = []
-    for wl_class in wl_classes:
-        row = {}
-        for col in wl_classes_cols:
-            row[col] = int(warlords.get(f"{col}{wl_class}", 0))
-
-        if wl_class != "":
-            row["level"] = 0
-            for upgrade in wl_classes_upgrades:
-                row["level"] += warlords.get(
-                    f"{wl_class.replace('_', '')}_{upgrade}", 0
-                )
-
-        wl_classes_rows.append(
-            [
-                f"<span class='gray'>[Lv{row['level']}] </span><span class='gold'>{wl_classes[wl_class]}</span>"
-                if wl_class != ""
-                else wl_classes[wl_class],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["damage"],
-                row["damage_prevented"],
-                row["heal"],
-            ]
+    # Classes Table, each class labelled with its level from its upgrades
+    labels = {"": "Overall"}
+    for wl_class, name in CLASSES.items():
+        level = 0
+        for upgrade in CLASSES_UPGRADES:
+            level += warlords.get(f"{wl_class.replace('_', '')}_{upgrade}", 0)
+        labels[wl_class] = (
+            f"<span class='gray'>[Lv{level}] </span><span class='gold'>{name}</span>"
         )
 
-    stats["table_classes"] = {
-        "id": "tableWarlordsClasses",
-        "head": wl_classes_head,
-        "rows": wl_classes_rows,
-        "boldRows": [1],
-        "boldCols": [0],
-        "percent": {3: "Win %"},
-        "buttons": {"W/L": [0, 1, 2, 3], "Damage": [0, 4, 5], "Healing": [0, 6]},
-    }
+    stats["table_classes"] = CLASSES_TABLE.as_dict(CLASSES_TABLE.rows(warlords, labels))
 
     return stats
@@ -1,7 +1,60 @@
-from ... import utilities as u
+from ... import utilities as u, schema as s
+from ...tables import Table
 from stats.constants import get_constants
 
 
+WW_CLASSES = {
+    "archer": "Archer",
+    "assault": "Assault",
+    "engineer": "Engineer",
+    "golem": "Golem",
+    "swordsman": "Swordsman",
+    "tank": "Tank",
+}
+
+CLASSES_TABLE = Table(
+    "tableWGClasses",
+    [
+        "Class",
+        "Kills",
+        "Deaths",
+        "K/D",
+        "Assists",
+        "Wool Placed",
+        "Blocks Broken",
+        "Powerups",
+    ],
+    [
+        "wins",
+        "games_played",
+        "kills",
+        "deaths",
+        "assists",
+        "wool_placed",
+        "blocks_broken",
+        "powerups_gotten",
+    ],
+    [
+        "kills",
+        "deaths",
+        s.ratio("kills", "deaths"),
+        "assists",
+        "wool_placed",
+        "blocks_broken",
+        "powerups_gotten",
+    ],
+    totals=True,
+    boldRows=[1],
+    decimal=[3],
+    buttons={
+        "K/D": [0, 1, 2, 3],
+        "Assists": [0, 4],
+        "Blocks": [0, 5, 6],
+        "Powerups": [0, 7],
+    },
+)
+
+
 def get_stats(player_api):
     """Extract and calculate all wool games stats from a player API."""
 
@@ -91,77 +144,16 @@ def get_stats(player_api):
     except LookupError:
         ww = {}
 
-    ww_head = [
-        "Class",
-        "Kills",
-        "Deaths",
-        "K/D",
-        "Assists",
-        "Wool Placed",
-        "Blocks Broken",
-        "Powerups",
-    ]
-    ww_cols = [
-        "wins",
-        "games_played",
-        "kills",
-        "deaths",
-        "assists",
-        "wool_placed",
-        "blocks_broken",
-        "powerups_gotten",
-    ]
-    ww_classes = {
-        "": "Overall",
-        "_archer": "Archer",
-        "_assault": "Assault",
-        "_engineer": "Engineer",
-        "_golem": "Golem",
-        "_swordsman": "Swordsman",
-        "_tank": "Tank",
-    }
+    # Overall row from the mode's stats, then a row from each class's own stats
+    rows, totals = CLASSES_TABLE.rows_and_totals(ww, {"": "Overall"})
+    for field, total in totals.items():
+        stats[f"{field}_ww"] = total
+
     ww_class_stats = ww.get("classes", {})
+    for ww_class, label in WW_CLASSES.items():
+        rows += CLASSES_TABLE.rows(ww_class_stats.get(ww_class, {}), {"": label})
 
-    for col in ww_cols:
-        stats[f"{col}_ww"] = 0
-
-    ww_rows = []
-    for ww_class in ww_classes:
-        row = {}
-        for col in ww_cols:
-            if ww_class == "":
-                value = ww.get(col, 0)
-                stats[f"{col}_ww"] += value
-                row[col] = value
-            else:
-                row[col] = ww_class_stats.get(ww_class.replace("_", ""), {}).get(col, 0)
-
-        ww_rows.append(
-            [
-                ww_classes[ww_class],
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["assists"],
-                row["wool_placed"],
-                row["blocks_broken"],
-                row["powerups_gotten"],
-            ]
-        )
-
-    stats["table_classes"] = {
-        "id": "tableWGClasses",
-        "head": ww_head,
-        "rows": ww_rows,
-        "boldRows": [1],
-        "decimal": [3],
-        "buttons": {
-            "K/D": [0, 1, 2, 3],
-            "Assists": [0, 4],
-            "Blocks": [0, 5, 6],
-            "Powerups": [0, 7],
-        },
-    }
+    stats["table_classes"] = CLASSES_TABLE.as_dict(rows)
 
     stats["losses_ww"] = stats["games_played_ww"] - stats["wins_ww"]
     stats["win_loss_ww"] = u.get_ratio(stats["wins_ww"], stats["losses_ww"])
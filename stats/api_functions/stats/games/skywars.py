@@ -1,11 +1,254 @@
-from .. import utilities as u, levelling as l
-from stats.constants import get_constants
+from .. import utilities as u, levelling as l, schema as s
+from ..tables import Table, get_percentage_cell
+from stats.constants import get_constants, thaw
+
+
+STATS = s.compile_schema(
+    {
+        # Selected prestige styles
+        **s.fields(
+            "emblem",
+            "scheme",
+            source="active_{}",
+            key="active_{}",
+            default="default",
+        ),
+        **s.fields(
+            # Main
+            "wins",
+            "losses",
+            "kills",
+            "deaths",
+            "skywars_experience",
+            "heads",
+            "angel_of_death_level",
+            "time_played",
+            # More
+            "coins",
+            "cosmetic_tokens",
+            "blocks_broken",
+            "blocks_placed",
+            "souls",
+            "souls_gathered",
+            "soul_well",
+            "soul_well_rares",
+            "soul_well_legendaries",
+            "paid_souls",
+            "arrows_shot",
+            "arrows_hit",
+            "enderpearls_thrown",
+            "items_enchanted",
+            "egg_thrown",
+            "chests_opened",
+            "assists",
+            "survived_players",
+            "angels_offering",
+            "melee_kills",
+            "void_kills",
+            "mob_kills",
+            "bow_kills",
+            "bow_kills",
+        ),
+    },
+    "skywars_stats",
+)
+
+# Derived after the angel of death level and offering are applied
+DERIVED_STATS = s.compile_schema(
+    {
+        "games_played": s.total("wins", "losses"),
+        "arrows_missed": s.difference("arrows_shot", "arrows_hit"),
+        # Ratios
+        "win_loss": s.ratio("wins", "losses"),
+        "kill_death": s.ratio("kills", "deaths"),
+        "kill_win": s.ratio("kills", "wins"),
+        "kill_game": s.ratio("kills", "games_played"),
+        "arrow_hit_miss": s.ratio("arrows_hit", "arrows_missed"),
+        # Levelling and prestige
+        "level": s.call(
+            lambda xp: float(l.skywars_xp_to_level(xp)), "skywars_experience"
+        ),
+        "prestige_formatted": s.call(
+            l.skywars_format_prestige, "level", "active_emblem", "active_scheme"
+        ),
+        "level_old": s.call(
+            lambda xp: float(l.skywars_xp_to_level_old(xp)), "skywars_experience"
+        ),
+    },
+    "skywars_derived_stats",
+)
+
+
+# ======================================================================================
+# TABLES
+# ======================================================================================
+
+MODES = {
+    "": "Overall",
+    "_solo": "Solo Overall",
+    "_solo_normal": "Solo Normal",
+    "_solo_insane": "Solo Insane",
+    "_team": "Team Overall",
+    "_team_normal": "Team Normal",
+    "_team_insane": "Team Insane",
+}
+PLAYTIME_MODES = {
+    "": "Overall",
+    "_lab": "Lab",
+    "_solo": "Solo",
+    "_team": "Team",
+    "_ranked": "Ranked",
+    "_mega": "Mega Normal",
+    "_mega_doubles": "Mega Doubles",
+}
+CARRIES_MODES = {
+    "": "Overall",
+    "_team": "Team Overall",
+    "_team_normal": "Team Normal",
+    "_team_insane": "Team Insane",
+    "_mega": "Mega Normal",
+    "_mega_doubles": "Mega Insane",
+}
+MEGA_MODES = {"_mega": "Mega Normal", "_mega_doubles": "Mega Doubles"}
+LAB_MODES = {"": "Overall", "_solo": "Solo", "_team": "Team"}
+
+HEAD = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
+FIELDS = ["wins", "losses", "kills", "deaths"]
+CELLS = [
+    "wins",
+    "losses",
+    s.ratio("wins", "losses"),
+    "kills",
+    "deaths",
+    s.ratio("kills", "deaths"),
+]
+
+TABLE = Table(
+    "tableSkyWars",
+    HEAD,
+    FIELDS,
+    CELLS,
+    green={3: 1, 6: 5},
+    boldRows=[1, 3, 6],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "K/D": [0, 4, 5, 6],
+    },
+)
+
+PLAYTIME_TABLE = Table(
+    "tablePlaytimeSkyWars",
+    ["Mode", "Wins", "Wins/Hour", "Kills", "Kills/Hour", "Playtime"],
+    ["wins", "kills", "time_played"],
+    [
+        "wins",
+        s.ratio("wins", "hours"),
+        "kills",
+        s.ratio("kills", "hours"),
+        "time_played",
+    ],
+    derived={"hours": s.call(lambda seconds: seconds / 3600, "time_played")},
+    boldRows=[1],
+    boldCols=[0, 5],
+    duration=[5],
+    decimal=[2, 4],
+    buttons={
+        "Playtime": [0, 5],
+        "W/H": [0, 1, 2],
+        "K/H": [0, 3, 4],
+    },
+)
+
+# A table of each type of kit, sorted by XP
+KITS_TABLES = {
+    kit_type: Table(
+        f"tableKits{kit_type.title()}SkyWars",
+        ["Kit"] + HEAD[1:] + ["Playtime", "XP"],
+        FIELDS + ["time_played", "xp"],
+        CELLS + ["time_played", "xp"],
+        key="{field}_{mode}",
+        sort=8,
+        boldCols=[0, 3, 6, 8],
+        percent={3: "Win %"},
+        duration=[7],
+        decimal=[6],
+        green={3: 1, 6: 5},
+        buttons={
+            "W/L": [0, 1, 2, 3],
+            "K/D": [0, 4, 5, 6],
+            "Playtime": [0, 7],
+            "XP": [0, 8],
+        },
+    )
+    for kit_type in get_constants("stats")["skywars"]["kitNames"]
+}
+
+
+CARRIES_TABLE = Table(
+    "tableCarriesSkyWars",
+    ["Mode", "Carries", "Wins", "% of Wins"],
+    ["wins", "losses", "deaths"],
+    ["carries", "wins", s.call(get_percentage_cell, "carries", "wins")],
+    derived={
+        "carries": s.call(
+            lambda deaths, losses: abs(deaths - losses), "deaths", "losses"
+        )
+    },
+    boldRows=[1, 2, 5],
+    width=520,
+)
+
+MEGA_TABLE = Table(
+    "tableMegaSkyWars",
+    HEAD,
+    FIELDS,
+    CELLS,
+    totals=True,
+    green={3: 1, 6: 5},
+    boldRows=[1],
+    percent={3: "Win %"},
+    decimal=[6],
+    buttons={
+        "W/L": [0, 1, 2, 3],
+        "K/D": [0, 4, 5, 6],
+    },
+)
+
+LAB_TABLE = Table(
+    "tableLabSkyWars",
+    HEAD + ["Playtime"],
+    FIELDS + ["time_played"],
+    CELLS + ["time_played"],
+    key="{field}_lab{mode}",
+    green={3: 1, 6: 5},
+    boldRows=[1],
+    percent={3: "Win %"},
+    duration=[7],
+    decimal=[6],
+    buttons={"W/L": [0, 1, 2, 3], "K/D": [0, 4, 5, 6], "Playtime": [0, 7]},
+)
+
+
+def get_prestige(player_api):
+    """Return the formatted SkyWars prestige without extracting any other stats."""
+    try:
+        skywars = player_api["player"]["stats"].get("SkyWars", {})
+    except LookupError:
+        skywars = {}
+
+    level = float(l.skywars_xp_to_level(skywars.get("skywars_experience", 0)))
+    emblem = skywars.get("active_emblem", "default")
+    scheme = skywars.get("active_scheme", "default")
+    return {
+        "active_scheme": scheme,
+        "prestige_formatted": l.skywars_format_prestige(level, emblem, scheme),
+    }
 
 
 def get_stats(player_api):
     """Extract and calculate all SkyWars stats from a player API."""
-    stats = {}
-
     # If player has not played SkyWars, prepare empty dict
     try:
         skywars = player_api["player"]["stats"].get("SkyWars", {})
@@ -18,50 +261,7 @@ def get_stats(player_api):
     # GENERAL
     # ==================================================================================
 
-    # Selected prestige styles
-    for active in ["emblem", "scheme"]:
-        stats[f"active_{active}"] = skywars.get(f"active_{active}", "default")
-
-    stats_needed = [
-        # Main
-        "wins",
-        "losses",
-        "kills",
-        "deaths",
-        "skywars_experience",
-        "heads",
-        "angel_of_death_level",
-        "time_played",
-        # More
-        "coins",
-        "cosmetic_tokens",
-        "blocks_broken",
-        "blocks_placed",
-        "souls",
-        "souls_gathered",
-        "soul_well",
-        "soul_well_rares",
-        "soul_well_legendaries",
-        "paid_souls",
-        "arrows_shot",
-        "arrows_hit",
-        "enderpearls_thrown",
-        "items_enchanted",
-        "egg_thrown",
-        "chests_opened",
-        "assists",
-        "survived_players",
-        "angels_offering",
-        "melee_kills",
-        "void_kills",
-        "mob_kills",
-        "bow_kills",
-        "bow_kills",
-    ]
-
-    # Collect all initial stats
-    for stat in stats_needed:
-        stats[stat] = skywars.get(stat, 0)
+    stats = STATS(skywars)
 
     stats["angel_of_death_level_raw"] = stats["angel_of_death_level"]
 
@@ -75,27 +275,7 @@ def get_stats(player_api):
         stats["angels_offering"] = "true"
         stats["angel_of_death_level"] += 1
 
-    stats["games_played"] = stats["wins"] + stats["losses"]
-    stats["arrows_missed"] = stats["arrows_shot"] - stats["arrows_hit"]
-
-    # Calculate ratios
-    stats = u.get_ratios(
-        stats,
-        {
-            "win_loss": ["wins", "losses"],
-            "kill_death": ["kills", "deaths"],
-            "kill_win": ["kills", "wins"],
-            "kill_game": ["kills", "games_played"],
-            "arrow_hit_miss": ["arrows_hit", "arrows_missed"],
-        },
-    )
-
-    # Levelling and prestige
-    stats["level"] = float(l.skywars_xp_to_level(stats["skywars_experience"]))
-    stats["prestige_formatted"] = l.skywars_format_prestige(
-        stats["level"], stats["active_emblem"], stats["active_scheme"]
-    )
-    stats["level_old"] = float(l.skywars_xp_to_level_old(stats["skywars_experience"]))
+    DERIVED_STATS(skywars, stats)
 
     # ==================================================================================
     # PRESTIGE
@@ -167,55 +347,14 @@ def get_stats(player_api):
     # TABLE
     # ==================================================================================
 
-    head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
-    modes = {
-        "": "Overall",
-        "_mini": "Mini",
-        "_solo": "Solo Overall",
-        "_solo_normal": "Solo Normal",
-        "_solo_insane": "Solo Insane",
-        "_team": "Team Overall",
-        "_team_normal": "Team Normal",
-        "_team_insane": "Team Insane",
-    }
+    rows = TABLE.rows(skywars, MODES)
 
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "losses", "kills", "deaths"]:
-            row[col] = skywars.get(f"{col}{mode}", 0)
-
-        if mode == "_mini":
-            games = skywars.get("games_mini", 0)
-            losses = games - row["wins"]
-            row["losses"] = losses
-            row["deaths"] = losses
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
+    # Mini only counts games, so its losses (and deaths) are the games not won
+    mini = {field: skywars.get(f"{field}_mini", 0) for field in FIELDS}
+    mini["losses"] = mini["deaths"] = skywars.get("games_mini", 0) - mini["wins"]
+    rows.insert(1, TABLE.row("Mini", mini))
 
-    stats["table"] = {
-        "id": "tableSkyWars",
-        "head": head,
-        "rows": rows,
-        "green": {3: 1, 6: 5},
-        "boldRows": [1, 3, 6],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    stats["table"] = TABLE.as_dict(rows)
 
     # ==================================================================================
     # GRIM REAPER
@@ -234,7 +373,7 @@ def get_stats(player_api):
         "next": {"needed": 1500},
     }
 
-    angels_descent_info = constants["descentInfo"]
+    angels_descent_info = thaw(constants["descentInfo"])
 
     opals_spent = 0
     opals_to_spend = 0
@@ -288,159 +427,39 @@ def get_stats(player_api):
     # PLAYTIME
     # ==================================================================================
 
-    head = ["Mode", "Wins", "Wins/Hour", "Kills", "Kills/Hour", "Playtime"]
-    modes = {
-        "": "Overall",
-        "_lab": "Lab",
-        "_solo": "Solo",
-        "_team": "Team",
-        "_ranked": "Ranked",
-        "_mega": "Mega Normal",
-        "_mega_doubles": "Mega Doubles",
-    }
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "kills", "time_played"]:
-            row[col] = skywars.get(f"{col}{mode}", 0)
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                u.get_ratio(row["wins"], row["time_played"] / 3600),
-                row["kills"],
-                u.get_ratio(row["kills"], row["time_played"] / 3600),
-                row["time_played"],
-            ]
-        )
-
-    stats["table_playtime"] = {
-        "id": "tablePlaytimeSkyWars",
-        "head": head,
-        "rows": rows,
-        "boldRows": [1],
-        "boldCols": [0, 5],
-        "duration": [5],
-        "decimal": [2, 4],
-        "buttons": {
-            "Playtime": [0, 5],
-            "W/H": [0, 1, 2],
-            "K/H": [0, 3, 4],
-        },
-    }
+    stats["table_playtime"] = PLAYTIME_TABLE.as_dict(
+        PLAYTIME_TABLE.rows(skywars, PLAYTIME_MODES)
+    )
 
     # ==================================================================================
     # KITS
     # ==================================================================================
 
-    kit_names = constants["kitNames"]
-    for kit_type in kit_names:
-        head = [
-            "Kit",
-            "Wins",
-            "Losses",
-            "W/L",
-            "Kills",
-            "Deaths",
-            "K/D",
-            "Playtime",
-            "XP",
-        ]
-        modes = kit_names[kit_type]
-
-        rows = []
-        for mode in modes:
-            row = {}
-            for col in ["wins", "losses", "kills", "deaths", "time_played", "xp"]:
-                row[col] = skywars.get(f"{col}_{mode}", 0)
-
-            rows.append(
-                [
-                    modes[mode],
-                    row["wins"],
-                    row["losses"],
-                    u.get_ratio(row["wins"], row["losses"]),
-                    row["kills"],
-                    row["deaths"],
-                    u.get_ratio(row["kills"], row["deaths"]),
-                    row["time_played"],
-                    row["xp"],
-                ]
-            )
-
-            sorted_rows = sorted(rows, key=lambda x: x[8], reverse=True)
-
-        stats[f"table_kits_{kit_type}"] = {
-            "id": f"tableKits{kit_type.title()}SkyWars",
-            "head": head,
-            "rows": sorted_rows,
-            "boldCols": [0, 3, 6, 8],
-            "percent": {3: "Win %"},
-            "duration": [7],
-            "decimal": [6],
-            "green": {3: 1, 6: 5},
-            "buttons": {
-                "W/L": [0, 1, 2, 3],
-                "K/D": [0, 4, 5, 6],
-                "Playtime": [0, 7],
-                "XP": [0, 8],
-            },
-        }
+    for kit_type, table in KITS_TABLES.items():
+        stats[f"table_kits_{kit_type}"] = table.as_dict(
+            table.rows(skywars, constants["kitNames"][kit_type])
+        )
 
     # ==================================================================================
     # CARRIES
     # ==================================================================================
 
-    head = ["Mode", "Carries", "Wins", "% of Wins"]
-    modes = {
-        "": "Overall",
-        "_team": "Team Overall",
-        "_team_normal": "Team Normal",
-        "_team_insane": "Team Insane",
-        "_mega": "Mega Normal",
-        "_mega_doubles": "Mega Insane",
-    }
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "losses", "deaths"]:
-            row[col] = skywars.get(f"{col}{mode}", 0)
-
-        carries = abs(row["deaths"] - row["losses"])
-
-        rows.append(
-            [
-                modes[mode],
-                carries,
-                row["wins"],
-                f"{u.get_percentage(carries, row['wins'], 2)}%",
-            ]
-        )
+    rows = CARRIES_TABLE.rows(skywars, CARRIES_MODES)
 
     # Mega Overall
     mega_overall_carries = rows[-1][1] + rows[-2][1]
     mega_overall_wins = rows[-1][2] + rows[-2][2]
-    mega_overall_percent = u.get_percentage(mega_overall_carries, mega_overall_wins, 2)
     rows.insert(
         4,
         [
             "Mega Overall",
             mega_overall_carries,
             mega_overall_wins,
-            f"{mega_overall_percent}%",
+            get_percentage_cell(mega_overall_carries, mega_overall_wins),
         ],
     )
 
-    stats["table_carries"] = {
-        "id": "tableCarriesSkyWars",
-        "head": head,
-        "rows": rows,
-        "boldRows": [1, 2, 5],
-        "width": 520,
-    }
+    stats["table_carries"] = CARRIES_TABLE.as_dict(rows)
 
     stats["carries"] = rows[1][1] + rows[4][1]
 
@@ -460,7 +479,7 @@ def get_stats(player_api):
         stats["kills_ranked"], stats["deaths_ranked"]
     )
 
-    rewards = ranked["rewards"]
+    rewards = thaw(ranked["rewards"])
     reward_counts = {}
     for division in rewards:
         reward_counts[division] = 0
@@ -526,59 +545,12 @@ def get_stats(player_api):
 
     # Mega
 
-    head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D"]
-    cols = ["wins", "losses", "kills", "deaths"]
-    modes = {"_mega": "Mega Normal", "_mega_doubles": "Mega Doubles"}
-
-    for col in cols:
-        stats[f"{col}_mega_overall"] = 0
-
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in cols:
-            value = skywars.get(f"{col}{mode}", 0)
-            row[col] = value
-            stats[f"{col}_mega_overall"] += value
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-            ]
-        )
-
-    rows.insert(
-        0,
-        [
-            "Mega Overall",
-            stats["wins_mega_overall"],
-            stats["losses_mega_overall"],
-            u.get_ratio(stats["wins_mega_overall"], stats["losses_mega_overall"]),
-            stats["kills_mega_overall"],
-            stats["deaths_mega_overall"],
-            u.get_ratio(stats["kills_mega_overall"], stats["deaths_mega_overall"]),
-        ],
-    )
+    rows, totals = MEGA_TABLE.rows_and_totals(skywars, MEGA_MODES)
+    for field, total in totals.items():
+        stats[f"{field}_mega_overall"] = total
+    rows.insert(0, MEGA_TABLE.row("Mega Overall", totals))
 
-    stats["table_mega"] = {
-        "id": "tableMegaSkyWars",
-        "head": head,
-        "rows": rows,
-        "green": {3: 1, 6: 5},
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "decimal": [6],
-        "buttons": {
-            "W/L": [0, 1, 2, 3],
-            "K/D": [0, 4, 5, 6],
-        },
-    }
+    stats["table_mega"] = MEGA_TABLE.as_dict(rows)
 
     # Lab
 
@@ -588,37 +560,6 @@ def get_stats(player_api):
     for sub_mode in sub_modes:
         stats[f"wins_{sub_mode}_lab"] = skywars.get(f"lab_win_{sub_mode}_lab", 0)
 
-    head = ["Mode", "Wins", "Losses", "W/L", "Kills", "Deaths", "K/D", "Playtime"]
-    modes = {"": "Overall", "_solo": "Solo", "_team": "Team"}
-    rows = []
-    for mode in modes:
-        row = {}
-        for col in ["wins", "losses", "kills", "deaths", "time_played"]:
-            row[col] = skywars.get(f"{col}_lab{mode}", 0)
-
-        rows.append(
-            [
-                modes[mode],
-                row["wins"],
-                row["losses"],
-                u.get_ratio(row["wins"], row["losses"]),
-                row["kills"],
-                row["deaths"],
-                u.get_ratio(row["kills"], row["deaths"]),
-                row["time_played"],
-            ]
-        )
-
-    stats["table_lab"] = {
-        "id": "tableLabSkyWars",
-        "head": head,
-        "rows": rows,
-        "green": {3: 1, 6: 5},
-        "boldRows": [1],
-        "percent": {3: "Win %"},
-        "duration": [7],
-        "decimal": [6],
-        "buttons": {"W/L": [0, 1, 2, 3], "K/D": [0, 4, 5, 6], "Playtime": [0, 7]},
-    }
+    stats["table_lab"] = LAB_TABLE.as_dict(LAB_TABLE.rows(skywars, LAB_MODES))
 
     return stats
@@ -1,10 +1,54 @@
-"""Provides heavily-used general/game-specific levelling functions."""
+"""Provides heavily-used general/game-specific levelling functions.
 
+Levels are found by bisecting tables of the XP needed to reach each level,
+built at import and rebuilt whenever the stats constants are reloaded. The
+*_batch variants find the levels of many XP values at once, with NumPy
+when it is installed (see utilities), and give the same results as their
+single-value functions. Formatted prestiges are cached, as there are only
+a few thousand distinct ones.
+"""
+
+import os
 import math
-from stats.constants import get_constants
+import bisect
+import functools
+import itertools
+
+from . import utilities as u
+from stats.constants import get_constants, on_reload
+
+
+# Set from the stats constants by load_constants, at the end of the module
+CONSTANTS = None
+
+PRESTIGE_CACHE_SIZE = int(os.getenv("PRESTIGE_CACHE_SIZE", 4096))
+
 
+def get_xp_array(xps):
+    """Return XP values as a NumPy array, for finding their levels at once.
 
-CONSTANTS = get_constants("stats")
+    Returns None (leaving the values to the single-value functions) without
+    NumPy, for too few values to be worth converting, or if any value is
+    negative, not finite or too large for a float to hold exactly.
+    """
+    np = u.np
+    if np is None or len(xps) < u.ARRAY_BATCH_MIN:
+        return None
+    try:
+        xp = np.asarray(xps, dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if xp.ndim != 1 or not ((xp >= 0) & (xp < 2**53)).all():
+        return None
+    return xp
+
+
+def round_levels(levels, dp):
+    """Return a NumPy array of levels rounded to dp decimal places, as a list."""
+    results, unsure = u.round_array(levels, dp)
+    for i in u.np.flatnonzero(unsure).tolist():
+        results[i] = round(float(levels[i]), dp)
+    return results
 
 
 # ======================================================================================
@@ -22,18 +66,36 @@ def network_level_to_xp(level):
     return ((((level + 2.5) * 50) ** 2) - 30625) / 2
 
 
+PET_MAX_LEVEL = 100
+# XP required for each level, and the total XP required to reach it
+PET_LEVEL_XP = ()
+PET_LEVEL_TOTALS = ()
+
+
 def pet_xp_to_level(xp):
     """Convert pet XP to level."""
-    level = 0
-    levels = CONSTANTS["general"]["petLevels"]
-    for i, req in enumerate(levels.values()):
-        if level == 100:
-            return 100
-        if xp - req >= 0:
-            xp -= req
-            level += 1
-        else:
-            return round(level + (xp / req), 2)
+    level = bisect.bisect_right(PET_LEVEL_TOTALS, xp, 1) - 1
+    if level >= PET_MAX_LEVEL:
+        return PET_MAX_LEVEL
+    return round(level + ((xp - PET_LEVEL_TOTALS[level]) / PET_LEVEL_XP[level]), 2)
+
+
+def pet_xp_to_level_batch(xps):
+    """Convert each of a sequence of pet XP values to level."""
+    xp = get_xp_array(xps)
+    if xp is None:
+        return [pet_xp_to_level(x) for x in xps]
+
+    np = u.np
+    levels = np.searchsorted(PET_LEVEL_TOTALS[1:], xp, side="right")
+    capped = levels >= PET_MAX_LEVEL
+    levels = np.minimum(levels, PET_MAX_LEVEL - 1)
+    totals = np.asarray(PET_LEVEL_TOTALS)[levels]
+    values = levels + ((xp - totals) / np.asarray(PET_LEVEL_XP)[levels])
+    levels = round_levels(values, 2)
+    for i in np.flatnonzero(capped).tolist():
+        levels[i] = PET_MAX_LEVEL
+    return levels
 
 
 # ======================================================================================
@@ -72,24 +134,42 @@ def bedwars_xp_per_level(level):
         return 5000
 
 
+# Total XP required to reach each of the easy levels of a prestige
+BEDWARS_EASY_TOTALS = tuple(
+    itertools.accumulate(
+        (bedwars_xp_per_level(level) for level in range(1, BEDWARS_EASY_LEVELS + 1)),
+        initial=0,
+    )
+)
+
+
 def bedwars_xp_to_level(xp):
     """Convert BedWars XP to level."""
     prestiges = math.floor(xp / BEDWARS_XP_PER_PRESTIGE)
-    level = prestiges * BEDWARS_LEVELS_PER_PRESTIGE
     expWithoutPrestiges = xp - (prestiges * BEDWARS_XP_PER_PRESTIGE)
 
-    i = 1
-    while i <= BEDWARS_EASY_LEVELS:
-        expForEasyLevel = bedwars_xp_per_level(i)
-        i = i + 1
-        if expWithoutPrestiges < expForEasyLevel:
-            break
-        level = level + 1
-        expWithoutPrestiges = expWithoutPrestiges - expForEasyLevel
+    easyLevels = bisect.bisect_right(BEDWARS_EASY_TOTALS, expWithoutPrestiges, 1) - 1
+    level = prestiges * BEDWARS_LEVELS_PER_PRESTIGE + easyLevels
+    expWithoutPrestiges = expWithoutPrestiges - BEDWARS_EASY_TOTALS[easyLevels]
     level = level + (expWithoutPrestiges / 5000)
     return round(level, 4)
 
 
+def bedwars_xp_to_level_batch(xps):
+    """Convert each of a sequence of BedWars XP values to level."""
+    xp = get_xp_array(xps)
+    if xp is None:
+        return [bedwars_xp_to_level(x) for x in xps]
+
+    np = u.np
+    prestiges = np.floor(xp / BEDWARS_XP_PER_PRESTIGE)
+    exp = xp - (prestiges * BEDWARS_XP_PER_PRESTIGE)
+    easy = np.searchsorted(BEDWARS_EASY_TOTALS[1:], exp, side="right")
+    exp = exp - np.asarray(BEDWARS_EASY_TOTALS)[easy]
+    levels = (prestiges * BEDWARS_LEVELS_PER_PRESTIGE + easy) + (exp / 5000)
+    return round_levels(levels, 4)
+
+
 def bedwars_next_prestige(level):
     """Return the starting level of the next BedWars prestige."""
     return level + 100 - (level % 100)
@@ -100,17 +180,23 @@ def bedwars_prev_prestige(level):
     return int(level - (level % 100))
 
 
+# Levels from which each emblem is shown, ascending, and the emblems themselves
+BEDWARS_EMBLEM_LEVELS = ()
+BEDWARS_EMBLEMS = ()
+
+
 def bedwars_format_prestige(level):
     """Return a formatted HTML element for a BedWars level."""
-    level = int(level)
+    return bedwars_prestige_html(int(level))
 
+
+@functools.lru_cache(maxsize=PRESTIGE_CACHE_SIZE)
+def bedwars_prestige_html(level):
+    """Return the formatted HTML element for a whole BedWars level (cached)."""
     prestiges = CONSTANTS["bedwars"]["prestiges"]
-    emblems = CONSTANTS["bedwars"]["emblems"]
 
-    emblem = None
-    for req, e in emblems.items():
-        if level >= int(req):
-            emblem = e
+    i = bisect.bisect_right(BEDWARS_EMBLEM_LEVELS, level) - 1
+    emblem = BEDWARS_EMBLEMS[i] if i >= 0 else None
 
     info = prestiges[str(bedwars_prev_prestige(level))]
     scheme = info.get("scheme", info["color"])
@@ -119,10 +205,10 @@ def bedwars_format_prestige(level):
         return f"<span class='{scheme}'>[{level}{emblem}]</span>"
     else:
         unformatted = f"[{level}{emblem}]"
-        formatted = ""
-        for i, char in enumerate(unformatted):
-            formatted += f"<span class='{scheme[i]}'>{char}</span>"
-        return formatted
+        return "".join(
+            f"<span class='{scheme[i]}'>{char}</span>"
+            for i, char in enumerate(unformatted)
+        )
 
 
 # ======================================================================================
@@ -130,54 +216,81 @@ def bedwars_format_prestige(level):
 # ======================================================================================
 
 
+# Total XP required to reach each level, and the XP each level requires
+SKYWARS_LEVEL_TOTALS = (
+    0, 10, 35, 85, 160, 260, 510, 1010, 1760, 2760, 4010, 5510, 7260, 9260, 11760,
+    14760, 18260, 22260, 26760
+)
+SKYWARS_LEVEL_XP = (
+    10, 25, 50, 75, 100, 250, 500, 750, 1000, 1250, 1500, 1750, 2000, 2500, 3000,
+    3500, 4000, 4500, 5000
+)
+SKYWARS_LEVEL_TOTALS_OLD = (
+    0, 20, 70, 150, 250, 500, 1000, 2000, 3500, 6000, 10000, 15000
+)
+SKYWARS_LEVEL_XP_OLD = (20, 50, 80, 100, 250, 500, 1000, 1500, 2500, 4000, 5000, 10000)
+
+
 def skywars_xp_to_level(xp):
     """Convert SkyWars XP to level."""
-    level_totals = [
-        0, 10, 35, 85, 160, 260, 510, 1010, 1760, 2760, 4010, 5510, 7260, 9260, 11760,
-        14760, 18260, 22260, 26760
-    ]
-    level_amounts = [
-        10, 25, 50, 75, 100, 250, 500, 750, 1000, 1250, 1500, 1750, 2000, 2500, 3000, 
-        3500, 4000, 4500, 5000
-    ]
     if xp >= 26760:
-        level = "{:.4f}".format(round(((xp - 26760) / 5000) + 19, 4))
-    else:
-        count = -1
-        found = False
-        while not found:
-            count += 1
-            if xp >= level_totals[count]:
-                found = False
-            else:
-                found = True
-                level = (
-                    count + 1 + ((xp - level_totals[count]) / level_amounts[count - 1])
-                )
-                level = "{:.4f}".format(round((level * 5000) / 5000, 4))
-    return level
+        return "{:.4f}".format(round(((xp - 26760) / 5000) + 19, 4))
+
+    count = bisect.bisect_right(SKYWARS_LEVEL_TOTALS, xp)
+    level = count + 1 + (
+        (xp - SKYWARS_LEVEL_TOTALS[count]) / SKYWARS_LEVEL_XP[count - 1]
+    )
+    return "{:.4f}".format(round((level * 5000) / 5000, 4))
 
 
 def skywars_xp_to_level_old(xp):
     """Convert SkyWars XP to level as per the old levelling system."""
-    level_totals = [0, 20, 70, 150, 250, 500, 1000, 2000, 3500, 6000, 10000, 15000]
-    level_amounts = [20, 50, 80, 100, 250, 500, 1000, 1500, 2500, 4000, 5000, 10000]
     if xp >= 15000:
-        level = "{:.4f}".format(round(((xp - 15000) / 10000) + 12, 1))
-    else:
-        count = -1
-        found = False
-        while not found:
-            count += 1
-            if xp >= level_totals[count]:
-                found = False
-            else:
-                found = True
-                level = (
-                    count + 1 + ((xp - level_totals[count]) / level_amounts[count - 1])
-                )
-                level = "{:.1f}".format(round((level * 10000) / 10000, 1))
-    return level
+        return "{:.4f}".format(round(((xp - 15000) / 10000) + 12, 1))
+
+    count = bisect.bisect_right(SKYWARS_LEVEL_TOTALS_OLD, xp)
+    level = count + 1 + (
+        (xp - SKYWARS_LEVEL_TOTALS_OLD[count]) / SKYWARS_LEVEL_XP_OLD[count - 1]
+    )
+    return "{:.1f}".format(round((level * 10000) / 10000, 1))
+
+
+def skywars_levels(xp, totals, amounts):
+    """Return a SkyWars level array for the XP array, below the highest total."""
+    np = u.np
+    count = np.minimum(np.searchsorted(totals, xp, side="right"), len(totals) - 1)
+    totals = np.asarray(totals)[count]
+    return count + 1 + ((xp - totals) / np.asarray(amounts)[count - 1])
+
+
+def skywars_xp_to_level_batch(xps):
+    """Convert each of a sequence of SkyWars XP values to level."""
+    xp = get_xp_array(xps)
+    if xp is None:
+        return [skywars_xp_to_level(x) for x in xps]
+
+    np = u.np
+    high = ((xp - 26760) / 5000) + 19
+    low = (skywars_levels(xp, SKYWARS_LEVEL_TOTALS, SKYWARS_LEVEL_XP) * 5000) / 5000
+    levels = np.where(xp >= 26760, high, low)
+    return ["{:.4f}".format(level) for level in round_levels(levels, 4)]
+
+
+def skywars_xp_to_level_old_batch(xps):
+    """Convert each of a sequence of SkyWars XP values to level (old system)."""
+    xp = get_xp_array(xps)
+    if xp is None:
+        return [skywars_xp_to_level_old(x) for x in xps]
+
+    np = u.np
+    above = xp >= 15000
+    high = ((xp - 15000) / 10000) + 12
+    low = skywars_levels(xp, SKYWARS_LEVEL_TOTALS_OLD, SKYWARS_LEVEL_XP_OLD)
+    levels = np.where(above, high, (low * 10000) / 10000)
+    return [
+        ("{:.4f}" if is_above else "{:.1f}").format(level)
+        for level, is_above in zip(round_levels(levels, 1), above.tolist())
+    ]
 
 
 def skywars_next_prestige(level):
@@ -197,8 +310,13 @@ def skywars_prev_prestige(level):
 
 def skywars_format_prestige(level, emblem, scheme=False):
     """Return a formatted HTML element for a SkyWars level."""
+    return skywars_prestige_html(int(level), emblem, scheme or False)
+
+
+@functools.lru_cache(maxsize=PRESTIGE_CACHE_SIZE)
+def skywars_prestige_html(level, emblem, scheme):
+    """Return the formatted HTML element for a whole SkyWars level (cached)."""
     # Prepare input parameters for constants compatibility
-    level = int(level)
     emblem = emblem.replace("emblem_", "")
     scheme = scheme.replace("scheme_", "") if scheme else False
 
@@ -231,12 +349,45 @@ def skywars_format_prestige(level, emblem, scheme=False):
 
     # Varied color scheme
     else:
-        formatted = f"<span class='{scheme['brackets'][0]}'>{brackets[0]}</span>"
-        for i, char in enumerate(str(level)):
-            # Reset count as schemes only cover three-digit levels
-            if level >= 1000 and i >= len(scheme["level"]):
-                i = 0
-            formatted += f"<span class='{scheme['level'][i]}'>{char}</span>"
-        formatted += f"<span class='{scheme['emblem']}'>{emblem}</span>"
-        formatted += f"<span class='{scheme['brackets'][1]}'>{brackets[1]}</span>"
-        return formatted
+        # Schemes only cover three-digit levels, so longer levels start over
+        colors = scheme["level"]
+        digits = "".join(
+            f"<span class='{colors[i if level < 1000 or i < len(colors) else 0]}'>"
+            f"{char}</span>"
+            for i, char in enumerate(str(level))
+        )
+        return (
+            f"<span class='{scheme['brackets'][0]}'>{brackets[0]}</span>"
+            + digits
+            + f"<span class='{scheme['emblem']}'>{emblem}</span>"
+            + f"<span class='{scheme['brackets'][1]}'>{brackets[1]}</span>"
+        )
+
+
+# ======================================================================================
+# CONSTANTS
+# ======================================================================================
+
+
+def load_constants():
+    """Build the tables derived from the stats constants, clearing cached prestiges."""
+    global CONSTANTS, PET_LEVEL_XP, PET_LEVEL_TOTALS
+    global BEDWARS_EMBLEM_LEVELS, BEDWARS_EMBLEMS
+
+    CONSTANTS = get_constants("stats")
+
+    PET_LEVEL_XP = tuple(CONSTANTS["general"]["petLevels"].values())
+    PET_LEVEL_TOTALS = tuple(itertools.accumulate(PET_LEVEL_XP, initial=0))
+
+    emblems = sorted(
+        (int(req), emblem) for req, emblem in CONSTANTS["bedwars"]["emblems"].items()
+    )
+    BEDWARS_EMBLEM_LEVELS = tuple(req for req, emblem in emblems)
+    BEDWARS_EMBLEMS = tuple(emblem for req, emblem in emblems)
+
+    bedwars_prestige_html.cache_clear()
+    skywars_prestige_html.cache_clear()
+
+
+load_constants()
+on_reload("stats", load_constants)
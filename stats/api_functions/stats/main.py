@@ -1,3 +1,9 @@
+import copy
+import logging
+import concurrent.futures
+from collections.abc import Mapping
+from concurrent.futures import BrokenExecutor
+
 from .games import general, bedwars, skywars, duels
 from .games.modes import (
     arcade,
@@ -16,40 +22,354 @@ from .games.modes import (
 )
 from .games.modes.classic import arena, paintball, quakecraft, tkr, vampirez, walls
 from .games.modes.legacy import crazywalls, skyclash
+from . import pool, profiling
+from .derived import derived_cache, fingerprint
 
 
-def get_stats(player_api):
-    """Trigger stats extraction for all modes from a player API."""
+logger = logging.getLogger(__name__)
+
+
+class StatsUnavailable(Exception):
+    """Raised when a game's stats could not be extracted."""
+
+
+class Extractor:
+    """A game's stats extraction from a player API, via the derived stats cache.
+
+    Keyword arguments:
+        module: Extractor module providing get_stats(player_api)
+        player_api: Dictionary of the player's API response
+        uuid: String of the player's UUID
+        key: String identifying the player, extractor and its sources
+    """
+
+    def __init__(self, module, player_api, uuid, key):
+        self.module = module
+        self.player_api = player_api
+        self.uuid = uuid
+        self.key = key
+        self.name = module.__name__.rsplit(".", 1)[-1]
+
+    def __call__(self):
+        return derived_cache.get_or_extract(self.key, self.extract)
+
+    def extract(self):
+        """Return the stats extracted from the player API, timing the extractor."""
+        with profiling.timed(self.name, self.uuid, self.payload):
+            return self.module.get_stats(self.player_api)
+
+    def payload(self):
+        """Return a player API holding only the parts this extractor reads."""
+        player = self.player_api.get("player") or {}
+
+        reduced = {}
+        for path in SOURCES[self.module]:
+            if path == OTHER:
+                reduced.update(get_source(player, path))
+                continue
+
+            source, target = player, reduced
+            for key in path[:-1]:
+                if not isinstance(source.get(key), dict):
+                    break
+                source, target = source[key], target.setdefault(key, {})
+            else:
+                if path[-1] in source:
+                    target[path[-1]] = source[path[-1]]
+
+        return {**self.player_api, "player": reduced}
+
+
+class LazyStats(Mapping):
+    """A mapping of stats that are only extracted when first accessed.
+
+    Values are either extractors, called once and memoised, or nested
+    LazyStats. A game whose extractor fails raises StatsUnavailable, leaving
+    the others usable. Its repr (which embeds the stats in the page) only
+    includes the games that have been extracted so far.
+
+    Keyword argument:
+        extractors: dictionary mapping keys to extractors or nested LazyStats
+    """
+
+    def __init__(self, extractors):
+        self.extractors = extractors
+        self.results = {}
+        self.failed = {}
+
+    def __getitem__(self, key):
+        if key in self.failed:
+            raise StatsUnavailable(f"{key} stats are unavailable")
+
+        if key not in self.results:
+            extractor = self.extractors[key]
+            if isinstance(extractor, LazyStats):
+                self.results[key] = extractor
+            else:
+                try:
+                    self.results[key] = extractor()
+                except Exception as e:  # noqa: E722 - one game must not break the others
+                    self.fail(key, e)
+                    raise StatsUnavailable(f"{key} stats are unavailable") from e
+
+        return self.results[key]
+
+    def __iter__(self):
+        return iter(self.extractors)
+
+    def __len__(self):
+        return len(self.extractors)
+
+    def __repr__(self):
+        items = [
+            f"{key!r}: {self[key]!r}"
+            for key, extractor in self.extractors.items()
+            if key in self.results or isinstance(extractor, LazyStats)
+        ]
+        return "{" + ", ".join(items) + "}"
+
+    def fail(self, key, e):
+        """Mark a game's stats as unavailable."""
+        logger.error(f"uuid: '{self.extractors[key].uuid}' - {key} - {e}")
+        self.failed[key] = e
+
+    def pending(self, keys=None):
+        """Return (stats, key) for each extractor under keys not yet called."""
+        pending = []
+        for key in self.extractors if keys is None else keys:
+            extractor = self.extractors.get(key)
+            if isinstance(extractor, LazyStats):
+                pending += extractor.pending()
+            elif extractor is not None:
+                if key not in self.results and key not in self.failed:
+                    pending.append((self, key))
+        return pending
+
+    def prefetch(self, keys=None):
+        """Extract the games under keys (default all), in parallel if enabled.
+
+        With EXTRACT_WORKERS set, cache misses are run in the extraction
+        pool, and a game that fails or exceeds EXTRACT_TIMEOUT is marked
+        unavailable. Otherwise the games are extracted in turn.
+        """
+        pending = self.pending(keys)
+
+        if pool.WORKERS > 0:
+            executor = pool.get_executor()
+            futures = {}
+            for stats, key in pending:
+                extractor = stats.extractors[key]
+                cached = derived_cache.get(extractor.key)
+                if cached is not None:
+                    stats.results[key] = cached
+                    continue
+
+                try:
+                    future = executor.submit(
+                        pool.extract, extractor.module.__name__, extractor.payload()
+                    )
+                except BrokenExecutor:
+                    pool.reset_executor(executor)
+                    break  # The rest are extracted in-process below
+                futures[future] = (stats, key)
+
+            done, not_done = concurrent.futures.wait(futures, timeout=pool.TIMEOUT)
+            for future in not_done:
+                future.cancel()
+                stats, key = futures[future]
+                stats.fail(key, TimeoutError(f"exceeded {pool.TIMEOUT}s"))
+
+            for future in done:
+                stats, key = futures[future]
+                try:
+                    result, wall, cpu = future.result()
+                except Exception as e:  # noqa: E722 - one game must not break the others
+                    if isinstance(e, BrokenExecutor):
+                        pool.reset_executor(executor)
+                    stats.fail(key, e)
+                else:
+                    extractor = stats.extractors[key]
+                    profiling.record(
+                        extractor.name, wall, cpu, extractor.uuid, extractor.payload
+                    )
+                    derived_cache.set(extractor.key, result)
+                    stats.results[key] = result
+
+        for stats, key in pending:
+            try:
+                stats[key]
+            except StatsUnavailable:
+                pass
+
+
+def to_dict(stats):
+    """Return stats as plain dictionaries, extracting any not yet accessed.
+
+    Games whose stats are unavailable are None.
+    """
+    if isinstance(stats, LazyStats):
+        values = {}
+        for key in stats:
+            try:
+                values[key] = to_dict(stats[key])
+            except StatsUnavailable:
+                values[key] = None
+        return values
+    return stats
+
+
+def get_prestiges(player_api):
+    """Return the BedWars and SkyWars prestiges shown in the page header.
+
+    These are read from the raw XP and prestige style fields, so neither
+    game's stats need extracting. A prestige that fails is left empty.
+    """
+    prestiges = {}
+    for key, module in [("bedwars", bedwars), ("skywars", skywars)]:
+        try:
+            prestiges[key] = module.get_prestige(player_api)
+        except Exception as e:  # noqa: E722 - the header must not break the page
+            logger.error(f"{key} prestige - {e}")
+            prestiges[key] = {}
+    return prestiges
+
+
+# The parts of the player object each extractor reads, as paths of keys, so
+# a game is only re-extracted when one of its own sources has changed. OTHER
+# stands for every top-level field except "stats". Keep in sync with the extractors,
+# which check_sources (and the check_sources command) verifies against payloads.
+OTHER = ("*",)
+SOURCES = {
+    general: [OTHER],
+    bedwars: [("stats", "Bedwars")],
+    skywars: [("stats", "SkyWars"), ("uuid",), ("vanityMeta",)],
+    duels: [("stats", "Duels")],
+    arcade: [("stats", "Arcade"), ("achievements",)],
+    bsg: [("stats", "HungerGames")],
+    buildbattle: [("stats", "BuildBattle")],
+    cvc: [("stats", "MCGO")],
+    megawalls: [("stats", "Walls3")],
+    murdermystery: [("stats", "MurderMystery")],
+    pit: [("stats", "Pit")],
+    smash: [("stats", "SuperSmash")],
+    speeduhc: [("stats", "SpeedUHC")],
+    tnt: [("stats", "TNTGames")],
+    uhc: [("stats", "UHC")],
+    warlords: [("stats", "Battleground")],
+    wool: [("stats", "WoolGames")],
+    arena: [("stats", "Arena")],
+    paintball: [("stats", "Paintball")],
+    quakecraft: [("stats", "Quake"), ("achievements",)],
+    tkr: [("stats", "GingerBread")],
+    vampirez: [("stats", "VampireZ")],
+    walls: [("stats", "Walls")],
+    crazywalls: [("stats", "TrueCombat")],
+    skyclash: [("stats", "SkyClash")],
+}
+
+
+def get_source(player, path):
+    """Return the part of the player object at a path, or None if missing."""
+    if path == OTHER:
+        return {key: value for key, value in player.items() if key != "stats"}
+
+    source = player
+    for key in path:
+        if not isinstance(source, dict):
+            return None
+        source = source.get(key)
+    return source
+
+
+def check_sources(player_api):
+    """Return the names of the extractors reading more than their SOURCES.
+
+    Such an extractor would be served stale stats from the derived cache,
+    and given too little of the payload by the pool. Each extractor is run
+    on the payload Extractor.payload() reduces to its sources and on the
+    full payload, and is returned if its stats (or the error it raises)
+    differ between the two.
+    """
+    def extract(module, payload):
+        try:
+            return module.get_stats(copy.deepcopy(payload))
+        except Exception as e:  # noqa: E722 - compared like the stats
+            return type(e), str(e)
+
+    mismatched = []
+    for module in SOURCES:
+        extractor = Extractor(module, player_api, None, None)
+        if extract(module, player_api) != extract(module, extractor.payload()):
+            mismatched.append(extractor.name)
+    return mismatched
+
+
+def get_fingerprints(player_api):
+    """Return a fingerprint of each extractor's sources in a player API."""
+    player = player_api.get("player") or {}
+
+    fingerprints = {}
+    for path in {path for paths in SOURCES.values() for path in paths}:
+        fingerprints[path] = fingerprint(get_source(player, path))
+
     return {
-        "general": general.get_stats(player_api),
-        "bedwars": bedwars.get_stats(player_api),
-        "skywars": skywars.get_stats(player_api),
-        "duels": duels.get_stats(player_api),
-        "modes": {
-            "arcade": arcade.get_stats(player_api),
-            "bsg": bsg.get_stats(player_api),
-            "build_battle": buildbattle.get_stats(player_api),
-            "cvc": cvc.get_stats(player_api),
-            "megawalls": megawalls.get_stats(player_api),
-            "murdermystery": murdermystery.get_stats(player_api),
-            "pit": pit.get_stats(player_api),
-            "smash": smash.get_stats(player_api),
-            "speeduhc": speeduhc.get_stats(player_api),
-            "tnt": tnt.get_stats(player_api),
-            "uhc": uhc.get_stats(player_api),
-            "warlords": warlords.get_stats(player_api),
-            "wool": wool.get_stats(player_api),
-            "classic": {
-                "arena": arena.get_stats(player_api),
-                "paintball": paintball.get_stats(player_api),
-                "quakecraft": quakecraft.get_stats(player_api),
-                "tkr": tkr.get_stats(player_api),
-                "vampirez": vampirez.get_stats(player_api),
-                "walls": walls.get_stats(player_api),
-            },
-            "legacy": {
-                "crazywalls": crazywalls.get_stats(player_api),
-                "skyclash": skyclash.get_stats(player_api),
-            },
-        },
+        module: ":".join(fingerprints[path] for path in paths)
+        for module, paths in SOURCES.items()
     }
+
+
+def get_stats(player_api):
+    """Prepare lazy stats extraction for all modes from a player API.
+
+    Each game is served from the derived stats cache while its sources
+    are unchanged, so a refreshed payload only re-extracts the games
+    whose part of it has changed.
+    """
+    uuid = (player_api.get("player") or {}).get("uuid")
+    fingerprints = get_fingerprints(player_api)  # Before any extractor modifies it
+
+    def lazy(module):
+        key = f"{uuid}:{module.__name__}:{fingerprints[module]}"
+        return Extractor(module, player_api, uuid, key)
+
+    return LazyStats(
+        {
+            "general": lazy(general),
+            "bedwars": lazy(bedwars),
+            "skywars": lazy(skywars),
+            "duels": lazy(duels),
+            "modes": LazyStats(
+                {
+                    "arcade": lazy(arcade),
+                    "bsg": lazy(bsg),
+                    "build_battle": lazy(buildbattle),
+                    "cvc": lazy(cvc),
+                    "megawalls": lazy(megawalls),
+                    "murdermystery": lazy(murdermystery),
+                    "pit": lazy(pit),
+                    "smash": lazy(smash),
+                    "speeduhc": lazy(speeduhc),
+                    "tnt": lazy(tnt),
+                    "uhc": lazy(uhc),
+                    "warlords": lazy(warlords),
+                    "wool": lazy(wool),
+                    "classic": LazyStats(
+                        {
+                            "arena": lazy(arena),
+                            "paintball": lazy(paintball),
+                            "quakecraft": lazy(quakecraft),
+                            "tkr": lazy(tkr),
+                            "vampirez": lazy(vampirez),
+                            "walls": lazy(walls),
+                        }
+                    ),
+                    "legacy": LazyStats(
+                        {
+                            "crazywalls": lazy(crazywalls),
+                            "skyclash": lazy(skyclash),
+                        }
+                    ),
+                }
+            ),
+        }
+    )
@@ -0,0 +1,70 @@
+"""Provides the shared pool used to run stats extractors in parallel.
+
+Extractors are CPU-bound, so they run in worker processes, or in threads
+on free-threaded Python builds where threads run in parallel. Workers
+are sent only the parts of the payload each extractor reads, and with
+EXTRACT_WORKERS set to 0 (the default) extraction stays in-process.
+"""
+
+import os
+import sys
+import time
+import logging
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("EXTRACT_WORKERS", 0))
+TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", 5))
+
+executor = None
+lock = threading.Lock()
+
+
+def free_threaded():
+    """Return whether this Python runs threads without the GIL."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def get_executor():
+    """Return the shared extraction pool, starting it on first use."""
+    global executor
+    with lock:
+        if executor is None:
+            if free_threaded():
+                executor = ThreadPoolExecutor(WORKERS, thread_name_prefix="extract")
+            else:
+                # Fork a clean server with the extractors loaded, not this process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                if "forkserver" in methods:
+                    context.set_forkserver_preload(["stats.api_functions.stats.main"])
+                executor = ProcessPoolExecutor(WORKERS, mp_context=context)
+        return executor
+
+
+def reset_executor(broken):
+    """Discard a pool that has stopped working so the next use starts another."""
+    global executor
+    with lock:
+        if executor is broken:
+            executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+    logger.warning("Extraction pool stopped working and will be restarted")
+
+
+def extract(module_name, player_api):
+    """Return the stats extracted by an extractor module (run in the pool).
+
+    Returns a tuple of the stats, and the wall and CPU time they took.
+    """
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    stats = importlib.import_module(module_name).get_stats(player_api)
+    return stats, time.perf_counter() - wall, time.thread_time() - cpu
@@ -0,0 +1,94 @@
+"""Provides wall and CPU time histograms for stats extraction and rendering.
+
+Each timed step (an extractor, the rank lookup or a template render) is
+recorded into its own pair of rolling histograms, costing two clock reads
+at each end, and any step over EXTRACT_BUDGET seconds is logged with the
+player's UUID and the size of the payload it read.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from stats.api_functions.main.metrics import RollingHistogram
+
+logger = logging.getLogger(__name__)
+
+# Steps take milliseconds rather than seconds, so use finer buckets than requests
+TIMING_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5)
+TIMING_WINDOW = int(os.getenv("METRICS_WINDOW", 300))
+EXTRACT_BUDGET = float(os.getenv("EXTRACT_BUDGET", 0.25))
+
+# {step: {"wall": RollingHistogram, "cpu": RollingHistogram}}, created on first use
+timings = {}
+lock = threading.Lock()
+
+
+def get_histograms(step):
+    """Return the wall and CPU time histograms of a step."""
+    histograms = timings.get(step)
+    if histograms is None:
+        with lock:
+            histograms = timings.setdefault(
+                step,
+                {
+                    clock: RollingHistogram(window=TIMING_WINDOW, bounds=TIMING_BOUNDS)
+                    for clock in ("wall", "cpu")
+                },
+            )
+    return histograms
+
+
+def record(step, wall, cpu, uuid=None, payload=None, failed=False):
+    """Record the wall and CPU time of a step, logging it if over budget.
+
+    Keyword arguments:
+        step: String naming the step, e.g. "skywars" or "render.page"
+        wall: Number of seconds the step took
+        cpu: Number of seconds of CPU time the step used
+        uuid: String of the player's UUID, for the log
+        payload: Function returning what the step read, sized only for the log
+        failed: Boolean of whether the step raised
+    """
+    histograms = get_histograms(step)
+    histograms["wall"].record(wall, error=failed)
+    histograms["cpu"].record(cpu, error=failed)
+
+    if wall > EXTRACT_BUDGET:
+        details = f"{cpu * 1000:.0f}ms CPU"
+        if payload is not None:
+            details += f", payload {len(json.dumps(payload(), default=str))} bytes"
+        logger.warning(f"uuid: '{uuid}' - {step} took {wall * 1000:.0f}ms ({details})")
+
+
+@contextmanager
+def timed(step, uuid=None, payload=None):
+    """Time the enclosed block as a step (see record)."""
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        record(
+            step,
+            time.perf_counter() - wall,
+            time.thread_time() - cpu,
+            uuid,
+            payload,
+            failed,
+        )
+
+
+def get_timings():
+    """Return a summary of each step's wall and CPU times (see RollingHistogram)."""
+    with lock:
+        steps = sorted(timings.items())
+    return {
+        step: {clock: histogram.snapshot() for clock, histogram in histograms.items()}
+        for step, histograms in steps
+    }
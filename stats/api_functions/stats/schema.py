@@ -0,0 +1,175 @@
+"""Compiles declarative stat schemas into fast extraction functions.
+
+A schema is an ordered dictionary mapping each stat to how it is found:
+read from a game's API section (field, fields) or derived from the stats
+before it (total, difference, ratio, percentage, call). compile_schema
+turns a schema into a single straight-line function when its module is
+imported, so extracting it makes one lookup per field and builds no
+intermediate lists or dictionaries.
+"""
+
+import itertools
+
+
+class Spec:
+    """How a stat is found, compiled into a Python expression."""
+
+    operands = ()
+
+    def expression(self, key, operands, constant):
+        """Return the expression computing the stat.
+
+        Keyword arguments:
+            key: String of the stat's name
+            operands: List of the variable names holding each operand
+            constant: Function returning the name of a constant value
+        """
+        raise NotImplementedError
+
+
+class Field(Spec):
+    """A stat read from the section, defaulting if missing (key by default)."""
+
+    def __init__(self, source=None, default=0):
+        self.source = source
+        self.default = default
+
+    def expression(self, key, operands, constant):
+        source = self.source if self.source is not None else key
+        return f"get({source!r}, {constant(self.default)})"
+
+
+class Total(Spec):
+    """The sum of stats."""
+
+    def __init__(self, *operands):
+        self.operands = operands
+
+    def expression(self, key, operands, constant):
+        return " + ".join(operands)
+
+
+class Difference(Spec):
+    """One stat minus another."""
+
+    def __init__(self, one, two):
+        self.operands = (one, two)
+
+    def expression(self, key, operands, constant):
+        return f"{operands[0]} - {operands[1]}"
+
+
+class Ratio(Spec):
+    """The ratio of one stat to another, computed inline as utilities.get_ratio is."""
+
+    def __init__(self, one, two, dp=3):
+        self.operands = (one, two)
+        self.dp = dp
+
+    def expression(self, key, operands, constant):
+        one, two = operands
+        dp = repr(self.dp)
+        return f"(round({one} / {two}, {dp}) if {two} != 0 else round({one}, {dp}))"
+
+
+class Percentage(Spec):
+    """One stat as a % of another, computed inline as utilities.get_percentage is."""
+
+    def __init__(self, one, two, dp=2):
+        self.operands = (one, two)
+        self.dp = dp
+
+    def expression(self, key, operands, constant):
+        one, two = operands
+        dp = repr(self.dp)
+        percentage = f"round({one} / {two} * 100, {dp})"
+        return f"(0 if {one} == 0 else 100 if {two} == 0 else {percentage})"
+
+
+class Call(Spec):
+    """The result of a function called with stats."""
+
+    def __init__(self, function, *operands):
+        self.function = function
+        self.operands = operands
+
+    def expression(self, key, operands, constant):
+        return f"{constant(self.function)}({', '.join(operands)})"
+
+
+field = Field
+total = Total
+difference = Difference
+ratio = Ratio
+percentage = Percentage
+call = Call
+
+
+def fields(*names, source="{}", key="{}", default=0):
+    """Return a schema reading each named stat from the section.
+
+    Keyword arguments:
+        names: Strings of the stats to read
+        source: Format string giving each stat's key in the section
+        key: Format string giving each stat's name in the stats
+        default: Value of any stat missing from the section (default 0)
+    """
+    return {key.format(name): Field(source.format(name), default) for name in names}
+
+
+def compile_schema(schema, name="extract"):
+    """Compile a schema into a function extracting its stats from a section.
+
+    The function is called as extract(section, stats=None) and returns the
+    stats dictionary, with the schema's stats added in order. Operands not
+    found earlier in the schema are read from the given stats.
+
+    Keyword arguments:
+        schema: Dictionary mapping each stat's name to its Spec
+        name: String naming the function in tracebacks
+    """
+    namespace = {}
+    names = (f"v{i}" for i in itertools.count())
+    variables = {}  # Stat names mapped to the variable currently holding them
+    loads = []
+    lines = []
+
+    def constant(value):
+        if type(value) in (int, str, bool, type(None)):
+            return repr(value)
+        if isinstance(value, (dict, list, set)):
+            raise TypeError(f"'{name}' schema defaults must be immutable")
+        variable = next(names)
+        namespace[variable] = value
+        return variable
+
+    def operand(stat):
+        if stat not in variables:
+            variables[stat] = next(names)
+            loads.append(f"    {variables[stat]} = stats[{stat!r}]")
+        return variables[stat]
+
+    for key, spec in schema.items():
+        operands = [operand(stat) for stat in spec.operands]
+        expression = spec.expression(key, operands, constant)
+        variables[key] = next(names)
+        lines.append(f"    {variables[key]} = {expression}")
+
+    # Read fields through a local name, and return the values in schema order
+    header = [f"def {name}(section, stats=None):"]
+    if any(isinstance(spec, Field) for spec in schema.values()):
+        header.append("    get = section.get")
+    values = ", ".join(f"{key!r}: {variables[key]}" for key in schema)
+    footer = [
+        f"    values = {{{values}}}",
+        "    if stats is None:",
+        "        return values",
+        "    stats.update(values)",
+        "    return stats",
+    ]
+    source = "\n".join(header + loads + lines + footer)
+
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+    extract = namespace[name]
+    extract.source = source
+    return extract
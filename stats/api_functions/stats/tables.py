@@ -0,0 +1,251 @@
+"""Builds per-mode stats tables with compiled row builders.
+
+A Table names the fields each row reads, how a field's key is formed for
+a mode, the values derived from them and the cells of each row (as field
+names or schema specs). It is compiled once at import into a function
+that, in a single pass over the modes, reads each row's precomputed keys
+from the API section, builds the row and sums each field for totals.
+With NumPy installed, tables of many rows compute each ratio and
+percentage column as a single batch instead (see utilities). Tables are
+emitted in the structure components/table.html consumes.
+"""
+
+import itertools
+from operator import itemgetter
+
+from . import utilities as u
+from .schema import Ratio, Percentage
+from stats.constants import freeze
+
+MISSING = object()
+
+# Cells computed in batches, mapped to the function computing each batch
+BATCHES = {Ratio: "get_ratio_batch", Percentage: "get_percentage_batch"}
+
+
+def get_label(label):
+    """Return a row label as a tuple of leading cells."""
+    return label if isinstance(label, tuple) else (label,)
+
+
+def get_percentage_cell(one, two):
+    """Return one as a % of two as a table cell, e.g. "12.5%"."""
+    return f"{u.get_percentage(one, two, 2)}%"
+
+
+class Table:
+    """A per-mode stats table.
+
+    Keyword arguments:
+        id: String of the table's element id
+        head: List of the column headings
+        fields: List of the stats read for each mode
+        cells: List of each row's cells after its label, as field or derived
+               names, or schema specs over them
+        key: Format string of a field's key, from {field} and {mode}
+             (default "{field}{mode}")
+        keys: Dictionary of key format strings overriding key for some fields
+        defaults: Dictionary of defaults overriding 0 for some fields
+        derived: Dictionary of values derived for each row, as schema specs
+        convert: Function applied to each field read (default None)
+        required: Field a mode's row is skipped without (default None)
+        params: Tuple of names passed to build and row for use as operands
+        totals: Boolean of whether each field is summed over the rows
+        sort: Column index rows are sorted by, descending (default None)
+        options: Remaining table options (green, boldRows, percent, ...)
+    """
+
+    def __init__(
+        self,
+        id,
+        head,
+        fields,
+        cells,
+        key="{field}{mode}",
+        keys=None,
+        defaults=None,
+        derived=None,
+        convert=None,
+        required=None,
+        params=(),
+        totals=False,
+        sort=None,
+        **options,
+    ):
+        self.id = id
+        self.head = freeze(head)
+        self.fields = list(fields)
+        self.formats = [(keys or {}).get(field, key) for field in self.fields]
+        self.params = params
+        self.sort = sort
+        self.options = freeze(options)
+        self.keys = {}  # Each mode's keys, formed on first use
+
+        defaults = {**{field: 0 for field in self.fields}, **(defaults or {})}
+        if required is not None:
+            defaults[required] = MISSING
+        self.compile(cells, defaults, derived or {}, convert, required, totals)
+
+    def compile(self, cells, defaults, derived, convert, required, totals):
+        """Compile the functions building all rows and a single row."""
+        namespace = {
+            "get_ratio_batch": u.get_ratio_batch,
+            "get_percentage_batch": u.get_percentage_batch,
+            "convert": convert,
+            "MISSING": MISSING,
+        }
+        names = (f"x{i}" for i in itertools.count())
+        params = self.params
+        variables = {name: name for name in ("mode", *params)}
+
+        def constant(value):
+            if type(value) in (int, str, bool, type(None)):
+                return repr(value)
+            variable = next(names)
+            namespace[variable] = value
+            return variable
+
+        def expression(key, spec):
+            operands = [variables[operand] for operand in spec.operands]
+            return spec.expression(key, operands, constant)
+
+        # Reading each field from the section
+        keys = [f"k{i}" for i in range(len(self.fields))]
+        reads = []
+        for i, field in enumerate(self.fields):
+            variables[field] = f"v{i}"
+            read = f"get({keys[i]}, {constant(defaults[field])})"
+            if convert is not None and field != required:
+                read = f"convert({read})"
+            reads.append(f"v{i} = {read}")
+            if field == required:
+                reads.append(f"if v{i} is MISSING: continue")
+
+        # Computing the derived values and the cells from them
+        computed = []
+        for i, (name, spec) in enumerate(derived.items()):
+            computed.append(f"d{i} = {expression(name, spec)}")
+            variables[name] = f"d{i}"
+        single = [
+            variables[cell] if isinstance(cell, str) else expression(None, cell)
+            for cell in cells
+        ]
+
+        fields = [f"v{i}" for i in range(len(self.fields))]
+        sums = [f"t{i}" for i in range(len(self.fields))] if totals else []
+        loop = (
+            [f"    {total} = 0" for total in sums]
+            + [f"    for mode, label, ({', '.join(keys)},) in modes:"]
+            + [f"        {line}" for line in reads + computed]
+        )
+        add = [f"        {total} += {field}" for total, field in zip(sums, fields)]
+        signature = ", ".join(["get", "modes", *params])
+
+        build = (
+            [f"def build({signature}):", "    rows = []"]
+            + loop
+            + [f"        rows.append([{', '.join(['*label'] + single)}])"]
+            + add
+            + [f"    return rows, [{', '.join(sums)}]"]
+        )
+
+        # For many rows, ratio and percentage cells are computed a column at a
+        # time once every row's values are read, each column as one batch
+        values = ["mode", "label"] + fields + [f"d{i}" for i in range(len(derived))]
+        batches = []
+        batched = []
+        for i, cell in enumerate(cells):
+            function = BATCHES.get(type(cell))
+            if function is None:
+                batched.append(single[i])
+                continue
+            columns = [
+                f"columns[{values.index(variables[operand])}]"
+                for operand in cell.operands
+            ]
+            call = f"{function}({', '.join(columns)}, {cell.dp!r})"
+            batched.append(f"y{len(batches)}")
+            batches.append(f"    c{len(batches)} = {call}")
+
+        results = [f"c{i}" for i in range(len(batches))]
+        targets = ", ".join(
+            [f"({', '.join(values)},)"] + [f"y{i}" for i in range(len(batches))]
+        )
+        build_batch = (
+            [f"def build_batch({signature}):", "    rows = []"]
+            + loop
+            + [f"        rows.append(({', '.join(values)},))"]
+            + add
+            + [f"    columns = list(zip(*rows)) or [()] * {len(values)}"]
+            + batches
+            + [
+                "    rows = [",
+                f"        [{', '.join(['*label'] + batched)}]",
+                f"        for {targets} in zip({', '.join(['rows'] + results)})",
+                "    ]",
+                f"    return rows, [{', '.join(sums)}]",
+            ]
+        )
+
+        row = (
+            [f"def row({', '.join(['mode', 'label', *fields, *params])}):"]
+            + [f"    {line}" for line in computed]
+            + [f"    return [{', '.join(['*label'] + single)}]"]
+        )
+        source = "\n".join(build + [""] + row)
+        if batches:
+            source += "\n\n" + "\n".join(build_batch)
+
+        exec(compile(source, f"<table {self.id}>", "exec"), namespace)
+        self.build_rows = namespace["build"]
+        self.build_batch = namespace.get("build_batch", self.build_rows)
+        self.build_row = namespace["row"]
+        self.source = source
+
+    def get_keys(self, mode):
+        """Return the keys of each field for a mode."""
+        keys = self.keys.get(mode)
+        if keys is None:
+            keys = tuple(
+                key.format(field=field, mode=mode)
+                for field, key in zip(self.fields, self.formats)
+            )
+            self.keys[mode] = keys
+        return keys
+
+    def rows(self, section, modes, **params):
+        """Return the rows for each mode.
+
+        Keyword arguments:
+            section: Dictionary of the game's API stats
+            modes: Dictionary mapping each mode to its label, or to a tuple
+                   of its leading cells
+            params: Values of the table's params
+        """
+        return self.rows_and_totals(section, modes, **params)[0]
+
+    def rows_and_totals(self, section, modes, **params):
+        """Return the rows for each mode and the totals of each field."""
+        modes = [
+            (mode, get_label(label), self.get_keys(mode))
+            for mode, label in modes.items()
+        ]
+        params = [params[name] for name in self.params]
+        build = self.build_rows
+        if u.np is not None and len(modes) >= u.ARRAY_BATCH_MIN:
+            build = self.build_batch
+        rows, totals = build(section.get, modes, *params)
+        return rows, dict(zip(self.fields, totals))
+
+    def row(self, label, values, mode="", **params):
+        """Return a row built from given field values (e.g. totals)."""
+        label = get_label(label)
+        fields = [values[field] for field in self.fields]
+        params = [params[name] for name in self.params]
+        return self.build_row(mode, label, *fields, *params)
+
+    def as_dict(self, rows):
+        """Return the table with the given rows, as consumed by the template."""
+        if self.sort is not None:
+            rows = sorted(rows, key=itemgetter(self.sort), reverse=True)
+        return {"id": self.id, "head": self.head, "rows": rows, **self.options}
@@ -2,6 +2,14 @@
 
 import re
 
+try:
+    import numpy as np
+except ImportError:  # Batches are then computed in pure Python
+    np = None
+
+# Batches smaller than this are faster in pure Python than converted to arrays
+ARRAY_BATCH_MIN = 64
+
 
 def camel_to_snake(str):
     """Convert camelCase to snake_case."""
@@ -18,11 +26,30 @@ def get_ratio(one, two, dp=3):
 
 def get_ratios(dict, ratios):
     """Return a dictionary with the specified ratios calculated."""
-    for ratio, keys in ratios.items():
-        dict[ratio] = get_ratio(dict.get(keys[0], 0), dict.get(keys[1], 0))
+    values = get_ratio_batch(
+        [dict.get(keys[0], 0) for keys in ratios.values()],
+        [dict.get(keys[1], 0) for keys in ratios.values()],
+    )
+    dict.update(zip(ratios, values))
     return dict
 
 
+def get_ratio_batch(ones, twos, dp=3):
+    """Return the ratio of each of ones to each of twos, as get_ratio does.
+
+    Keyword arguments:
+        ones: Sequence of the numerators
+        twos: Sequence of the denominators, the same length as ones
+        dp: Number of decimal places to round to (default 3)
+    """
+    if np is not None and len(ones) >= ARRAY_BATCH_MIN:
+        return round_quotients(ones, twos, dp, get_ratio)
+    return [
+        round(one / two, dp) if two != 0 else round(one, dp)
+        for one, two in zip(ones, twos)
+    ]
+
+
 def get_percentage(one, two, dp=2):
     """Return one as a % of two, rounded to dp decimal places."""
     if one == 0:
@@ -33,6 +60,82 @@ def get_percentage(one, two, dp=2):
         return round(one / two * 100, dp)
 
 
+def get_percentage_batch(ones, twos, dp=2):
+    """Return each of ones as a % of each of twos, as get_percentage does.
+
+    Keyword arguments:
+        ones: Sequence of the parts
+        twos: Sequence of the wholes, the same length as ones
+        dp: Number of decimal places to round to (default 2)
+    """
+    if np is not None and len(ones) >= ARRAY_BATCH_MIN:
+        return round_quotients(ones, twos, dp, get_percentage, 100)
+    return [
+        0 if one == 0 else 100 if two == 0 else round(one / two * 100, dp)
+        for one, two in zip(ones, twos)
+    ]
+
+
+def round_quotients(ones, twos, dp, function, scale=None):
+    """Return each of ones divided by each of twos (times scale), with NumPy.
+
+    Results are the same as function(one, two, dp) returns. NumPy divides
+    exactly as Python does, and any quotient round_array is unsure of, any
+    zero (kept as an int by function) and any integer too large for a float
+    is passed to function instead.
+
+    Keyword arguments:
+        ones: Sequence of the numerators
+        twos: Sequence of the denominators
+        dp: Number of decimal places to round to
+        function: Function computing a single result, e.g. get_ratio
+        scale: Number each quotient is multiplied by before rounding
+    """
+    one = np.asarray(ones, dtype=np.float64)
+    two = np.asarray(twos, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotients = one / two
+        if scale is not None:
+            quotients = quotients * scale
+        unsure = (
+            (one == 0)
+            | (two == 0)
+            | ~(np.abs(one) < 2**53)
+            | ~(np.abs(two) < 2**53)
+        )
+        results, unsure = round_array(quotients, dp, unsure)
+
+    for i in np.flatnonzero(unsure).tolist():
+        results[i] = function(ones[i], twos[i], dp)
+    return results
+
+
+def round_array(values, dp, unsure=None):
+    """Return a float array rounded to dp decimal places, as a list.
+
+    NumPy rounds by scaling, so any value within that scaling's error of a
+    tie (or too large to scale) may differ from what round returns. Returns
+    a tuple of the list and a boolean array of those values, or of any
+    already marked unsure, for the caller to round itself.
+
+    Keyword arguments:
+        values: NumPy float array of the values
+        dp: Number of decimal places to round to
+        unsure: Boolean array of values already known to need rounding
+                by the caller (default None)
+    """
+    factor = 10.0**dp
+
+    with np.errstate(invalid="ignore"):
+        scaled = values * factor
+        tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+        near = ~(np.abs(scaled) < 2**52) | (tie <= np.abs(scaled) * 2**-50)
+        results = (np.rint(scaled) / factor).tolist()
+
+    return results, near if unsure is None else near | unsure
+
+
 def romanize(num):
     """Convert an integer to a Roman numeral."""
     num = int(num)
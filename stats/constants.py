@@ -1,9 +1,122 @@
 import os
 import json
+import time
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CONSTANTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "constants")
+
+
+def immutable(*args, **kwargs):
+    raise TypeError("constants are read-only, use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """A read-only dict, printed and serialised exactly like a dict."""
+
+    __setitem__ = __delitem__ = immutable
+    clear = pop = popitem = setdefault = update = immutable
+    __ior__ = immutable
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenList(list):
+    """A read-only list, printed and serialised exactly like a list."""
+
+    __setitem__ = __delitem__ = immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = immutable
+    __iadd__ = __imul__ = immutable
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    """Return a read-only copy of a decoded JSON value."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Return a mutable (plain dict and list) copy of a constants value."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+# Each page's constants are loaded once per process as {page: (mtime, constants)}
+loaded = {}
+load_times = {}
+lock = threading.Lock()
+
+# Functions called whenever a page's constants are reloaded, e.g. to clear caches
+# of values derived from them, as {page: [function]}
+reload_hooks = {}
+
+
+def on_reload(page, function):
+    """Call function (with no arguments) whenever a page's constants are reloaded."""
+    reload_hooks.setdefault(page, []).append(function)
+
 
 def get_constants(page):
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    constants_dir = os.path.abspath(os.path.join(current_dir, 'constants', f'{page}.json'))
-    
-    with open(constants_dir, encoding='utf-8') as constants_json:
-        return json.load(constants_json)
\ No newline at end of file
+    """Return the read-only constants for a page, loading them on first use.
+
+    In development (DEBUG) the file is reloaded whenever it is modified.
+    """
+    path = os.path.join(CONSTANTS_DIR, f"{page}.json")
+
+    entry = loaded.get(page)
+    if entry is not None and not settings.DEBUG:
+        return entry[1]
+
+    mtime = os.stat(path).st_mtime
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+
+    with lock:
+        entry = loaded.get(page)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as constants_json:
+            constants = freeze(json.load(constants_json))
+        load_times[page] = time.perf_counter() - start
+
+        loaded[page] = (mtime, constants)
+        logger.info(f"page: '{page}' - constants loaded in {load_times[page]:.3f}s")
+
+    # Outside the lock, as hooks may themselves read the constants
+    if entry is not None:
+        for function in reload_hooks.get(page, ()):
+            function()
+    return constants
+
+
+def get_load_times():
+    """Return the number of seconds each page's constants took to load."""
+    return dict(load_times)
@@ -0,0 +1,172 @@
+import json
+import timeit
+import statistics
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.constants import get_constants
+from stats.templatetags import tags_main as tags
+
+BASELINE = settings.BASE_DIR / "stats" / "benchmarks" / "filters.json"
+
+
+def get_cases():
+    """Return each benchmark case, mapped to its filter and representative args."""
+    kit_prestiges = get_constants("stats")["skywars"]["kitPrestiges"]
+    rank = {
+        "rank": "MVP_PLUS",
+        "rankPlusColor": "DARK_GREEN",
+        "monthlyRankColor": "GOLD",
+    }
+    title = "§6§lLEGENDARY §cSlayer §6of §cthe §6Ages"
+
+    return {
+        "format_duration": (tags.format_duration, (1_234_567,)),
+        "format_duration:trimmed": (tags.format_duration, (3_725, True)),
+        "format_duration:noDays": (tags.format_duration, (1_234_567, False, True)),
+        "format_duration_ms": (tags.format_duration_ms, (754_321,)),
+        "format_timestamp": (tags.format_timestamp, (1_700_000_000_000,)),
+        "time_since_timestamp": (tags.time_since_timestamp, (1_700_000_000_000,)),
+        "percent": (tags.percent, (5_000, 1_234)),
+        "ratio": (tags.ratio, (12_345, 678)),
+        "romanize": (tags.romanize, (3_888,)),
+        "skywars_kit_tier": (tags.skywars_kit_tier, (25_000, kit_prestiges)),
+        "replace_color_tags": (tags.replace_color_tags, (title,)),
+        "replace_color_tags:uncached": (tags.get_color_tags_html.__wrapped__, (title,)),
+        "replace_color_tags:markers": (
+            tags.replace_color_tags,
+            ("%%gold%%[%%red%%GUILD%%gold%%]",),
+        ),
+        "replace_color_tags:plain": (tags.replace_color_tags, ("Plain title",)),
+        "rank": (tags.rank, (rank, "Technoblade")),
+    }
+
+
+def reference():
+    """A fixed workload of arithmetic and formatting each case is timed against."""
+    total = 0
+    for i in range(20):
+        total += divmod(i * 7919, 13)[1]
+    return f"{total:,}"
+
+
+def load_baseline(path):
+    """Return the stored relative speed of each case, or {} if none are stored."""
+    try:
+        with open(path, encoding="utf-8") as baseline_json:
+            return json.load(baseline_json)
+    except FileNotFoundError:
+        return {}
+
+
+def measure(function, args, repeat):
+    """Return the speed of a function relative to reference, the median of repeats.
+
+    Each repeat times the function and then the reference, so a machine that
+    is slower overall, or busy for a moment, slows both alike. Returns a
+    tuple of the relative speed and the function's calls per second.
+    """
+    timer = timeit.Timer(lambda: function(*args))
+    reference_timer = timeit.Timer(reference)
+    number, _ = timer.autorange()
+    reference_number, _ = reference_timer.autorange()
+
+    speeds = []
+    calls = []
+    for _ in range(repeat):
+        seconds = timer.timeit(number) / number
+        reference_seconds = reference_timer.timeit(reference_number) / reference_number
+        speeds.append(reference_seconds / seconds)
+        calls.append(1 / seconds)
+    return statistics.median(speeds), statistics.median(calls)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the template filters run for every table cell, failing if "
+        "any is slower than its stored baseline by more than the tolerance. "
+        "Speeds are relative to a reference workload timed in the same run, "
+        "so a baseline stored on one machine can be compared on another"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases",
+            nargs="*",
+            help="Cases to run (default all)",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=BASELINE,
+            help=f"JSON file of each case's relative speed (default {BASELINE})",
+        )
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Store the results as the baseline instead of comparing with it",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Fraction slower than the baseline a case may be (default 0.2)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=7,
+            help="Number of timed runs of each case, the median kept (default 7)",
+        )
+
+    def handle(self, *args, **options):
+        cases = get_cases()
+        unknown = set(options["cases"]) - set(cases)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}")
+        names = options["cases"] or list(cases)
+
+        path = Path(options["baseline"])
+        baseline = load_baseline(path)
+        if not options["save"]:
+            if not baseline:
+                raise CommandError(f"No baseline at {path}, store one with --save")
+            missing = [name for name in names if name not in baseline]
+            if missing:
+                raise CommandError(
+                    f"No baseline for {', '.join(missing)} at {path}, "
+                    "store one with --save"
+                )
+
+        results = {}
+        regressions = []
+        for name in names:
+            function, function_args = cases[name]
+            results[name], calls = measure(function, function_args, options["repeat"])
+
+            line = f"{name:<30}{calls:>14,.0f} ops/s{results[name]:>10.3f}x"
+            if not options["save"]:
+                change = results[name] / baseline[name] - 1
+                line += f"{baseline[name]:>10.3f}x baseline{change:>+9.1%}"
+                if change < -options["tolerance"]:
+                    regressions.append(name)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if options["save"]:
+            stored = {
+                **baseline,
+                **{name: round(speed, 3) for name, speed in results.items()},
+            }
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as baseline_json:
+                json.dump(stored, baseline_json, indent=2)
+                baseline_json.write("\n")
+            self.stdout.write(f"Stored the baseline at {path}")
+
+        if regressions:
+            raise CommandError(
+                f"Slower than the baseline by over {options['tolerance']:.0%}: "
+                + ", ".join(regressions)
+            )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.api_functions.stats.batch import read_jsonl
+from stats.api_functions.stats.main import check_sources
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that every extractor gives the same stats from only the sources "
+        "listed for it in SOURCES as from the full payload, for each player API "
+        "in JSONL files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files",
+            nargs="+",
+            help="JSONL files of player API responses, one per line",
+        )
+
+    def handle(self, *args, **options):
+        checked = 0
+        mismatched = {}  # Each extractor's name mapped to the first UUID failing it
+        for path in options["files"]:
+            with open(path, encoding="utf-8") as file:
+                for player_api in read_jsonl(file):
+                    uuid = (player_api.get("player") or {}).get("uuid")
+                    for name in check_sources(player_api):
+                        mismatched.setdefault(name, uuid)
+                    checked += 1
+
+        if mismatched:
+            raise CommandError(
+                "Extractors reading more than their SOURCES: "
+                + ", ".join(
+                    f"{name} (uuid: '{uuid}')" for name, uuid in mismatched.items()
+                )
+            )
+        self.stdout.write(f"All extractors match their SOURCES for {checked} players")
@@ -0,0 +1,98 @@
+import sys
+import json
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.api_functions.stats.batch import (
+    GAMES,
+    extract_batch,
+    read_jsonl,
+    write_jsonl,
+)
+
+
+def check_ratios(ratios, games):
+    """Raise CommandError unless ratios maps extracted games to pairs of stats.
+
+    Stat names are not checked, as some columns only exist for players with
+    the stats (e.g. title progress), and a ratio of a missing stat is None.
+    """
+    if not isinstance(ratios, dict):
+        raise CommandError("Invalid --ratios: must map games to ratio columns")
+
+    for game, game_ratios in ratios.items():
+        if game not in games:
+            raise CommandError(f"Invalid --ratios: {game} is not being extracted")
+        if not isinstance(game_ratios, dict):
+            raise CommandError(f"Invalid --ratios: {game} must map names to stats")
+
+        for name, stats in game_ratios.items():
+            if (
+                not isinstance(stats, list)
+                or len(stats) != 2
+                or not all(isinstance(stat, str) for stat in stats)
+            ):
+                raise CommandError(
+                    f"Invalid --ratios: {game} {name} must be a pair of stat names"
+                )
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract the stats of many players from a JSONL file of player API "
+        "responses, writing each chunk of players' stats as a line of columns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input",
+            type=argparse.FileType("r"),
+            help="JSONL file of player API responses, one per line (- for stdin)",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=argparse.FileType("w"),
+            default=sys.stdout,
+            help="File the columns are written to (default stdout)",
+        )
+        parser.add_argument(
+            "--games",
+            help=f"Comma-separated games to extract (default all: {', '.join(GAMES)})",
+        )
+        parser.add_argument(
+            "--ratios",
+            help='JSON of ratio columns to add, e.g. \'{"bedwars": {"fkdr": '
+            '["final_kills_bedwars", "final_deaths_bedwars"]}}\'',
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of players per chunk (default 500)",
+        )
+
+    def handle(self, *args, **options):
+        games = options["games"].split(",") if options["games"] else None
+        unknown = set(games or ()) - set(GAMES)
+        if unknown:
+            raise CommandError(f"Unknown games: {', '.join(sorted(unknown))}")
+
+        try:
+            ratios = json.loads(options["ratios"]) if options["ratios"] else None
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Invalid --ratios: {e}")
+        if ratios is not None:
+            check_ratios(ratios, games or GAMES)
+
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        chunks = extract_batch(
+            read_jsonl(options["input"]),
+            games=games,
+            ratios=ratios,
+            chunk_size=options["chunk_size"],
+        )
+        write_jsonl(chunks, options["output"])
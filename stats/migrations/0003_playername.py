@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0002_alter_supporter_emoji'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerName',
+            fields=[
+                ('name', models.CharField(max_length=16, primary_key=True, serialize=False)),
+                ('uuid', models.CharField(blank=True, max_length=32, null=True)),
+                ('updated', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -11,3 +11,18 @@ class Supporter(models.Model):
 
     def __str__(self):
         return f"{self.uuid} (Tier {self.tier})"
+
+
+class PlayerName(models.Model):
+    """A cached Minecraft name to UUID lookup.
+
+    Names are stored lower-cased so lookups are case-insensitive. A null
+    UUID records a name which Mojang reported as invalid.
+    """
+
+    name = models.CharField(primary_key=True, max_length=16)
+    uuid = models.CharField(max_length=32, null=True, blank=True)
+    updated = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.uuid or 'Invalid Name'})"
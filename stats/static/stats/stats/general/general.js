@@ -20,7 +20,7 @@ function uuidToggle() {
 }
 
 // Parkour
-let currentParkourGame = Object.keys(player.stats.general.parkour_times)[0];
+let currentParkourGame = Object.keys(player.stats.general?.parkour_times ?? {})[0];
 function changeParkourGame(game) {
   [currentParkourGame, game].forEach((e) => {
     document
@@ -45,7 +45,8 @@ function changeParkourGame(game) {
 //
 // Quests/Challenges/Achievements/Games: Hypixel resource API request directly
 // from frontend (no API key required) Online Status/Recent Games/Guild: Hypixel
-// API request via internal AJAX (Hypixel API key required)
+// API request via internal AJAX (Hypixel API key required), unless the
+// response was already prefetched server side alongside the main stats API
 //==============================================================================
 
 //==============================================================================
@@ -54,9 +55,14 @@ function changeParkourGame(game) {
 
 // Make request and execute a following function
 // There must be <div>s with id of [name]Error and [name]Container
+// Responses already fetched alongside the stats API are used when available
 function requestHandler(name, nextFunction) {
   if (!loadStates[name]) {
-    urlToJson(apiUrls[name]).then((result) => {
+    const request = prefetched[name]
+      ? Promise.resolve(prefetched[name])
+      : urlToJson(apiUrls[name]);
+    delete prefetched[name]; // Retries should always make a fresh request
+    request.then((result) => {
       const errorElement = document.getElementById(name + "Error");
       const containerElement = document.getElementById(name + "Container");
       if (result.success) {
@@ -426,7 +432,7 @@ function minimisedExpanded(expansion) {
 }
 
 // Populate achievement info
-const achievementStats = window.player.stats.general.achievements;
+const achievementStats = window.player.stats.general?.achievements;
 let achievementInfo = null;
 let currentAchievementType = null;
 
@@ -886,6 +892,16 @@ function achievements(achievementInfoInitial, type = "current") {
 // ONLINE STATUS
 //==============================================================================
 
+// The header's online status fills elements in General, which is only rendered
+// on demand when the page opens on another game, so render it first
+function headerOnlineStatus() {
+  hydrateGame("General").then((hydrated) => {
+    if (hydrated) {
+      requestHandler("online", onlineStatus);
+    }
+  });
+}
+
 function toggleOnlineDetails() {
   document.getElementById("onlineStatusDetails").classList.toggle("zeroHeight");
 }
@@ -1,3 +1,40 @@
+// Games other than the one first shown are rendered server side when opened
+const hydratedGames = { [currentNavGame]: Promise.resolve(true) };
+function hydrateGame(game) {
+  if (!hydratedGames[game]) {
+    const failed = (error) => {
+      console.log("Error");
+      console.log(error);
+      delete hydratedGames[game]; // Retry when the game is next opened
+      document.getElementById("navTabContainer" + game).innerHTML =
+        `<h2 class="red">There was an error loading ${game}. Please try again.</h2>`;
+      return false;
+    };
+
+    hydratedGames[game] = urlToJson(statsUrlGame.replace("param:game", game))
+      .then((result) => {
+        if (!result.success) {
+          return failed(result);
+        }
+
+        window.player.stats[result.key] = result.stats;
+        Object.entries({
+          mainStats: "main",
+          moreStats: "more",
+          navTabContainer: "tabs",
+        }).forEach(([prefix, part]) => {
+          if (part in result.html) {
+            document.getElementById(prefix + game).innerHTML = result.html[part];
+          }
+        });
+        bindSubTabs(game);
+        return true;
+      })
+      .catch(failed); // e.g. a server error page that is not JSON
+  }
+  return hydratedGames[game];
+}
+
 // Game selection
 const navGameClickHandler = function (navGame) {
   return function () {
@@ -54,10 +91,12 @@ const navGameClickHandler = function (navGame) {
     updateURL();
     prestigeCheck();
 
-    // Trigger client-side request if needed
-    if (currentNavTabs[currentNavGame] == "Quests") {
-      requestHandler("quests", quests);
-    }
+    // Trigger client-side request if needed once the game is rendered
+    hydrateGame(navGame).then((hydrated) => {
+      if (hydrated && currentNavTabs[navGame] == "Quests") {
+        requestHandler("quests", quests);
+      }
+    });
   };
 };
 
@@ -69,6 +108,11 @@ navGames.forEach((game) => {
 // Tab selection
 const navTabClickHandler = function (navTab) {
   return function () {
+    // Ignore clicks until the game has been rendered
+    if (!document.getElementById("navTab" + currentNavGame + navTab)) {
+      return;
+    }
+
     // Execute change
     [currentNavTabs[currentNavGame], navTab].forEach((tab) => {
       document
@@ -128,17 +172,20 @@ Object.entries(navTabs).forEach((game) => {
   game[1].forEach((tab) => {
     document.getElementById("navTabButton" + game[0] + tab).onclick =
       navTabClickHandler(tab);
-
-    if (navSubTabs[game[0]].hasOwnProperty(tab)) {
-      navSubTabs[game[0]][tab].forEach((subTab) => {
-        document.getElementById(
-          "navTabButton" + game[0] + tab + subTab
-        ).onclick = navSubTabClickHandler(subTab);
-      });
-    }
   });
 });
 
+// Sub tab buttons only exist once their game has been rendered
+function bindSubTabs(game) {
+  Object.entries(navSubTabs[game]).forEach(([tab, subTabs]) => {
+    subTabs.forEach((subTab) => {
+      document.getElementById("navTabButton" + game + tab + subTab).onclick =
+        navSubTabClickHandler(subTab);
+    });
+  });
+}
+bindSubTabs(currentNavGame);
+
 // Prestige tab background check
 function prestigeCheck() {
   if (currentNavTabs[currentNavGame] == "Prestige") {
@@ -234,7 +281,7 @@ function randomBrackets() {
 let bracketInterval;
 let bracketsActive = false;
 let presElement = document.getElementById("playerPrestigeSkyWars");
-if (window.player.stats.skywars.active_scheme.includes("mythic")) {
+if (presElement.dataset.scheme.includes("mythic")) {
   presElement.innerHTML = presElement.innerHTML.replace(
     "[",
     "<span id='front_bracket'>[</span>"
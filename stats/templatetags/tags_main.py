@@ -1,8 +1,46 @@
 from django.template.defaulttags import register
 from django.utils.safestring import mark_safe
+from django.template.loader import render_to_string
+import os
 import re
 import datetime
-from stats.constants import get_constants
+import functools
+from stats.constants import get_constants, on_reload
+from stats.api_functions.stats.main import StatsUnavailable
+
+
+COLOR_CACHE_SIZE = int(os.getenv("COLOR_CACHE_SIZE", 4096))
+
+# '§' color codes (with any character after '§' as the code), or text between them
+SECTION_TOKENS = re.compile(r"§(.)|([^§]+|§\Z)", re.DOTALL)
+# '%%' color markers like %%color%%
+MARKER_PATTERN = re.compile(r"%%(.*?)%%")
+
+# Each rank before the player's name, formatted with the player's colors
+RANK_PREFIXES = {
+    "None": "<span class='{default}'>",
+    "VIP": "<span class='{vip}'>[VIP] ",
+    "VIP_PLUS": (
+        "<span class='{vip}'>[VIP</span><span class='#FFAA00'>+</span>"
+        "<span class='{vip}'>] "
+    ),
+    "MVP": "<span class='{mvp}'>[MVP] ",
+    "MVP+": (
+        "<span class='{mvp}'>[MVP</span><span class='{plus}'>+</span>"
+        "<span class='{mvp}'>] "
+    ),
+    "MVP++": (
+        "<span class='{monthly}'>[MVP</span><span class='{plus}'>++</span>"
+        "<span class='{monthly}'>] "
+    ),
+    "YOUTUBER": "<span class='red'>[</span><span class='white'>YOUTUBE</span><span class='red'>] ",
+    "HELPER": "<span class='blue'>[HELPER] ",
+    "MODERATOR": "<span class='darkGreen'>[MOD] ",
+    "GAME_MASTER": "<span class='darkGreen'>[GM] ",
+    "ADMIN": "<span class='red'>[ADMIN] ",
+    "STAFF": "<span class='red'>[</span><span class='gold'>ዞ</span><span class='red'>] ",
+    "OWNER": "<span class='red'>[OWNER] ",
+}
 
 
 @register.filter
@@ -246,73 +284,94 @@ def snake_to_camel(s):
 @register.filter
 def replace_color_tags(s):
     """Replace color tags in the string with corresponding HTML span elements."""
-    constants = get_constants("stats")["main"]
-    
-    formatted = ""
+    # Strings without tags are returned as they are, rather than cached
+    if "§" not in s and "%%" not in s:
+        return s
+    return get_color_tags_html(s)
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def get_color_tags_html(s):
+    """Return a string with color tags as HTML span elements (cached)."""
+    parts = []
     current_color = ""
 
-    # Tags identified with '§'
+    # Tags identified with '§', with each run of text in one color in one span
     if "§" in s:
-        color_sections = constants["colorSections"]
-        i = 0
-        while i < len(s):
-            if s[i] == "§" and i + 1 < len(s):
-                color_code = s[i:i+2]  # e.g. "§a"
-                current_color = color_sections.get(color_code, current_color)
-                i += 2  # Skip color code
+        color_sections = get_constants("stats")["main"]["colorSections"]
+        text = []
+        text_color = ""
+        for code, chars in SECTION_TOKENS.findall(s):
+            if chars:
+                if text and text_color != current_color:
+                    parts.append(f"<span class='{text_color}'>{''.join(text)}</span>")
+                    text = []
+                text_color = current_color
+                text.append(chars)
             else:
-                formatted += f"<span class='{current_color}'>{s[i]}</span>"
-                i += 1
-                
-    # Tags identified with '%%'
-    elif "%%" in s:
-        # Pattern to find color markers like %%color%%
-        pattern = r'%%(.*?)%%'
-        parts = re.split(pattern, s)
+                current_color = color_sections.get(f"§{code}", current_color)
+        if text:
+            parts.append(f"<span class='{text_color}'>{''.join(text)}</span>")
 
-        for i, part in enumerate(parts):
+    # Tags identified with '%%'
+    else:
+        for i, part in enumerate(MARKER_PATTERN.split(s)):
             if i % 2 == 0:
                 # Text part
                 if current_color:
-                    formatted += f"<span class='{snake_to_camel(current_color)}'>{part}</span>"
+                    parts.append(f"<span class='{snake_to_camel(current_color)}'>{part}</span>")
                 else:
-                    formatted += part
+                    parts.append(part)
             else:
                 # Color part
                 current_color = part.strip()
 
-    else:
-        return s
-
-    return formatted
+    return "".join(parts)
 
 
 @register.simple_tag
 def rank(rankInfo, name, improveVisbility=False):
     """Format a player's rank into an HTML string with appropriate colors and tags."""
-    rank_name = rankInfo["rank"]
-    rank_plus_color = snake_to_camel(rankInfo["rankPlusColor"].lower())
-    monthly_rank_color = snake_to_camel(rankInfo["monthlyRankColor"].lower())
-    
-    default_color = "gray"
-    vip_color = "makeGreenVisible" if improveVisbility else "green"
+    prefix = get_rank_prefix(
+        rankInfo["rank"],
+        rankInfo["rankPlusColor"],
+        rankInfo["monthlyRankColor"],
+        bool(improveVisbility),
+    )
+    return mark_safe(f"{prefix}{name}</span>")
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_SIZE)
+def get_rank_prefix(rank_name, rank_plus_color, monthly_rank_color, improveVisbility):
+    """Return the HTML of a rank up to the player's name (cached)."""
+    rank_plus_color = snake_to_camel(rank_plus_color.lower())
+    monthly_rank_color = snake_to_camel(monthly_rank_color.lower())
+
     mvp_color = "makeAquaVisible" if improveVisbility else "aqua"
-    
-    rank_formats = {
-        "None": f"<span class='{default_color}'>{name}</span>",
-        "VIP": f"<span class='{vip_color}'>[VIP] {name}</span>",
-        "VIP_PLUS": f"<span class='{vip_color}'>[VIP</span><span class='#FFAA00'>+</span><span class='{vip_color}'>] {name}</span>",
-        "MVP": f"<span class='{mvp_color}'>[MVP] {name}</span>",
-        "MVP+": f"<span class='{mvp_color}'>[MVP</span><span class='{rank_plus_color}'>+</span><span class='{mvp_color}'>] {name}</span>",
-        "MVP++": f"<span class='{mvp_color if monthly_rank_color == 'AQUA' else monthly_rank_color}'>[MVP</span><span class='{rank_plus_color}'>++</span><span class='{mvp_color if monthly_rank_color == 'AQUA' else monthly_rank_color}'>] {name}</span>",
-        "YOUTUBER": f"<span class='red'>[</span><span class='white'>YOUTUBE</span><span class='red'>] {name}</span>",
-        "HELPER": f"<span class='blue'>[HELPER] {name}</span>",
-        "MODERATOR": f"<span class='darkGreen'>[MOD] {name}</span>",
-        "GAME_MASTER": f"<span class='darkGreen'>[GM] {name}</span>",
-        "ADMIN": f"<span class='red'>[ADMIN] {name}</span>",
-        "STAFF": f"<span class='red'>[</span><span class='gold'>ዞ</span><span class='red'>] {name}</span>",
-        "OWNER": f"<span class='red'>[OWNER] {name}</span>",
+    colors = {
+        "default": "gray",
+        "vip": "makeGreenVisible" if improveVisbility else "green",
+        "mvp": mvp_color,
+        "plus": rank_plus_color,
+        "monthly": mvp_color if monthly_rank_color == "AQUA" else monthly_rank_color,
     }
-    
-    # If not predefined, replace color tags and add name to final span element
-    return mark_safe(rank_formats.get(rank_name, f"{replace_color_tags(rank_name)[:-7] + f' {name}</span>'}"))
+
+    prefix = RANK_PREFIXES.get(rank_name)
+    if prefix is None:
+        # If not predefined, replace color tags and leave the last span open for the name
+        return replace_color_tags(rank_name)[:-7] + " "
+    return prefix.format(**colors)
+
+
+# The cached HTML is derived from the color constants, so is cleared when they reload
+on_reload("stats", get_color_tags_html.cache_clear)
+on_reload("stats", get_rank_prefix.cache_clear)
+
+
+@register.simple_tag(takes_context=True)
+def include_stats(context, template_name, name):
+    """Include a stats template, or an error if its stats are unavailable."""
+    try:
+        return context.template.engine.get_template(template_name).render(context)
+    except StatsUnavailable:
+        return render_to_string("stats/components/error.html", {"tab": name})
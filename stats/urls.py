@@ -12,9 +12,15 @@ urlpatterns = [
         name="stats-custom",
     ),
     # Internal APIs
+    path(
+        "player/stats/<str:uuid>/<str:game>.json",
+        views.stats_game,
+        name="stats-game",
+    ),
     path("player/online/<str:uuid>/", views.online, name="online"),
     path("player/guild/<str:uuid>/", views.guild, name="guild"),
     path("player/recent/<str:uuid>/", views.recent, name="recent"),
+    path("api/status/", views.status, name="api-status"),
     # Miscellaneous
     path("about/", views.about, name="about"),
     path("", views.home, name="home"),
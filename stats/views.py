@@ -1,13 +1,17 @@
+import os
 import logging
+import urllib.error
 from django.shortcuts import render
 from django.http import JsonResponse
+from django.template.loader import render_to_string
 
-from stats.constants import get_constants
+from stats.constants import get_constants, get_load_times
 
 from stats.api_functions.main import api
 from stats.api_functions.main.rank import get_rank
 
 from stats.api_functions.stats import main as stats_main
+from stats.api_functions.stats.profiling import timed, get_timings
 
 from .models import Supporter
 
@@ -35,14 +39,11 @@ def stats(request, name, game=None, tab=None):
     """Player stats page."""
     try:
         uuid = api.get_uuid(name)
-        player_api = api.get_api(uuid)
+        player_data = api.get_player_data(uuid)
+        player_api = player_data.pop("player")
         name = player_api["player"]["displayname"]
 
-        constants = get_constants("stats")
-
-        tabs = dict(constants["main"]["tabs"])
-        games = list(tabs.keys())
-        constants["main"]["games"] = games
+        constants, tabs, games = get_stats_constants()
 
         # Check if game and tab are valid
         game = game if game in games else None
@@ -51,6 +52,14 @@ def stats(request, name, game=None, tab=None):
         # Check if player is a supporter
         supporter = Supporter.objects.filter(uuid=uuid).first()
 
+        # Only the selected game is rendered, but the page's JS reads general stats
+        stats = stats_main.get_stats(player_api)
+        selected = (game if game is not None else games[0]).lower()
+        stats.prefetch(["general", selected])
+
+        with timed("rank", uuid):
+            rank = get_rank(player_api)
+
         context = {
             "header": f"{name}'s Stats",
             "sidebar": "stats",
@@ -58,30 +67,58 @@ def stats(request, name, game=None, tab=None):
             "player": {
                 "name": name,
                 "uuid": uuid,
-                "rank": get_rank(player_api),
-                "stats": stats_main.get_stats(player_api),
+                "rank": rank,
+                "stats": stats,
             },
             "supporter": supporter if supporter else None,
+            "prestiges": stats_main.get_prestiges(player_api),
+            "prefetched": player_data,
             "constants": constants,
             "game": game if game is not None else games[0],
             "tab": tab if tab is not None else tabs[games[0]][0],
         }
 
-        return render(request, "stats/pages/stats/main.html", context)
+        with timed("render.page", uuid):
+            return render(request, "stats/pages/stats/main.html", context)
+
+    except api.RateLimitExceeded as e:
+        logger.warning(f"name: '{name}' - {e}")
+        return home_error(request, name, busy=True)
+
+    except api.APIUnavailable as e:
+        logger.warning(f"name: '{name}' - {e}")
+        return home_error(request, name, unavailable=True)
 
     except Exception as e:  # noqa: E722 - no exception type is given as site must continue to function
         logger.error(f"name: '{name}' - {e}")
+        return home_error(request, name)
 
-        context = {
-            "header": "Player Stats",
-            "sidebar": "stats",
-            "description": "Advanced player stats tool for the Hypixel Network.",
-            "constants": get_constants("home"),
-            "tab": "Stats",
-            "error": name,
-        }
 
-        return render(request, "stats/pages/home.html", context)
+def get_stats_constants():
+    """Return the stats page constants, its tabs and its games."""
+    constants = get_constants("stats")
+
+    tabs = dict(constants["main"]["tabs"])
+    games = list(tabs.keys())
+    constants = {**constants, "main": {**constants["main"], "games": games}}
+
+    return constants, tabs, games
+
+
+def home_error(request, name, busy=False, unavailable=False):
+    """Home page showing why a player's stats could not be loaded."""
+    context = {
+        "header": "Player Stats",
+        "sidebar": "stats",
+        "description": "Advanced player stats tool for the Hypixel Network.",
+        "constants": get_constants("home"),
+        "tab": "Stats",
+        "error": name,
+        "busy": busy,
+        "unavailable": unavailable,
+    }
+
+    return render(request, "stats/pages/home.html", context)
 
 
 def about(request):
@@ -103,14 +140,111 @@ def about(request):
 
 def online(request, uuid):
     """Online status API."""
-    return JsonResponse(api.get_online_status(uuid))
+    return internal_api(api.get_online_status, uuid)
 
 
 def recent(request, uuid):
     """Recent games API."""
-    return JsonResponse(api.get_recent_games(uuid))
+    return internal_api(api.get_recent_games, uuid)
 
 
 def guild(request, uuid):
     """Guild information API."""
-    return JsonResponse(api.get_guild_information(uuid))
+    return internal_api(api.get_guild_information, uuid)
+
+
+def stats_game(request, uuid, game):
+    """Game stats API, rendering a game's stats when it is first opened."""
+    constants, tabs, games = get_stats_constants()
+    if game not in games:
+        return JsonResponse({"success": False, "cause": "Invalid game"}, status=404)
+
+    def get_game(uuid):
+        player_api = api.get_api(uuid)
+        if not player_api or not player_api.get("player"):
+            return {"success": False, "cause": "Invalid UUID"}
+
+        stats = stats_main.get_stats(player_api)
+        stats.prefetch([game.lower()])
+
+        with timed("rank", uuid):
+            rank = get_rank(player_api)
+
+        context = {
+            "player": {
+                "name": player_api["player"]["displayname"],
+                "uuid": uuid,
+                "rank": rank,
+                "stats": stats,
+            },
+            "constants": constants,
+            "game": game,
+            "tab": tabs[game][0],
+            "g": game,
+            "ts": tabs[game],
+            "subTabs": constants["main"]["subTabs"],
+            "formattedTabs": constants["main"]["formattedTabs"],
+        }
+
+        html = {}
+        with timed("render.game", uuid):
+            if game != "Modes":
+                for part in ["main", "more"]:
+                    template = f"stats/pages/stats/{part}/{game.lower()}.html"
+                    try:
+                        html[part] = render_to_string(template, context, request)
+                    except stats_main.StatsUnavailable:
+                        html[part] = render_to_string(
+                            "stats/components/error.html", {"tab": game}
+                        )
+            html["tabs"] = render_to_string(
+                "stats/pages/stats/tabs.html", context, request
+            )
+
+        try:
+            game_stats = stats_main.to_dict(stats[game.lower()])
+        except stats_main.StatsUnavailable:
+            game_stats = None
+
+        return {
+            "success": True,
+            "key": game.lower(),
+            "stats": game_stats,
+            "html": html,
+        }
+
+    return internal_api(get_game, uuid)
+
+
+def status(request):
+    """Upstream API status, latency histograms, rate limiter and breaker API.
+
+    Also includes the wall and CPU time histograms of each extractor, the
+    rank lookup and template rendering.
+    """
+    return JsonResponse(
+        {
+            "status": api.get_api_status(),
+            "endpoints": api.get_metrics(),
+            "limiters": api.get_limiter_status(),
+            "breakers": api.get_breaker_status(),
+            "constants": get_load_times(),
+            "extraction": get_timings(),
+            "pid": os.getpid(),  # Histograms are kept per worker process
+        }
+    )
+
+
+def internal_api(get, uuid):
+    """Return an upstream API response, or an error if it cannot be requested."""
+    try:
+        return JsonResponse(get(uuid))
+    except api.RateLimitExceeded as e:
+        logger.warning(f"uuid: '{uuid}' - {e}")
+        return JsonResponse({"success": False, "cause": "Rate limited"}, status=429)
+    except api.APIUnavailable as e:
+        logger.warning(f"uuid: '{uuid}' - {e}")
+        return JsonResponse({"success": False, "cause": "API unavailable"}, status=503)
+    except urllib.error.URLError as e:  # Includes HTTPError, e.g. for a bad UUID
+        logger.warning(f"uuid: '{uuid}' - {e}")
+        return JsonResponse({"success": False, "cause": "API error"}, status=502)